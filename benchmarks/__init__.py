@@ -0,0 +1 @@
+"""Benchmarks of pystrapi against an in-process fake Strapi server, see `benchmarks.run`."""
@@ -0,0 +1,222 @@
+"""Benchmarks of the clients against the in-process fake Strapi server.
+
+Usage:
+
+    python -m benchmarks.run --entries 5000 --payload-size 500 --latency 0.002 --output results.json
+    python -m benchmarks.run --compare results.json
+"""
+import argparse
+import asyncio
+import importlib.metadata
+import json
+import platform
+import statistics
+import sys
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence
+
+from pystrapi import StrapiClient, StrapiClientSync
+from pystrapi.help.helpers import _encode_parameters, _get_entries_parameters, process_data
+from pystrapi.help.json_helpers import get_json_loads
+
+from .server import FakeStrapiServer
+
+
+@dataclass
+class BenchmarkConfig:
+    entries: int = 1000
+    """Entries of the collection that is read"""
+    payload_size: int = 100
+    """Characters in the body of each entry"""
+    latency: float = 0.0
+    """Seconds the server waits before each response"""
+    batch_size: int = 100
+    max_limit: int = 100
+    """Max page size of the server, like the `maxLimit` of Strapi, 0 for no cap"""
+    max_concurrency: int = 8
+    writes: int = 200
+    """Entries created and upserted by the write benchmarks"""
+    repeat: int = 5
+
+
+@dataclass
+class BenchmarkResult:
+    name: str
+    items: int
+    """Items processed by each run, like entries or requests"""
+    runs: List[float] = field(default_factory=list)
+    """Seconds of each run"""
+
+    def to_dict(self) -> Dict[str, Any]:
+        median = statistics.median(self.runs)
+        return {
+            'name': self.name,
+            'items': self.items,
+            'runs': self.runs,
+            'min': min(self.runs),
+            'median': median,
+            'mean': statistics.mean(self.runs),
+            'max': max(self.runs),
+            'items_per_second': self.items / median if median else None,
+        }
+
+
+def _measure(name: str, items: int, repeat: int, func: Callable[[], Any]) -> BenchmarkResult:
+    result = BenchmarkResult(name, items)
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        result.runs.append(time.perf_counter() - started)
+    return result
+
+
+async def _measure_async(
+    name: str, items: int, repeat: int, func: Callable[[], Awaitable[Any]]
+) -> BenchmarkResult:
+    result = BenchmarkResult(name, items)
+    for _ in range(repeat):
+        started = time.perf_counter()
+        await func()
+        result.runs.append(time.perf_counter() - started)
+    return result
+
+
+def _write_rows(config: BenchmarkConfig, prefix: str) -> List[dict]:
+    return [{'slug': f'{prefix}-{i}', 'title': f'Row {i}', 'rating': i % 100} for i in range(config.writes)]
+
+
+async def _run_async(server: FakeStrapiServer, config: BenchmarkConfig) -> List[BenchmarkResult]:
+    repeat = config.repeat
+    async with StrapiClient(api_url=server.api_url) as client:
+        async def get_all() -> None:
+            await client.get_entries(
+                'posts', get_all=True, batch_size=config.batch_size, max_concurrency=config.max_concurrency)
+
+        async def iter_keyset() -> None:
+            async for _ in client.iter_entries('posts', batch_size=config.batch_size, pagination_strategy='keyset'):
+                pass
+
+        async def create() -> None:
+            async for _ in client.create_entries('writes', _write_rows(config, 'create-async'),
+                                                 max_concurrency=config.max_concurrency):
+                pass
+
+        async def upsert() -> None:
+            async for _ in client.upsert_entries('upserts', _write_rows(config, 'upsert'), ['slug'],
+                                                 max_concurrency=config.max_concurrency):
+                pass
+
+        return [
+            await _measure_async('get_entries_get_all[async]', config.entries, repeat, get_all),
+            await _measure_async('iter_entries_keyset[async]', config.entries, repeat, iter_keyset),
+            await _measure_async('create_entries[async]', config.writes, repeat, create),
+            await _measure_async('upsert_entries[async]', config.writes, repeat, upsert),
+        ]
+
+
+def _run_sync(server: FakeStrapiServer, config: BenchmarkConfig) -> List[BenchmarkResult]:
+    repeat = config.repeat
+    adapter_args = {'pool_maxsize': config.max_concurrency}
+    with StrapiClientSync(api_url=server.api_url, http_adapter_args=adapter_args) as client:
+        def get_all() -> None:
+            client.get_entries(
+                'posts', get_all=True, batch_size=config.batch_size, max_concurrency=config.max_concurrency)
+
+        def create() -> None:
+            for _ in client.create_entries('writes', _write_rows(config, 'create-sync'),
+                                           max_concurrency=config.max_concurrency):
+                pass
+
+        def upsert() -> None:
+            for _ in client.upsert_entries('upserts', _write_rows(config, 'upsert'), ['slug'],
+                                           max_concurrency=config.max_concurrency):
+                pass
+
+        response = client.get_entries('posts', get_all=True, batch_size=config.batch_size)
+        page = client.get_entries('posts', pagination={'page': 1, 'pageSize': config.batch_size})
+        body = json.dumps(page).encode()
+        loads = get_json_loads()
+        filters = {'$or': [{'slug': {'$in': [f'posts-{i}' for i in range(50)]}}, {'rating': {'$gt': 90}}]}
+        return [
+            _measure('get_entries_get_all[sync]', config.entries, repeat, get_all),
+            _measure('create_entries[sync]', config.writes, repeat, create),
+            _measure('upsert_entries[sync]', config.writes, repeat, upsert),
+            _measure('process_data', config.entries, repeat, lambda: process_data(response)),
+            _measure('process_data[lazy]', config.entries, repeat, lambda: process_data(response, lazy=True)),
+            _measure('json_loads[page]', 100, repeat, lambda: [loads(body) for _ in range(100)]),
+            _measure('json_loads[page, stdlib]', 100, repeat, lambda: [json.loads(body) for _ in range(100)]),
+            _measure('stringify_parameters', 1000, repeat, lambda: [
+                _encode_parameters(_get_entries_parameters(
+                    ['title', 'id:desc'], filters, {'author': {'fields': ['name']}}, ['title', 'slug'],
+                    {'page': 2, 'pageSize': 100}))
+                for _ in range(1000)]),
+        ]
+
+
+def _get_version() -> Optional[str]:
+    try:
+        return importlib.metadata.version('pystrapi')
+    except importlib.metadata.PackageNotFoundError:
+        return None
+
+
+def run_benchmarks(config: Optional[BenchmarkConfig] = None) -> Dict[str, Any]:
+    """Run all the benchmarks against a new fake server and return the results as a json-serializable dict."""
+    config = config or BenchmarkConfig()
+    collections = {'posts': config.entries, 'upserts': config.writes // 2}
+    with FakeStrapiServer(
+        collections, payload_size=config.payload_size, latency=config.latency, max_limit=config.max_limit
+    ) as server:
+        results = asyncio.run(_run_async(server, config)) + _run_sync(server, config)
+    return {
+        'pystrapi': _get_version(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'config': asdict(config),
+        'results': [result.to_dict() for result in results],
+    }
+
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any]) -> List[str]:
+    """Return lines of the median time of each benchmark relative to the baseline results."""
+    baseline_medians = {r['name']: r['median'] for r in baseline['results']}
+    lines = []
+    for result in results['results']:
+        base = baseline_medians.get(result['name'])
+        ratio = f'{result["median"] / base:.2f}x' if base else 'new'
+        lines.append(f'{result["name"]:<32} {result["median"] * 1000:10.2f} ms  {ratio}')
+    return lines
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.run', description=__doc__.split('\n')[0])
+    defaults = BenchmarkConfig()
+    parser.add_argument('--entries', type=int, default=defaults.entries, help='Entries of the collection to read')
+    parser.add_argument('--payload-size', type=int, default=defaults.payload_size, help='Characters per entry body')
+    parser.add_argument('--latency', type=float, default=defaults.latency, help='Server latency in seconds')
+    parser.add_argument('--batch-size', type=int, default=defaults.batch_size, help='Entries per page')
+    parser.add_argument('--max-limit', type=int, default=defaults.max_limit, help='Max page size of the server')
+    parser.add_argument('--max-concurrency', type=int, default=defaults.max_concurrency)
+    parser.add_argument('--writes', type=int, default=defaults.writes, help='Entries to create and upsert')
+    parser.add_argument('--repeat', type=int, default=defaults.repeat, help='Runs of each benchmark')
+    parser.add_argument('--output', help='Write the results to this json file')
+    parser.add_argument('--compare', help='Json results of an earlier run to compare with')
+    args = parser.parse_args(argv)
+
+    config = BenchmarkConfig(
+        entries=args.entries, payload_size=args.payload_size, latency=args.latency, batch_size=args.batch_size,
+        max_limit=args.max_limit, max_concurrency=args.max_concurrency, writes=args.writes, repeat=args.repeat)
+    results = run_benchmarks(config)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+    baseline: Dict[str, Any] = {'results': []}
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            baseline = json.load(f)
+    sys.stdout.write('\n'.join(compare(results, baseline)) + '\n')
+
+
+if __name__ == '__main__':
+    main()
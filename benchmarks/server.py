@@ -0,0 +1,235 @@
+"""In-process fake Strapi server for benchmarks, served by aiohttp in a background thread."""
+import asyncio
+import bisect
+import json
+import re
+import threading
+from typing import Any, Callable, Dict, List, Mapping, Optional
+from urllib.parse import parse_qsl
+
+from aiohttp import web
+
+_OPERATORS: Dict[str, Callable[[Any, Any], bool]] = {
+    '$eq': lambda value, expected: value == expected,
+    '$ne': lambda value, expected: value != expected,
+    '$gt': lambda value, expected: value is not None and value > expected,
+    '$gte': lambda value, expected: value is not None and value >= expected,
+    '$lt': lambda value, expected: value is not None and value < expected,
+    '$lte': lambda value, expected: value is not None and value <= expected,
+    '$in': lambda value, expected: value in expected,
+}
+
+
+def parse_query(query_string: str) -> dict:
+    """Parse flat query parameters like `filters[slug][$in][0]=a` to a nested dict, with lists of indexes."""
+    nested: dict = {}
+    for key, value in parse_qsl(query_string):
+        path = [key.split('[', 1)[0], *re.findall(r'\[([^]]*)\]', key)]
+        node = nested
+        for part in path[:-1]:
+            node = node.setdefault(part, {})
+        node[path[-1]] = value
+    return _lists_from_indexes(nested)  # type: ignore[no-any-return]
+
+
+def _lists_from_indexes(node: Any) -> Any:
+    if not isinstance(node, dict):
+        return node
+    node = {k: _lists_from_indexes(v) for k, v in node.items()}
+    if node and all(k.isdigit() for k in node):
+        return [node[k] for k in sorted(node, key=int)]
+    return node
+
+
+def _coerce(value: str, like: Any) -> Any:
+    if isinstance(like, bool):
+        return value.lower() == 'true'
+    if isinstance(like, int):
+        return int(value)
+    if isinstance(like, float):
+        return float(value)
+    return value
+
+
+def _match(row: dict, filters: Mapping) -> bool:
+    """Match the filters that the client sends: operators on attributes and id, and `$or` and `$and`."""
+    for key, condition in filters.items():
+        if key == '$or':
+            if not any(_match(row, f) for f in condition):
+                return False
+        elif key == '$and':
+            if not all(_match(row, f) for f in condition):
+                return False
+        else:
+            value = row['id'] if key == 'id' else row['attributes'].get(key)
+            for op, expected in condition.items():
+                if isinstance(expected, list):
+                    expected = [_coerce(e, value) for e in expected]
+                else:
+                    expected = _coerce(expected, value)
+                if not _OPERATORS[op](value, expected):
+                    return False
+    return True
+
+
+class _Collection:
+    """Entries of a collection by id, with their json encoded once, so pages are cheap to serve."""
+
+    def __init__(self) -> None:
+        self.rows: Dict[int, dict] = {}
+        self.encoded: Dict[int, bytes] = {}
+        self.ids: List[int] = []
+        self.next_id = 1
+
+    def put(self, row: dict) -> None:
+        if row['id'] not in self.rows:
+            bisect.insort(self.ids, row['id'])
+        self.rows[row['id']] = row
+        self.encoded[row['id']] = json.dumps(row).encode()
+        self.next_id = max(self.next_id, row['id'] + 1)
+
+    def delete(self, entry_id: int) -> None:
+        del self.rows[entry_id]
+        del self.encoded[entry_id]
+        self.ids.pop(bisect.bisect_left(self.ids, entry_id))
+
+    def select(self, filters: Mapping, sort: str) -> List[int]:
+        """Return the ids of the entries that match the filters, sorted by id."""
+        ids = self.ids
+        if filters.keys() == {'id'} and filters['id'].keys() == {'$gt'}:  # keyset pages
+            ids = ids[bisect.bisect_right(ids, int(filters['id']['$gt'])):]
+        elif filters:
+            ids = [i for i in ids if _match(self.rows[i], filters)]
+        return list(reversed(ids)) if sort in ('id:desc', 'id:DESC') else ids
+
+
+class FakeStrapiServer:
+    """Fake Strapi REST API over HTTP on localhost, with generated collections.
+
+    Each collection of `collections` (plural API id to number of entries) has entries with `slug`, `title`,
+    `rating`, a `body` of `payload_size` characters, and timestamps. Every response is delayed by `latency` seconds.
+    Supports get (by page or offset, with count or not), create, update and delete. `filters` take the operators
+    the client uses (`$eq`, `$in`, `$gt` and the like, `$or`, `$and`), `sort` only takes id,
+    `fields` and `populate` are ignored. Like Strapi, `pageSize` and `limit` are capped at `max_limit` (0 for no cap).
+
+    Usage:
+    >>> with FakeStrapiServer({'posts': 1000}, payload_size=500, latency=0.002) as server:
+    ...     StrapiClientSync(api_url=server.api_url).get_entries('posts', get_all=True)
+    """
+
+    def __init__(
+        self, collections: Mapping[str, int], *, payload_size: int = 100, latency: float = 0.0,
+        max_limit: int = 100, host: str = '127.0.0.1', port: int = 0
+    ):
+        self.payload_size = payload_size
+        self.latency = latency
+        self.max_limit = max_limit
+        self.host = host
+        self.port = port
+        self.collections: Dict[str, _Collection] = {}
+        for name, size in collections.items():
+            collection = self.collections[name] = _Collection()
+            for i in range(1, size + 1):
+                collection.put(self._make_row(i, {'slug': f'{name}-{i}', 'title': f'Entry {i}', 'rating': i % 100}))
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._runner: Optional[web.AppRunner] = None
+
+    def __enter__(self) -> 'FakeStrapiServer':
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.stop()
+
+    @property
+    def api_url(self) -> str:
+        return f'http://{self.host}:{self.port}/api/'
+
+    def _make_row(self, entry_id: int, attributes: dict) -> dict:
+        timestamp = '2024-01-01T00:00:00.000Z'
+        return {'id': entry_id, 'attributes': {
+            'body': 'x' * self.payload_size, **attributes,
+            'createdAt': timestamp, 'updatedAt': timestamp, 'publishedAt': timestamp}}
+
+    def start(self) -> None:
+        """Start serving in a background thread, return when the server listens."""
+        started = threading.Event()
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._serve, args=(started,), daemon=True)
+        self._thread.start()
+        started.wait()
+
+    def stop(self) -> None:
+        if self._loop is None or self._thread is None or self._runner is None:
+            return
+        asyncio.run_coroutine_threadsafe(self._runner.cleanup(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+        self._loop = self._thread = self._runner = None
+
+    def _serve(self, started: threading.Event) -> None:
+        assert self._loop is not None  # nosec
+        asyncio.set_event_loop(self._loop)
+        app = web.Application(client_max_size=64 * 1024 ** 2)
+        app.router.add_route('*', '/api/{name}', self._handle)
+        app.router.add_route('*', '/api/{name}/{id}', self._handle)
+        self._runner = web.AppRunner(app, access_log=None)
+        self._loop.run_until_complete(self._runner.setup())
+        site = web.TCPSite(self._runner, self.host, self.port)
+        self._loop.run_until_complete(site.start())
+        self.port = self._runner.addresses[0][1]
+        started.set()
+        self._loop.run_forever()
+
+    async def _handle(self, request: web.Request) -> web.Response:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        collection = self.collections.setdefault(request.match_info['name'], _Collection())
+        entry_id = request.match_info.get('id')
+        if entry_id is None and request.method == 'GET':
+            return self._list(collection, parse_query(request.query_string))
+        if entry_id is None and request.method == 'POST':
+            body = await request.json()
+            row = self._make_row(collection.next_id, body['data'])
+            collection.put(row)
+            return self._entry_response(collection, row['id'])
+        if entry_id is None or int(entry_id) not in collection.rows:
+            error = {'status': 404, 'name': 'NotFoundError', 'message': 'Not Found', 'details': {}}
+            return web.json_response({'data': None, 'error': error}, status=404)
+        row = collection.rows[int(entry_id)]
+        if request.method == 'PUT':
+            body = await request.json()
+            collection.put({'id': row['id'], 'attributes': {**row['attributes'], **body['data']}})
+        response = self._entry_response(collection, row['id'])
+        if request.method == 'DELETE':
+            collection.delete(row['id'])
+        return response
+
+    @staticmethod
+    def _entry_response(collection: _Collection, entry_id: int) -> web.Response:
+        body = b'{"data":' + collection.encoded[entry_id] + b',"meta":{}}'
+        return web.Response(body=body, content_type='application/json')
+
+    def _cap(self, limit: int) -> int:
+        return min(limit, self.max_limit) if self.max_limit else limit
+
+    def _list(self, collection: _Collection, query: dict) -> web.Response:
+        ids = collection.select(query.get('filters', {}), query.get('sort', 'id'))
+        pagination = query.get('pagination', {})
+        with_count = pagination.get('withCount', 'true') == 'true'
+        if 'start' in pagination or 'limit' in pagination:
+            start, limit = int(pagination.get('start', 0)), self._cap(int(pagination.get('limit', 25)))
+            meta: dict = {'start': start, 'limit': limit}
+        else:
+            page, page_size = int(pagination.get('page', 1)), self._cap(int(pagination.get('pageSize', 25)))
+            start, limit = (page - 1) * page_size, page_size
+            meta = {'page': page, 'pageSize': page_size}
+            if with_count:
+                meta['pageCount'] = -(-len(ids) // page_size)
+        if with_count:
+            meta['total'] = len(ids)
+        data = b','.join(collection.encoded[i] for i in ids[start:start + limit])
+        body = b'{"data":[' + data + b'],"meta":{"pagination":' + json.dumps(meta).encode() + b'}}'
+        return web.Response(body=body, content_type='application/json')
@@ -1,8 +1,13 @@
 from . import errors
+from .cache import CachingConnector, CachingConnectorSync
 from .connector import Connector
 from .connector_sync import ConnectorSync
 from .help import aiohttp_helpers, helpers, requests_helpers
-from .parameters import Filter, PublicationState
+from .limiters import AdaptiveConcurrencyLimiter, TokenBucket
+from .metrics import RequestMetrics
+from .parameters import Filter, PaginationStrategy, PublicationState
+from .query import Query
+from .retry import RetryPolicy
 from .strapi_client import StrapiClient
 from .strapi_client_sync import StrapiClientSync
 
@@ -10,6 +15,8 @@ __all__ = [
     'errors',
     'StrapiClient', 'StrapiClientSync',
     'ConnectorSync', 'Connector',
+    'CachingConnector', 'CachingConnectorSync',
     'aiohttp_helpers', 'helpers', 'requests_helpers',
-    'Filter', 'PublicationState',
+    'Filter', 'PaginationStrategy', 'PublicationState', 'Query',
+    'RetryPolicy', 'TokenBucket', 'AdaptiveConcurrencyLimiter', 'RequestMetrics',
 ]
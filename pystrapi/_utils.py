@@ -1,4 +1,11 @@
-from typing import Any, Callable, Coroutine, TypeVar, Union
+import asyncio
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from functools import partial
+from itertools import islice
+from typing import (Any, AsyncIterator, Awaitable, Callable, Coroutine, Dict, Iterable, Iterator, List, Set, Tuple,
+                    TypeVar, Union)
+
+from .limiters import AdaptiveConcurrencyLimiter, ConcurrencyLimit
 
 
 V = TypeVar('V')
@@ -59,3 +66,118 @@ async def run_async_safe(func: Callable[[], Coroutine[Any, Any, V]], default: D)
         return await func()
     except Exception:
         return default
+
+
+def _check_limit(limit: int) -> int:
+    if limit < 1:
+        raise ValueError(f'max_concurrency must be at least 1, got {limit}')
+    return limit
+
+
+def get_limit(limit: ConcurrencyLimit) -> int:
+    """Return the current number of calls allowed at a time. Raise ValueError if a fixed limit is below 1."""
+    return limit.limit if isinstance(limit, AdaptiveConcurrencyLimiter) else _check_limit(limit)
+
+
+def get_max_limit(limit: ConcurrencyLimit) -> int:
+    """Return the max number of calls allowed at a time, like the size of a thread pool.
+
+    Raise ValueError if a fixed limit is below 1.
+    """
+    return limit.max_limit if isinstance(limit, AdaptiveConcurrencyLimiter) else _check_limit(limit)
+
+
+def tracked(func: Callable[[], V], limit: ConcurrencyLimit) -> Callable[[], V]:
+    """Wrap `func` to report its latency and errors to the limiter, if `limit` is adaptive."""
+    return partial(limit.track, func) if isinstance(limit, AdaptiveConcurrencyLimiter) else func
+
+
+def tracked_async(func: Callable[[], Awaitable[V]], limit: ConcurrencyLimit) -> Callable[[], Awaitable[V]]:
+    """Wrap async `func` to report its latency and errors to the limiter, if `limit` is adaptive."""
+    return partial(limit.track_async, func) if isinstance(limit, AdaptiveConcurrencyLimiter) else func
+
+
+async def _indexed_async(index: int, func: Callable[[], Awaitable[V]]) -> Tuple[int, V]:
+    return index, await func()
+
+
+def _indexed(index: int, func: Callable[[], V]) -> Tuple[int, V]:
+    return index, func()
+
+
+async def gather_limited(funcs: Iterable[Callable[[], Awaitable[V]]], limit: ConcurrencyLimit) -> List[V]:
+    """Run async functions concurrently, at most `limit` at a time, and return the results in order.
+
+    If one of the functions fails, cancel the others and raise its exception.
+    """
+    funcs = list(funcs)
+    results: Dict[int, V] = {}
+    async for index, result in iter_limited(
+        (partial(_indexed_async, index, func) for index, func in enumerate(funcs)), limit
+    ):
+        results[index] = result
+    return [results[index] for index in range(len(funcs))]
+
+
+def map_threaded(funcs: Iterable[Callable[[], V]], max_workers: ConcurrencyLimit) -> List[V]:
+    """Run functions in a pool of `max_workers` threads and return the results in order.
+
+    If one of the functions fails, cancel the pending ones and raise its exception.
+    """
+    funcs = list(funcs)
+    if get_max_limit(max_workers) <= 1 or len(funcs) <= 1:
+        return [func() for func in funcs]
+    results: Dict[int, V] = {}
+    for index, result in iter_threaded(
+        (partial(_indexed, index, func) for index, func in enumerate(funcs)), max_workers
+    ):
+        results[index] = result
+    return [results[index] for index in range(len(funcs))]
+
+
+async def iter_limited(funcs: Iterable[Callable[[], Awaitable[V]]], limit: ConcurrencyLimit) -> AsyncIterator[V]:
+    """Run async functions concurrently, at most `limit` at a time, and yield the results as they complete.
+
+    The functions are taken from `funcs` lazily, so it can be a long generator.
+    An adaptive `limit` is read again each time a function completes.
+    If one of the functions fails, cancel the others and raise its exception.
+    """
+    funcs_iter = iter(funcs)
+    pending: Set['asyncio.Future[V]'] = set()
+    try:
+        while True:
+            for func in islice(funcs_iter, max(get_limit(limit) - len(pending), 0)):
+                pending.add(asyncio.ensure_future(func()))
+            if not pending:
+                return
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                yield task.result()
+    finally:
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+
+
+def iter_threaded(funcs: Iterable[Callable[[], V]], max_workers: ConcurrencyLimit) -> Iterator[V]:
+    """Run functions in a pool of `max_workers` threads and yield the results as they complete.
+
+    The functions are taken from `funcs` lazily, so it can be a long generator.
+    With an adaptive limiter, the pool has `max_limit` threads, and the current limit is read
+    again each time a function completes.
+    """
+    funcs_iter = iter(funcs)
+    pending: Set['Future[V]'] = set()
+    with ThreadPoolExecutor(max_workers=get_max_limit(max_workers)) as executor:
+        try:
+            while True:
+                for func in islice(funcs_iter, max(get_limit(max_workers) - len(pending), 0)):
+                    pending.add(executor.submit(func))
+                if not pending:
+                    return
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+        finally:
+            for future in pending:
+                future.cancel()
@@ -0,0 +1,274 @@
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Hashable, Mapping, Optional, cast
+
+import aiohttp
+import requests
+
+from .connector import Connector, DefaultConnector
+from .connector_sync import ConnectorSync, DefaultConnectorSync
+from .help import aiohttp_helpers, requests_helpers
+from .help.helpers import _get_request_key, get_plural_api_id
+from .help.json_helpers import JsonLoads, get_json_loads
+
+
+@dataclass
+class CacheEntry:
+    status: int
+    reason: Optional[str]
+    headers: Mapping[str, str]
+    data: Any
+    expires_at: float
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+
+
+@dataclass
+class CacheStats:
+    hits: int
+    misses: int
+    evictions: int
+    size: int
+    revalidations: int = 0
+    """Expired entries that the server confirmed as not modified (304)"""
+
+
+class ResponseCache:
+    """Thread-safe LRU cache of parsed responses, with expiration time per entry.
+
+    One cache can be shared by many connectors, async and sync.
+    """
+
+    def __init__(self, maxsize: int = 1024):
+        self.maxsize = maxsize
+        self._entries: 'OrderedDict[Hashable, CacheEntry]' = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._revalidations = 0
+
+    def get(self, key: Hashable) -> Optional[CacheEntry]:
+        """Return the entry of the key if it didn't expire, and count a hit or a miss."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry.expires_at <= time.monotonic():
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return entry
+
+    def get_stale(self, key: Hashable) -> Optional[CacheEntry]:
+        """Return the entry of the key even if it expired. Not counted as a hit or a miss."""
+        with self._lock:
+            return self._entries.get(key)
+
+    def refresh(self, key: Hashable, expires_at: float) -> None:
+        """Extend the expiration time of an entry that was revalidated."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry.expires_at = expires_at
+                self._entries.move_to_end(key)
+            self._revalidations += 1
+
+    def set(self, key: Hashable, entry: CacheEntry) -> None:
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    @property
+    def stats(self) -> CacheStats:
+        with self._lock:
+            return CacheStats(self._hits, self._misses, self._evictions, len(self._entries), self._revalidations)
+
+
+class _CachingConnectorBase:
+    def __init__(
+        self,
+        ttl: float,
+        endpoint_ttls: Optional[Mapping[str, float]],
+        maxsize: int,
+        cache: Optional[ResponseCache],
+        conditional: bool,
+        json_loads: Optional[JsonLoads],
+        api_url: Optional[str]
+    ):
+        self.ttl = ttl
+        self.endpoint_ttls = dict(endpoint_ttls or {})
+        self.cache = cache or ResponseCache(maxsize)
+        self.conditional = conditional
+        self.json_loads = json_loads or get_json_loads()
+        self.api_url = api_url or '/api/'
+
+    def _get_ttl(self, url: str) -> float:
+        return self.endpoint_ttls.get(get_plural_api_id(self.api_url, url), self.ttl)
+
+    def _is_cacheable(self, method: str, ttl: float) -> bool:
+        """Only GET requests are cached. With `conditional`, they are cached even if TTL is 0."""
+        return method.upper() == 'GET' and (ttl > 0 or self.conditional)
+
+    def _get_stale_entry(self, key: Hashable) -> Optional[CacheEntry]:
+        """Return an expired entry that can be revalidated with a conditional request."""
+        if not self.conditional:
+            return None
+        entry = self.cache.get_stale(key)
+        if entry is None or not (entry.etag or entry.last_modified):
+            return None
+        return entry
+
+    def _add_validators(self, reqargs: Optional[dict], entry: Optional[CacheEntry]) -> Optional[dict]:
+        """Add `If-None-Match` and `If-Modified-Since` headers of the entry to the request."""
+        if entry is None:
+            return reqargs
+        headers = dict((reqargs or {}).get('headers') or {})
+        if entry.etag:
+            headers['If-None-Match'] = entry.etag
+        if entry.last_modified:
+            headers['If-Modified-Since'] = entry.last_modified
+        return {**(reqargs or {}), 'headers': headers}
+
+    @staticmethod
+    def _remove_validators(reqargs: Optional[dict]) -> Optional[dict]:
+        """Remove conditional headers, so the server sends the data that is not cached."""
+        headers = (reqargs or {}).get('headers')
+        if not headers:
+            return reqargs
+        conditional = ('if-none-match', 'if-modified-since')
+        return {**(reqargs or {}), 'headers': {k: v for k, v in headers.items() if k.lower() not in conditional}}
+
+    def _store(self, key: Hashable, entry: CacheEntry, ttl: float) -> None:
+        if entry.status < 400 and (ttl > 0 or entry.etag or entry.last_modified):
+            self.cache.set(key, entry)
+
+
+class CachingConnector(_CachingConnectorBase, Connector):
+    """Connector that caches the parsed responses of GET requests of another connector.
+
+    Requests are identified by method, url, query parameters and auth header.
+    Cached entries expire after `ttl` seconds, or after the TTL in `endpoint_ttls` of the endpoint,
+    the first segment of the url path after `api_url` (like `{'pages': 600}`). Pass the API url of the
+    client as `api_url` if its path is not `/api/`.
+    The least recently used entries are evicted when there are more than `maxsize` entries.
+
+    With `conditional`, the `ETag` and `Last-Modified` validators of responses are kept, and an
+    expired entry is revalidated by sending `If-None-Match` and `If-Modified-Since` headers.
+    If the server answers 304 (Not Modified), the cached data is returned without downloading it again.
+    Use `ttl=0` to revalidate every request.
+
+    Cached data is shared between the callers, don't modify it.
+
+    Usage:
+    >>> connector = CachingConnector(ttl=5, endpoint_ttls={'settings': 600})
+    >>> client = StrapiClient(connector=connector)
+    >>> connector.cache.stats
+    CacheStats(hits=120, misses=3, evictions=0, size=3, revalidations=0)
+    >>> client = StrapiClient(connector=CachingConnector(ttl=0, conditional=True))
+    """
+
+    def __init__(
+        self,
+        connector: Optional[Connector] = None,
+        *,
+        ttl: float = 60,
+        endpoint_ttls: Optional[Mapping[str, float]] = None,
+        maxsize: int = 1024,
+        cache: Optional[ResponseCache] = None,
+        conditional: bool = False,
+        json_loads: Optional[JsonLoads] = None,
+        api_url: Optional[str] = None
+    ):
+        super().__init__(ttl, endpoint_ttls, maxsize, cache, conditional, json_loads, api_url)
+        self._connector = connector or DefaultConnector()
+
+    async def request(
+        self, method: str, url: str, *, reqargs: dict = None, session: aiohttp.ClientSession = None
+    ) -> aiohttp.ClientResponse:
+        ttl = self._get_ttl(url)
+        if not self._is_cacheable(method, ttl):
+            return await self._connector.request(method, url, reqargs=reqargs, session=session)
+        key = _get_request_key(method, url, reqargs)
+        entry = self.cache.get(key)
+        if entry is None:
+            stale = self._get_stale_entry(key)
+            response = await self._connector.request(
+                method, url, reqargs=self._add_validators(reqargs, stale), session=session)
+            if stale is not None and response.status == 304:
+                response.release()
+                self.cache.refresh(key, time.monotonic() + ttl)
+                entry = stale
+            else:
+                if response.status == 304:  # validators of the caller, there is no data to return
+                    response.release()
+                    response = await self._connector.request(
+                        method, url, reqargs=self._remove_validators(reqargs), session=session)
+                data = await aiohttp_helpers.load_response_json(response, f'send {method} to {url}', self.json_loads)
+                response.release()
+                entry = CacheEntry(
+                    response.status, response.reason, dict(response.headers), data, time.monotonic() + ttl,
+                    etag=response.headers.get('ETag'), last_modified=response.headers.get('Last-Modified'))
+                self._store(key, entry, ttl)
+        preloaded = aiohttp_helpers.PreloadedResponse(entry.status, entry.reason, entry.headers, entry.data)
+        return cast(aiohttp.ClientResponse, preloaded)
+
+
+class CachingConnectorSync(_CachingConnectorBase, ConnectorSync):
+    """Connector that caches the parsed responses of GET requests of another connector.
+
+    See `CachingConnector`.
+
+    Usage:
+    >>> connector = CachingConnectorSync(ttl=5, endpoint_ttls={'settings': 600})
+    >>> client = StrapiClientSync(connector=connector)
+    """
+
+    def __init__(
+        self,
+        connector: Optional[ConnectorSync] = None,
+        *,
+        ttl: float = 60,
+        endpoint_ttls: Optional[Mapping[str, float]] = None,
+        maxsize: int = 1024,
+        cache: Optional[ResponseCache] = None,
+        conditional: bool = False,
+        json_loads: Optional[JsonLoads] = None,
+        api_url: Optional[str] = None,
+    ):
+        super().__init__(ttl, endpoint_ttls, maxsize, cache, conditional, json_loads, api_url)
+        self._connector = connector or DefaultConnectorSync()
+
+    def request(
+        self, method: str, url: str, *, reqargs: dict = None, session: requests.Session = None
+    ) -> requests.Response:
+        ttl = self._get_ttl(url)
+        if not self._is_cacheable(method, ttl):
+            return self._connector.request(method, url, reqargs=reqargs, session=session)
+        key = _get_request_key(method, url, reqargs)
+        entry = self.cache.get(key)
+        if entry is None:
+            stale = self._get_stale_entry(key)
+            response = self._connector.request(
+                method, url, reqargs=self._add_validators(reqargs, stale), session=session)
+            if stale is not None and response.status_code == 304:
+                self.cache.refresh(key, time.monotonic() + ttl)
+                entry = stale
+            else:
+                if response.status_code == 304:  # validators of the caller, there is no data to return
+                    response = self._connector.request(
+                        method, url, reqargs=self._remove_validators(reqargs), session=session)
+                data = requests_helpers.load_response_json(response, f'send {method} to {url}', self.json_loads)
+                entry = CacheEntry(
+                    response.status_code, response.reason, dict(response.headers), data, time.monotonic() + ttl,
+                    etag=response.headers.get('ETag'), last_modified=response.headers.get('Last-Modified'))
+                self._store(key, entry, ttl)
+        return requests_helpers.PreloadedResponse(entry.status, entry.reason, entry.headers, entry.data)
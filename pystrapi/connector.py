@@ -1,10 +1,15 @@
+import asyncio
 from abc import abstractmethod
-from typing import Any, Protocol
+from typing import Any, Dict, Hashable, Optional, Protocol, Sequence
 import aiohttp
 
 from .errors import StrapiError
 from .help import aiohttp_helpers
-from .help.helpers import raise_for_strapi_response
+from .help.helpers import _get_request_key, raise_for_strapi_response
+from .help.json_helpers import JsonDumps, JsonLoads, encode_json_body, get_json_loads
+from .limiters import TokenBucket, _observe_retry
+from .metrics import Instruments, RequestHook, RequestMetrics, ResponseHook
+from .retry import RetryPolicy
 
 
 class Connector(Protocol):
@@ -44,6 +49,20 @@ class ConnectorWrapper:
     """Wrapper around the connector.
     - Send requests using the connector.
     - Parse response as json.
+    - If `coalesce_gets` is True, concurrent identical GET requests (same url, params and auth)
+      share one in-flight request and all get its result. The result is shared, don't modify it.
+
+    Responses are parsed with `json_loads`, by default of the fastest installed json library (orjson, ujson or json).
+    `json` request bodies are passed to the connector as they are, unless `json_dumps` is given:
+    then they are encoded with it and sent as `data` with a json Content-Type.
+
+    Failed requests are retried according to `retry_policy`, if given.
+    Every request (and retry) waits for `rate_limiter`, if given.
+    The errors of retried attempts are reported to the `AdaptiveConcurrencyLimiter` tracking the call, if any.
+
+    Each attempt calls the `on_request` hooks with a `RequestInfo` before it is sent, and the `on_response` hooks
+    with a `ResponseInfo` (status, latency, decode time, size or error) after it, and is counted in `metrics`.
+    The hooks can be changed later in `instruments`.
 
     Exceptions:
     - Exceptions from the connector
@@ -51,19 +70,85 @@ class ConnectorWrapper:
     - Strapi exceptions from `raise_for_response`
     """
 
-    def __init__(self, api_url: str, connector: Connector):
+    def __init__(
+        self,
+        api_url: str,
+        connector: Connector,
+        coalesce_gets: bool = False,
+        json_loads: Optional[JsonLoads] = None,
+        json_dumps: Optional[JsonDumps] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        rate_limiter: Optional[TokenBucket] = None,
+        on_request: Sequence[RequestHook] = (),
+        on_response: Sequence[ResponseHook] = (),
+        metrics: Optional[RequestMetrics] = None
+    ):
         self.api_url = api_url
         self._connector = connector
+        self.coalesce_gets = coalesce_gets
+        self.json_loads = json_loads or get_json_loads()
+        self.json_dumps = json_dumps
+        self.retry_policy = retry_policy
+        self.rate_limiter = rate_limiter
+        self.instruments = Instruments(api_url, on_request, on_response, metrics)
+        self._in_flight: Dict[Hashable, 'asyncio.Future[Any]'] = {}
 
     async def _request(
         self, method: str, endpoint: str, *, reqargs: dict = None, session: aiohttp.ClientSession = None
     ) -> Any:
         url = self.api_url + endpoint
+        if not (self.coalesce_gets and method == 'GET'):
+            return await self._send(method, url, reqargs, session)
+        key = _get_request_key(method, url, reqargs)
+        task = self._in_flight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._send(method, url, reqargs, session))
+            self._in_flight[key] = task
+            task.add_done_callback(lambda t: self._on_in_flight_done(key, t))
+        return await asyncio.shield(task)
+
+    def _on_in_flight_done(self, key: Hashable, task: 'asyncio.Future[Any]') -> None:
+        self._in_flight.pop(key, None)
+        if not task.cancelled():
+            task.exception()  # mark as retrieved, the waiters get it from `shield`
+
+    async def _send(
+        self, method: str, url: str, reqargs: Optional[dict], session: Optional[aiohttp.ClientSession]
+    ) -> Any:
+        """Send request, retry according to the retry policy."""
+        attempt = 1
+        while True:
+            try:
+                return await self._send_once(method, url, reqargs, session, attempt)
+            except StrapiError as e:
+                if self.retry_policy is None or not self.retry_policy.should_retry(method, e, attempt):
+                    raise
+                delay = self.retry_policy.get_delay(e, attempt)
+                _observe_retry(e, delay)
+                await asyncio.sleep(delay)
+                attempt += 1
+
+    async def _send_once(
+        self, method: str, url: str, reqargs: Optional[dict], session: Optional[aiohttp.ClientSession],
+        attempt: int = 1
+    ) -> Any:
+        if self.rate_limiter is not None:
+            await self.rate_limiter.acquire_async()
         action = f'send {method} to {url}'
-        response = await self._connector.request(method, url, reqargs=reqargs, session=session)
-        data = await aiohttp_helpers.load_response_json(response, action)
-        response.release()
-        raise_for_strapi_response(data, response.status, action)
+        if self.json_dumps is not None:
+            reqargs = encode_json_body(reqargs, self.json_dumps)
+        timer = self.instruments.start(method, url, attempt)
+        try:
+            response = await self._connector.request(method, url, reqargs=reqargs, session=session)
+            timer.received(response.status, response.headers)
+            data = await aiohttp_helpers.load_response_json(response, action, self.json_loads)
+            response.release()
+            timer.decoded()
+            raise_for_strapi_response(data, response.status, action, response.headers)
+        except StrapiError as e:
+            timer.finish(e)
+            raise
+        timer.finish()
         return data
 
     async def get(self, endpoint: str, *, reqargs: dict = None, session: aiohttp.ClientSession = None) -> Any:
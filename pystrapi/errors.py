@@ -1,5 +1,17 @@
+from typing import Optional
+
+
 class StrapiError(Exception):
-    pass
+    """Base exception of pystrapi.
+
+    `status_code` is the HTTP status of the failed response, if any.
+    `retry_after` is the delay in seconds from the `Retry-After` response header, if any.
+    """
+
+    def __init__(self, *args: object, status_code: Optional[int] = None, retry_after: Optional[float] = None):
+        super().__init__(*args)
+        self.status_code = status_code
+        self.retry_after = retry_after
 
 
 class JsonParsingError(StrapiError):
@@ -0,0 +1,365 @@
+"""Export collections to files, page by page, with a bounded number of rows in memory.
+
+Usage from the command line:
+
+    pystrapi-export http://localhost:1337/api/ posts posts.parquet --token $TOKEN --batch-size 500
+"""
+import argparse
+import asyncio
+import csv
+import importlib
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from types import TracebackType
+from typing import IO, Any, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple, Type, Union
+
+from .help.json_helpers import JsonDumps, get_json_dumps
+from .models import _get_attribute_types
+from .strapi_client import StrapiClient
+from .strapi_client_sync import StrapiClientSync
+from .types import StrapiResponseEntryData
+
+FORMATS = ('parquet', 'arrow', 'csv', 'ndjson')
+_SUFFIXES = {'.parquet': 'parquet', '.arrow': 'arrow', '.feather': 'arrow', '.csv': 'csv', '.ndjson': 'ndjson',
+             '.jsonl': 'ndjson'}
+
+
+def _import_pyarrow() -> Any:
+    try:
+        return importlib.import_module('pyarrow')
+    except ImportError as e:
+        raise ImportError(
+            'pyarrow is required to export to parquet or arrow, install it or export to csv or ndjson') from e
+
+
+def get_file_format(path: Union[str, Path], file_format: Optional[str] = None) -> str:
+    """Return the given format, or the format of the file suffix."""
+    file_format = file_format or _SUFFIXES.get(Path(path).suffix.lower())
+    if file_format not in FORMATS:
+        raise ValueError(f'Unknown export format of {path}, expected one of {FORMATS}')
+    return file_format
+
+
+def _to_row(entry: StrapiResponseEntryData) -> Dict[str, Any]:
+    return {'id': entry['id'], **entry['attributes']}
+
+
+def _to_json_text(value: Any, json_dumps: JsonDumps) -> str:
+    text = json_dumps(value)
+    return text.decode() if isinstance(text, bytes) else text
+
+
+def _to_cell(value: Any, json_dumps: JsonDumps) -> Any:
+    """Nested values (relations, components, json) are stored as json strings in the columnar formats."""
+    return _to_json_text(value, json_dumps) if isinstance(value, (dict, list)) else value
+
+
+Schema = Any
+"""Content type schema (the `schema.json` of a Strapi content type) or `pyarrow.Schema` of the exported columns"""
+
+
+def _get_schema_columns(schema: Schema) -> List[str]:
+    if isinstance(schema, Mapping):
+        return list(_get_attribute_types(schema))
+    return list(schema.names)
+
+
+def _get_arrow_schema(pa: Any, schema: Schema, columns: Optional[List[str]]) -> Tuple[Any, List[str]]:
+    """Return the arrow schema of the columns and the columns written as json.
+
+    Attributes of the Strapi types without a python type (json, relation, media, component) are json strings.
+    """
+    json_columns: List[str] = []
+    if isinstance(schema, Mapping):
+        arrow_types = {str: pa.string(), int: pa.int64(), float: pa.float64(), bool: pa.bool_()}
+        types = _get_attribute_types(schema)
+        json_columns = [name for name, field_type in types.items() if field_type not in arrow_types]
+        schema = pa.schema([(name, arrow_types.get(field_type, pa.string())) for name, field_type in types.items()])
+    if columns is None:
+        return schema, json_columns
+    missing = [name for name in columns if name not in schema.names]
+    if missing:
+        raise ValueError(f'Columns {missing} are not in the schema')
+    return pa.schema([schema.field(name) for name in columns]), [name for name in json_columns if name in columns]
+
+
+def _to_arrow_array(pa: Any, field: Any, values: List[Any]) -> Any:
+    """Convert the values of a column to its type, raise ValueError if a value doesn't fit."""
+    if pa.types.is_integer(field.type) and any(isinstance(v, float) for v in values):
+        raise ValueError(f'Column {field.name!r} of type {field.type} has float values')  # pyarrow would truncate
+    try:
+        return pa.array(values, type=field.type)
+    except (pa.ArrowInvalid, pa.ArrowTypeError) as e:
+        raise ValueError(f'Values of column {field.name!r} don\'t match its type {field.type}: {e}') from e
+
+
+class EntriesWriter:
+    """Write entries to a file as rows `{'id': ..., **attributes}`, buffering up to `buffer_size` rows.
+
+    The columns are `columns`, or the fields of `schema`, and other keys of the rows are dropped.
+    Without both, csv columns are the keys of the first buffered rows, and a row with another key raises ValueError.
+    ndjson rows are written as they are. Nested values are written as json strings in parquet, arrow and csv.
+
+    Parquet and arrow require `schema`, the content type schema (`schema.json`) or a `pyarrow.Schema`,
+    so the column types don't depend on the values of the first rows. A value that doesn't match the type of its
+    column raises ValueError. An export without entries writes a file with the header or schema only.
+    Nested values are encoded with `json_dumps`, by default of the fastest installed json library.
+
+    The rows are written to `<path>.part`, that is moved to `path` when the writer is closed.
+    If the `with` block raises, or the writer is aborted, the partial file is removed and `path` is left as it was.
+
+    Usage:
+    >>> schema = json.load(open('src/api/post/content-types/post/schema.json'))
+    >>> with EntriesWriter('posts.parquet', schema=schema, buffer_size=5000) as writer:
+    ...     for entry in sync_client.iter_entries('posts', batch_size=500):
+    ...         writer.write(entry)
+    """
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        file_format: Optional[str] = None,
+        *,
+        columns: Optional[List[str]] = None,
+        schema: Optional[Schema] = None,
+        buffer_size: int = 10000,
+        json_dumps: Optional[JsonDumps] = None
+    ):
+        self.path = Path(path)
+        self._part_path = self.path.with_name(self.path.name + '.part')
+        self.file_format = get_file_format(path, file_format)
+        self.buffer_size = buffer_size
+        self.rows_written = 0
+        self._json_dumps = json_dumps or get_json_dumps()
+        self._buffer: List[Dict[str, Any]] = []
+        self._infer_columns = columns is None and schema is None
+        self._pyarrow: Any = None
+        self._schema: Any = None
+        self._json_columns: List[str] = []
+        if self.file_format in ('parquet', 'arrow'):
+            if schema is None:
+                raise ValueError(f'Export to {self.file_format} requires the schema of the content type')
+            self._pyarrow = _import_pyarrow()
+            self._schema, self._json_columns = _get_arrow_schema(self._pyarrow, schema, columns)
+            columns = list(self._schema.names)
+        elif columns is None and schema is not None:
+            columns = _get_schema_columns(schema)
+        self.columns = columns
+        self._file: Optional[IO[Any]] = None
+        self._writer: Any = None
+        self._closed = False
+
+    def __enter__(self) -> 'EntriesWriter':
+        return self
+
+    def __exit__(
+        self, exc_type: Optional[Type[BaseException]], exc: Optional[BaseException], tb: Optional[TracebackType]
+    ) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+    def write(self, entry: StrapiResponseEntryData) -> None:
+        self._buffer.append(_to_row(entry))
+        if len(self._buffer) >= self.buffer_size:
+            self.flush()
+
+    def flush(self) -> None:
+        """Write the buffered rows to the file."""
+        if not self._buffer:
+            return
+        if self.file_format == 'csv' and self._infer_columns:
+            self._check_columns()
+        self._open()
+        if self.file_format == 'ndjson':
+            self._write_ndjson()
+        elif self.file_format == 'csv':
+            self._writer.writerows({k: _to_cell(v, self._json_dumps) for k, v in row.items()} for row in self._buffer)
+        else:
+            self._write_arrow()
+        self.rows_written += len(self._buffer)
+        self._buffer = []
+
+    def close(self) -> None:
+        """Write the buffered rows, close the file and move it to `path`. The file is written even if there are no rows.
+
+        If writing fails, the partial file is removed.
+        """
+        if self._closed:
+            return
+        self._closed = True
+        try:
+            self.flush()
+            self._open()
+            self._close_file()
+        except BaseException:
+            self._remove_file()
+            raise
+        os.replace(self._part_path, self.path)
+
+    def abort(self) -> None:
+        """Close and remove the partial file without writing the buffered rows, `path` is left as it was."""
+        if self._closed:
+            return
+        self._closed = True
+        self._remove_file()
+
+    def _close_file(self) -> None:
+        try:
+            if self._pyarrow is not None and self._writer is not None:
+                self._writer.close()  # parquet and arrow writers own their file
+        finally:
+            if self._file is not None:
+                self._file.close()
+            self._writer = self._file = None
+
+    def _remove_file(self) -> None:
+        try:
+            self._close_file()
+        finally:
+            self._part_path.unlink(missing_ok=True)
+
+    def _check_columns(self) -> None:
+        """Take the columns of the first buffered rows, raise ValueError if later rows have other keys."""
+        keys = list(dict.fromkeys(key for row in self._buffer for key in row))
+        if self.columns is None:
+            self.columns = keys
+            return
+        new_keys = [key for key in keys if key not in self.columns]
+        if new_keys:
+            raise ValueError(f'Keys {new_keys} are not columns of the file, pass `columns` or `schema`')
+
+    def _open(self) -> None:
+        if self._file is not None or self._writer is not None:
+            return
+        if self.file_format == 'ndjson':
+            self._file = open(self._part_path, 'wb')  # pylint: disable=consider-using-with
+        elif self.file_format == 'csv':
+            self._file = open(self._part_path, 'w', newline='', encoding='utf-8')  # pylint: disable=consider-using-with
+            self._writer = csv.DictWriter(self._file, self.columns or [], extrasaction='ignore')
+            if self.columns:
+                self._writer.writeheader()
+        elif self.file_format == 'parquet':
+            self._writer = importlib.import_module('pyarrow.parquet').ParquetWriter(str(self._part_path), self._schema)
+        else:
+            self._writer = self._pyarrow.ipc.new_file(str(self._part_path), self._schema)
+
+    def _write_ndjson(self) -> None:
+        assert self._file is not None  # nosec
+        for row in self._buffer:
+            line = self._json_dumps(row)
+            self._file.write((line.encode() if isinstance(line, str) else line) + b'\n')
+
+    def _write_arrow(self) -> None:
+        pa = self._pyarrow
+        arrays = []
+        for field in self._schema:
+            if field.name in self._json_columns:
+                values = [None if row.get(field.name) is None else _to_json_text(row[field.name], self._json_dumps)
+                          for row in self._buffer]
+            else:
+                values = [_to_cell(row.get(field.name), self._json_dumps) for row in self._buffer]
+            arrays.append(_to_arrow_array(pa, field, values))
+        self._writer.write_table(pa.Table.from_arrays(arrays, schema=self._schema))
+
+
+def _write_entries(writer: EntriesWriter, entries: Iterable[StrapiResponseEntryData]) -> None:
+    for entry in entries:
+        writer.write(entry)
+
+
+def export_entries_sync(
+    client: StrapiClientSync,
+    plural_api_id: str,
+    path: Union[str, Path],
+    file_format: Optional[str] = None,
+    *,
+    columns: Optional[List[str]] = None,
+    schema: Optional[Schema] = None,
+    buffer_size: int = 10000,
+    **iter_kwargs: Any
+) -> int:
+    """Export all entries of a collection to a file and return the number of rows.
+
+    The pages are streamed from `client.iter_entries` (that takes `iter_kwargs`, like `batch_size` and `filters`)
+    to the file, so only one page and `buffer_size` rows are in memory at a time.
+    The format is one of `FORMATS`, by default of the file suffix. Parquet and arrow require pyarrow and `schema`,
+    see `EntriesWriter`.
+
+    Usage:
+    >>> export_entries_sync(client, 'posts', 'posts.parquet', schema=schema, pagination_strategy='keyset')
+    """
+    with EntriesWriter(path, file_format, columns=columns, schema=schema, buffer_size=buffer_size) as writer:
+        for entry in client.iter_entries(plural_api_id, **iter_kwargs):
+            writer.write(entry)
+    return writer.rows_written
+
+
+async def export_entries(
+    client: StrapiClient,
+    plural_api_id: str,
+    path: Union[str, Path],
+    file_format: Optional[str] = None,
+    *,
+    columns: Optional[List[str]] = None,
+    schema: Optional[Schema] = None,
+    buffer_size: int = 10000,
+    **iter_kwargs: Any
+) -> int:
+    """Export all entries of a collection to a file and return the number of rows. See `export_entries_sync`.
+
+    The pages are streamed from `client.iter_pages`, and written to the file in a thread, off the event loop.
+
+    Usage:
+    >>> await export_entries(client, 'posts', 'posts.csv', batch_size=500, prefetch=True)
+    """
+    writer = EntriesWriter(path, file_format, columns=columns, schema=schema, buffer_size=buffer_size)
+    loop = asyncio.get_running_loop()
+    with ThreadPoolExecutor(max_workers=1) as executor:  # one thread keeps the writes in order
+        try:
+            async for page in client.iter_pages(plural_api_id, **iter_kwargs):
+                await loop.run_in_executor(executor, _write_entries, writer, page['data'] or [])
+        except BaseException:
+            await loop.run_in_executor(executor, writer.abort)
+            raise
+        await loop.run_in_executor(executor, writer.close)
+    return writer.rows_written
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(prog='pystrapi-export', description='Export a Strapi collection to a file.')
+    parser.add_argument('api_url', help='Strapi API url, like http://localhost:1337/api/')
+    parser.add_argument('plural_api_id', help='Collection to export, like posts')
+    parser.add_argument('path', help='Output file, the format is of its suffix by default')
+    parser.add_argument('--format', choices=FORMATS)
+    parser.add_argument('--token', default=os.environ.get('STRAPI_TOKEN'),
+                        help='API token (default: $STRAPI_TOKEN)')
+    parser.add_argument('--schema', help='Content type schema.json of the collection, required by parquet and arrow')
+    parser.add_argument('--fields', help='Comma separated attributes to export')
+    parser.add_argument('--populate', help='Relations to populate, like *')
+    parser.add_argument('--filters', type=json.loads, help='Filters as json, like {"title": {"$eq": "a"}}')
+    parser.add_argument('--batch-size', type=int, default=100, help='Entries per page')
+    parser.add_argument('--buffer-size', type=int, default=10000, help='Rows to buffer before writing')
+    parser.add_argument('--pagination-strategy', choices=('page', 'keyset'), default='page')
+    args = parser.parse_args(argv)
+    if get_file_format(args.path, args.format) in ('parquet', 'arrow') and not args.schema:
+        parser.error('--schema is required to export to parquet or arrow')
+
+    fields = args.fields.split(',') if args.fields else None
+    schema = None
+    if args.schema:
+        with open(args.schema, encoding='utf-8') as f:
+            schema = json.load(f)
+    with StrapiClientSync(api_url=args.api_url, token=args.token) as client:
+        count = export_entries_sync(
+            client, args.plural_api_id, args.path, args.format, columns=['id', *fields] if fields else None,
+            schema=schema, buffer_size=args.buffer_size, fields=fields, populate=args.populate, filters=args.filters,
+            batch_size=args.batch_size, pagination_strategy=args.pagination_strategy)
+    print(f'Exported {count} entries to {args.path}')
+
+
+if __name__ == '__main__':
+    main()
@@ -1,21 +1,56 @@
 import aiohttp
-from typing import Any
+import json
+from typing import Any, Mapping, Optional, Union
 
 from pystrapi._utils import run_async_safe
 from pystrapi.errors import JsonParsingError
 from pystrapi.help import helpers
+from pystrapi.help.json_helpers import JsonLoads
 
 
-async def load_response_json(response: aiohttp.ClientResponse, action: str) -> Any:
+class PreloadedResponse:
+    """Stand-in for `aiohttp.ClientResponse` with an already parsed json body.
+
+    Returned by connectors that answer without reading a real response, like `CachingConnector`.
+    """
+
+    def __init__(self, status: int, reason: Optional[str], headers: Mapping[str, str], data: Any):
+        self.status = status
+        self.reason = reason
+        self.headers = headers
+        self.data = data
+
+    async def json(self, **kwargs: Any) -> Any:
+        return self.data
+
+    async def text(self) -> str:
+        return json.dumps(self.data)
+
+    def release(self) -> None:
+        pass
+
+
+async def load_response_json(
+    response: Union[aiohttp.ClientResponse, PreloadedResponse], action: str, loads: Optional[JsonLoads] = None
+) -> Any:
+    """Parse response body as json, with `loads` if given."""
+    if isinstance(response, PreloadedResponse):
+        return response.data
     try:
-        return await response.json()
+        if loads is None:
+            return await response.json()
+        body = await response.read()
+        return loads(body) if body.strip() else None
     except Exception as e:
         text = await run_async_safe(response.text, response.reason)
-        raise JsonParsingError(f'Unable to {action}, status code: {response.status}, response: {text}') from e
+        raise JsonParsingError(
+            f'Unable to {action}, status code: {response.status}, response: {text}', status_code=response.status) from e
 
 
-async def raise_for_response(response: aiohttp.ClientResponse, action: str) -> None:
+async def raise_for_response(
+    response: aiohttp.ClientResponse, action: str, loads: Optional[JsonLoads] = None
+) -> None:
     """Raise suitable Strapi exception if response status code is above (or equal to) 400."""
     if response.status >= 400:
-        data = await load_response_json(response, action)
-        helpers.raise_for_strapi_response(data, response.status, action)
+        data = await load_response_json(response, action, loads)
+        helpers.raise_for_strapi_response(data, response.status, action, response.headers)
@@ -1,4 +1,10 @@
-from typing import Any, Dict, Iterator, List, Mapping, Optional, Tuple, Type, Union
+import hashlib
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from enum import Enum
+from typing import (Any, Dict, Hashable, Iterable, Iterator, List, Literal, Mapping, Optional, Set, Tuple, Type, Union,
+                    overload)
+from urllib.parse import quote, urlencode, urlsplit
 
 from pystrapi.errors import (
     ForbiddenError,
@@ -9,11 +15,14 @@ from pystrapi.errors import (
     ValidationError
 )
 from pystrapi.types import (
+    Entry,
+    StrapiEntriesResponse,
     StrapiEntryOrEntriesResponse,
     StrapiResponseMessage,
     StrapiResponse,
     StrapiResponseEntryData,
     StrapiResponseError,
+    StrapiResponseMeta,
     StrapiResponseMetaPagination
 )
 
@@ -22,8 +31,23 @@ def _add_id_to_attributes(entry: StrapiResponseEntryData) -> Dict[str, Any]:
     return {'id': entry['id'], **entry['attributes']}
 
 
-def process_data(response: Union[Mapping, dict]) -> Union[dict, List[dict]]:
+@overload
+def process_data(response: Union[Mapping, dict], lazy: Literal[False] = False) -> Union[dict, List[dict]]: ...
+
+
+@overload
+def process_data(response: Union[Mapping, dict], lazy: Literal[True]) -> Union[Entry, List[Entry]]: ...
+
+
+@overload
+def process_data(response: Union[Mapping, dict], lazy: bool) -> Union[dict, List[dict], Entry, List[Entry]]: ...
+
+
+def process_data(
+    response: Union[Mapping, dict], lazy: bool = False
+) -> Union[dict, List[dict], Entry, List[Entry]]:
     """Process response with entries.
+    With `lazy`, return `Entry` views of the entries instead of copying their attributes to new dicts.
 
     Usage:
     >>> process_data(sync_client.get_entry('posts', 1))
@@ -34,17 +58,40 @@ def process_data(response: Union[Mapping, dict]) -> Union[dict, List[dict]]:
         {'id': 1, 'name': 'post1', 'description': '...'},
         {'id': 2, 'name': 'post2', 'description': '...'},
     ]
+
+    >>> process_data(sync_client.get_entries('posts'), lazy=True)[0]['name']
+    'post1'
     """
     response: StrapiEntryOrEntriesResponse = response  # type: ignore
     if not response['data']:
         return []
     data = response['data']
+    if lazy:
+        return [Entry(d) for d in data] if isinstance(data, list) else Entry(data)
     if isinstance(data, list):
         return [_add_id_to_attributes(d) for d in data]
     else:
         return _add_id_to_attributes(data)
 
 
+def iter_data(response: Union[Mapping, dict]) -> Iterator[Entry]:
+    """Iterate over `Entry` views of the entries of response, one at a time.
+
+    Usage:
+    >>> for entry in iter_data(sync_client.get_entries('posts', get_all=True)):
+    ...     print(entry['name'])
+    """
+    response: StrapiEntryOrEntriesResponse = response  # type: ignore
+    data = response['data']
+    if not data:
+        return
+    if isinstance(data, list):
+        for d in data:
+            yield Entry(d)
+    else:
+        yield Entry(data)
+
+
 def process_response(response: Union[Mapping, dict]) -> Tuple[Union[dict, List[dict]], StrapiResponseMetaPagination]:
     """Process response with entries."""
     response: StrapiEntryOrEntriesResponse = response  # type: ignore
@@ -65,16 +112,204 @@ def _stringify_parameters(name: str, parameters: Union[str, Mapping, List[str],
         return {}
 
 
-def _flatten_parameters(parameters: dict) -> Iterator[Tuple[str, Any]]:
-    """Flatten parameters dict for query."""
-    for key, value in parameters.items():
-        if isinstance(value, dict):
+def _get_entries_parameters(
+    sort: Optional[List[str]] = None,
+    filters: Optional[dict] = None,
+    populate: Union[str, Mapping, List[str], None] = None,
+    fields: Optional[List[str]] = None,
+    pagination: Optional[Mapping] = None,
+    publication_state: Optional[str] = None,
+) -> Dict[str, Any]:
+    """Stringify all the query parameters of a get entries request."""
+    return {
+        **_stringify_parameters('sort', sort),
+        **_stringify_parameters('filters', filters),
+        **_stringify_parameters('pagination', pagination),
+        **_stringify_parameters('populate', populate),
+        **_stringify_parameters('fields', fields),
+        **_stringify_parameters('publicationState', publication_state),
+    }
+
+
+def _encode_value(value: Any) -> str:
+    if isinstance(value, Enum):
+        value = value.value
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    return str(value)
+
+
+def _encode_parameters(params: Mapping[str, Any]) -> str:
+    """Encode stringified query parameters to a query string. Brackets and operators are kept readable."""
+    return urlencode([(k, _encode_value(v)) for k, v in params.items()], safe='[]$,:*', quote_via=quote)
+
+
+def _add_query_string(endpoint: str, query_string: str) -> str:
+    """Add an encoded query string to the endpoint. HTTP clients keep its escapes when they build the url,
+    while query string `params` would be encoded again.
+    """
+    return f'{endpoint}?{query_string}' if query_string else endpoint
+
+
+def _flatten_parameters(parameters: Union[dict, list]) -> Iterator[Tuple[str, Any]]:
+    """Flatten parameters dict for query. Lists are flattened with indexes, like `[$in][0]`.
+    Enum keys (like `Filter.eq`) are flattened by value, f-strings format them by name since Python 3.11.
+    Booleans are flattened to `true` and `false`, aiohttp doesn't accept them as query values.
+    """
+    items = parameters.items() if isinstance(parameters, dict) else enumerate(parameters)
+    for key, value in items:
+        key = _encode_value(key)
+        if isinstance(value, (dict, list)):
             for key1, value1 in _flatten_parameters(value):
                 yield f'[{key}]{key1}', value1
+        elif isinstance(value, bool):
+            yield f'[{key}]', _encode_value(value)
         else:
             yield f'[{key}]', value
 
 
+def _get_keyset_parameters(
+    filters: Optional[dict],
+    populate: Union[str, Mapping, List[str], None],
+    fields: Optional[List[str]],
+    publication_state: Optional[str],
+    keyset_field: str,
+    last_value: Any,
+    batch_size: int
+) -> Dict[str, Any]:
+    """Stringify the query parameters of the page of entries after `last_value` of `keyset_field`.
+
+    The entries are sorted by the field, and the user filters are combined with `$gt` on the last value.
+    The total count is not requested, see `_is_last_keyset_page`.
+    """
+    if last_value is not None:
+        after = {keyset_field: {'$gt': last_value}}
+        filters = {'$and': [filters, after]} if filters else after
+    if fields is not None and keyset_field != 'id' and keyset_field not in fields:
+        fields = [*fields, keyset_field]
+    pagination = {'start': 0, 'limit': batch_size, 'withCount': 'false'}
+    return _get_entries_parameters([f'{keyset_field}:asc'], filters, populate, fields, pagination, publication_state)
+
+
+def _is_last_page(res: StrapiEntriesResponse, first_pagination: StrapiResponseMetaPagination, page: int) -> bool:
+    """Return True if `page` is the last one, by the page count of the first page.
+
+    Without a page count, a page shorter than the page size of the first page is the last one. The requested
+    batch size can't tell it: Strapi caps the page size at its `maxLimit`.
+    """
+    page_count: Optional[int] = first_pagination.get('pageCount')  # a custom connector may not return it
+    if page_count is not None:
+        return page >= page_count
+    return len(res['data'] or []) < first_pagination['pageSize']
+
+
+def _is_last_keyset_page(res: StrapiEntriesResponse) -> bool:
+    """Return True if a keyset page is empty, or shorter than the limit in its meta.
+
+    Strapi caps the limit at its `maxLimit`, so the requested batch size can't tell the last page.
+    """
+    data = res['data'] or []
+    pagination: Mapping[str, Any] = res['meta'].get('pagination', {})  # start and limit of an offset page
+    limit = pagination.get('limit')
+    return not data or (limit is not None and len(data) < limit)
+
+
+def _get_page_meta(
+    res: StrapiEntriesResponse, first_pagination: StrapiResponseMetaPagination, page: int
+) -> StrapiResponseMeta:
+    """Return the meta of a page fetched without count, with `pageCount` and `total` from the first page."""
+    pagination: StrapiResponseMetaPagination = {**first_pagination, 'page': page}
+    return {**res['meta'], 'pagination': pagination}
+
+
+def _merge_keyset_pages(data: List[StrapiResponseEntryData], meta: StrapiResponseMeta) -> StrapiEntriesResponse:
+    """Return the entries of all keyset pages as one page, with the meta of the last page."""
+    pagination: StrapiResponseMetaPagination = {'page': 1, 'pageSize': len(data), 'pageCount': 1, 'total': len(data)}
+    return {'data': data, 'meta': {**meta, 'pagination': pagination}}
+
+
+def _check_keyset_pagination(sort: Optional[List[str]], max_concurrency: Any = 1, prefetch: bool = False) -> None:
+    """Raise ValueError for the arguments that keyset pagination doesn't support."""
+    if sort:
+        raise ValueError('Keyset pagination is sorted by `keyset_field`, `sort` is not supported')
+    if max_concurrency != 1 or prefetch:
+        raise ValueError('Keyset pagination fetches pages one after another, '
+                         '`max_concurrency` and `prefetch` are not supported')
+
+
+def _get_keys_filter(rows: List[dict], keys: List[str]) -> dict:
+    """Compose filters that match the entries of all the given rows by their keys."""
+    if len(keys) == 1:
+        key = keys[0]
+        return {key: {'$in': [row[key] for row in rows]}}
+    return {'$or': [{key: {'$eq': row[key]} for key in keys} for row in rows]}
+
+
+def _get_keyset_value(entry: StrapiResponseEntryData, keyset_field: str) -> Any:
+    return entry['id'] if keyset_field == 'id' else entry['attributes'][keyset_field]
+
+
+def _get_entry_keys_value(entry: StrapiResponseEntryData, keys: List[str]) -> Tuple[Any, ...]:
+    """Return the values of the keys of an entry from response."""
+    return tuple(entry['id'] if key == 'id' else entry['attributes'].get(key) for key in keys)
+
+
+def _index_entries_by_keys(entries: List[StrapiResponseEntryData], keys: List[str]) -> Dict[Tuple[Any, ...], List[int]]:
+    """Map keys values to the ids of the entries with these values."""
+    index: Dict[Tuple[Any, ...], List[int]] = {}
+    for entry in entries:
+        index.setdefault(_get_entry_keys_value(entry, keys), []).append(entry['id'])
+    return index
+
+
+def _has_unmatched_entries(index: Dict[Tuple[Any, ...], List[int]], rows: List[dict], keys: List[str]) -> bool:
+    """Tell if the server found entries whose keys values equal no row, e.g. by a case-insensitive collation."""
+    rows_keys = {tuple(row[key] for key in keys) for row in rows}
+    return any(entry_keys not in rows_keys for entry_keys in index)
+
+
+def _chunk_rows_by_keys(rows: Iterable[dict], keys: List[str], chunk_size: int) -> Iterator[List[Tuple[int, dict]]]:
+    """Split rows to chunks of `(index, row)`, with unique keys values in each chunk.
+
+    A row with the keys of an earlier row in the chunk starts a new chunk,
+    so it will be matched against the entry that the earlier row created.
+    """
+    chunk: List[Tuple[int, dict]] = []
+    chunk_keys: Set[Tuple[Any, ...]] = set()
+    for index, row in enumerate(rows):
+        row_keys = tuple(row[key] for key in keys)
+        if len(chunk) >= chunk_size or row_keys in chunk_keys:
+            yield chunk
+            chunk, chunk_keys = [], set()
+        chunk.append((index, row))
+        chunk_keys.add(row_keys)
+    if chunk:
+        yield chunk
+
+
+def get_plural_api_id(api_url: str, url: str) -> str:
+    """Return the first segment of the url path after the API url, like `posts` of `.../api/posts/1`."""
+    path = urlsplit(url).path
+    api_path = urlsplit(api_url).path
+    if path.startswith(api_path):
+        path = path[len(api_path):]
+    return path.strip('/').split('/', 1)[0]
+
+
+def _get_request_key(method: str, url: str, reqargs: Optional[dict]) -> Hashable:
+    """Compose a key that identifies a request by method, url, query parameters and auth identity.
+
+    The auth header is hashed, so the key doesn't hold the token itself.
+    """
+    reqargs = reqargs or {}
+    params = reqargs.get('params') or {}
+    if isinstance(params, Mapping):
+        params = tuple(sorted((str(k), str(v)) for k, v in params.items()))
+    auth = (reqargs.get('headers') or {}).get('Authorization')
+    auth_hash = hashlib.sha256(auth.encode()).hexdigest() if auth else None
+    return method.upper(), url, params, auth_hash
+
+
 def get_response_messages(response: StrapiResponse) -> List[StrapiResponseMessage]:
     messages: List[StrapiResponseMessage] = []
     for messages_group in response.get('message', []):  # type: ignore
@@ -84,11 +319,37 @@ def get_response_messages(response: StrapiResponse) -> List[StrapiResponseMessag
     return messages
 
 
-def raise_for_strapi_response(response: StrapiResponse, status_code: int, action: str) -> None:
-    """Raise suitable Strapi exception if response status code is above (or equal to) 400."""
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parse `Retry-After` header, given in seconds or as HTTP date, to a delay in seconds."""
+    if not value:
+        return None
+    try:
+        return max(float(value), 0)
+    except ValueError:
+        pass
+    try:
+        date = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if date.tzinfo is None:
+        date = date.replace(tzinfo=timezone.utc)
+    return max((date - datetime.now(timezone.utc)).total_seconds(), 0)
+
+
+def raise_for_strapi_response(
+    response: StrapiResponse, status_code: int, action: str, headers: Optional[Mapping[str, str]] = None
+) -> None:
+    """Raise suitable Strapi exception if response status code is above (or equal to) 400.
+
+    The exception gets the status code, and the `Retry-After` delay if it is in `headers`.
+    """
     if status_code < 400:
         return
     message = f'Unable to {action}, status code: {status_code}, response: {response}'
+    retry_after = parse_retry_after(headers.get('Retry-After')) if headers else None
+    if not isinstance(response, Mapping):
+        response = {}  # type: ignore
+    exception_type: Type[StrapiError] = StrapiError
     error: Optional[StrapiResponseError] = response.get('error')
     if error:
         error_name: str = error['name']
@@ -97,12 +358,11 @@ def raise_for_strapi_response(response: StrapiResponse, status_code: int, action
             'InternalServerError': InternalServerError,
             'NotFoundError': NotFoundError,
             'ValidationError': ValidationError,
+            'RateLimitError': RatelimitError,
         }
-        if error_name in map_exceptions:
-            exception_type = map_exceptions[error_name]
-            raise exception_type(message)
-    messages = get_response_messages(response)
-    for msg in messages:
-        if 'ratelimit' in msg['id']:
-            raise RatelimitError(message)
-    raise StrapiError(message)
+        exception_type = map_exceptions.get(error_name, StrapiError)
+    if exception_type is StrapiError:
+        messages = get_response_messages(response)
+        if status_code == 429 or any('ratelimit' in msg['id'] for msg in messages):
+            exception_type = RatelimitError
+    raise exception_type(message, status_code=status_code, retry_after=retry_after)
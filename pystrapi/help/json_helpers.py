@@ -0,0 +1,42 @@
+import importlib
+import json
+from typing import Any, Callable, Optional, Union
+
+
+JsonLoads = Callable[[Union[str, bytes]], Any]
+JsonDumps = Callable[[Any], Union[str, bytes]]
+
+_FAST_JSON_MODULES = ['orjson', 'ujson']
+
+
+def _import_fast_json() -> Any:
+    for name in _FAST_JSON_MODULES:
+        try:
+            return importlib.import_module(name)
+        except ImportError:
+            continue
+    return None
+
+
+def get_json_loads() -> JsonLoads:
+    """Return the `loads` of the fastest installed json library: orjson, ujson or the standard json."""
+    module = _import_fast_json()
+    loads: JsonLoads = module.loads if module else json.loads
+    return loads
+
+
+def get_json_dumps() -> JsonDumps:
+    """Return the `dumps` of the fastest installed json library: orjson, ujson or the standard json."""
+    module = _import_fast_json()
+    dumps: JsonDumps = module.dumps if module else json.dumps
+    return dumps
+
+
+def encode_json_body(reqargs: Optional[dict], dumps: JsonDumps) -> Optional[dict]:
+    """Replace the `json` request argument with a body encoded by `dumps`."""
+    if not reqargs or reqargs.get('json') is None:
+        return reqargs
+    reqargs = dict(reqargs)
+    body = reqargs.pop('json')
+    headers = {**(reqargs.get('headers') or {}), 'Content-Type': 'application/json'}
+    return {**reqargs, 'data': dumps(body), 'headers': headers}
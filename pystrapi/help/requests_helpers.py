@@ -1,22 +1,49 @@
-from typing import Any
+from typing import Any, Mapping, Optional
 import requests
+from requests.structures import CaseInsensitiveDict
 
 from pystrapi.help import helpers
+from pystrapi.help.json_helpers import JsonLoads
 
 from pystrapi._utils import getattr_safe
 from pystrapi.errors import JsonParsingError
 
 
-def load_response_json(response: requests.Response, action: str) -> Any:
+class PreloadedResponse(requests.Response):
+    """`requests.Response` with an already parsed json body.
+
+    Returned by connectors that answer without reading a real response, like `CachingConnectorSync`.
+    """
+
+    def __init__(self, status_code: int, reason: Optional[str], headers: Mapping[str, str], data: Any):
+        super().__init__()
+        self.status_code = status_code
+        self.reason = reason or ''
+        self.headers = CaseInsensitiveDict(headers)
+        self.data = data
+        self._content = b''
+
+    def json(self, **kwargs: Any) -> Any:
+        return self.data
+
+
+def load_response_json(response: requests.Response, action: str, loads: Optional[JsonLoads] = None) -> Any:
+    """Parse response body as json, with `loads` if given."""
+    if isinstance(response, PreloadedResponse):
+        return response.data
     try:
-        return response.json()
+        if loads is None:
+            return response.json()
+        return loads(response.content)
     except Exception as e:
         text = getattr_safe(response, 'text', response.reason)
-        raise JsonParsingError(f'Unable to {action}, status code: {response.status_code}, response: {text}') from e
+        raise JsonParsingError(
+            f'Unable to {action}, status code: {response.status_code}, response: {text}',
+            status_code=response.status_code) from e
 
 
-def raise_for_response(response: requests.Response, action: str) -> None:
+def raise_for_response(response: requests.Response, action: str, loads: Optional[JsonLoads] = None) -> None:
     """Raise suitable Strapi exception if response status code is above (or equal to) 400."""
     if response.status_code >= 400:
-        data = load_response_json(response, action)
-        helpers.raise_for_strapi_response(data, response.status_code, action)
+        data = load_response_json(response, action, loads)
+        helpers.raise_for_strapi_response(data, response.status_code, action, response.headers)
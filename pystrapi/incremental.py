@@ -0,0 +1,222 @@
+"""Incremental sync of collections: get only the entries that changed since the last sync."""
+import json
+import os
+import sqlite3
+import threading
+from contextlib import closing, contextmanager
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Protocol, Union
+
+from .help.helpers import _is_last_keyset_page
+from .parameters import PublicationState
+from .strapi_client import StrapiClient
+from .strapi_client_sync import StrapiClientSync
+from .types import PaginationParameterByOffset, PopulationParameter, StrapiResponseEntryData
+
+
+@dataclass(frozen=True)
+class Watermark:
+    """Position of a sync: the entries are ordered by `updatedAt` and id, the last synced one is at the watermark."""
+
+    updated_at: str
+    last_id: int
+
+
+@dataclass
+class EntryChange:
+    """An entry that was created (`insert`) or updated (`update`) since the last sync."""
+
+    kind: str
+    """`insert` or `update`"""
+    entry: StrapiResponseEntryData
+
+
+class StateStore(Protocol):
+    """Storage of the watermark of each sync key."""
+
+    def get(self, key: str) -> Optional[Watermark]:
+        ...
+
+    def set(self, key: str, watermark: Watermark) -> None:
+        ...
+
+
+class MemoryStateStore:
+    """Keep the watermarks in memory, for syncs that don't outlive the process."""
+
+    def __init__(self) -> None:
+        self._watermarks: Dict[str, Watermark] = {}
+
+    def get(self, key: str) -> Optional[Watermark]:
+        return self._watermarks.get(key)
+
+    def set(self, key: str, watermark: Watermark) -> None:
+        self._watermarks[key] = watermark
+
+
+class FileStateStore:
+    """Keep the watermarks in a json file. The file is replaced atomically on each update."""
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+
+    def _read(self) -> Dict[str, dict]:
+        try:
+            data: Dict[str, dict] = json.loads(self.path.read_text(encoding='utf-8'))
+        except FileNotFoundError:
+            return {}
+        return data
+
+    def get(self, key: str) -> Optional[Watermark]:
+        with self._lock:
+            value = self._read().get(key)
+        return Watermark(**value) if value else None
+
+    def set(self, key: str, watermark: Watermark) -> None:
+        with self._lock:
+            data = self._read()
+            data[key] = asdict(watermark)
+            tmp_path = self.path.with_name(self.path.name + '.tmp')
+            tmp_path.write_text(json.dumps(data, indent=2), encoding='utf-8')
+            os.replace(tmp_path, self.path)
+
+
+class SQLiteStateStore:
+    """Keep the watermarks in a SQLite database, in table `pystrapi_watermarks`."""
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = str(path)
+        self._lock = threading.Lock()
+        with self._connect() as connection:
+            connection.execute(
+                'CREATE TABLE IF NOT EXISTS pystrapi_watermarks '
+                '(key TEXT PRIMARY KEY, updated_at TEXT NOT NULL, last_id INTEGER NOT NULL)')
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """Open a connection, commit its transaction (or roll it back on error) and close it."""
+        with closing(sqlite3.connect(self.path)) as connection, connection:
+            yield connection
+
+    def get(self, key: str) -> Optional[Watermark]:
+        with self._lock, self._connect() as connection:
+            row = connection.execute(
+                'SELECT updated_at, last_id FROM pystrapi_watermarks WHERE key = ?', (key,)).fetchone()
+        return Watermark(row[0], row[1]) if row else None
+
+    def set(self, key: str, watermark: Watermark) -> None:
+        with self._lock, self._connect() as connection:
+            connection.execute(
+                'INSERT INTO pystrapi_watermarks (key, updated_at, last_id) VALUES (?, ?, ?) '
+                'ON CONFLICT(key) DO UPDATE SET updated_at = excluded.updated_at, last_id = excluded.last_id',
+                (key, watermark.updated_at, watermark.last_id))
+
+
+def _get_changes_arguments(
+    filters: Optional[dict],
+    populate: Optional[PopulationParameter],
+    fields: Optional[List[str]],
+    publication_state: Optional[Union[str, PublicationState]],
+    watermark: Optional[Watermark],
+    batch_size: int
+) -> Dict[str, Any]:
+    """Return the `get_entries` arguments of the page of entries after the watermark, by `updatedAt` and id."""
+    if watermark is not None:
+        after: dict = {'$or': [
+            {'updatedAt': {'$gt': watermark.updated_at}},
+            {'updatedAt': {'$eq': watermark.updated_at}, 'id': {'$gt': watermark.last_id}},
+        ]}
+        filters = {'$and': [filters, after]} if filters else after
+    if fields is not None:
+        fields = list(dict.fromkeys([*fields, 'createdAt', 'updatedAt']))
+    pagination: PaginationParameterByOffset = {'start': 0, 'limit': batch_size, 'withCount': False}
+    return dict(
+        sort=['updatedAt:asc', 'id:asc'], filters=filters, populate=populate, fields=fields, pagination=pagination,
+        publication_state=publication_state)
+
+
+def _get_change(entry: StrapiResponseEntryData, watermark: Optional[Watermark]) -> EntryChange:
+    """An entry that was created after the watermark is an insert, otherwise it is an update."""
+    created_at = entry['attributes'].get('createdAt')
+    is_insert = watermark is None or created_at is None or created_at > watermark.updated_at
+    return EntryChange('insert' if is_insert else 'update', entry)
+
+
+def _get_watermark(entry: StrapiResponseEntryData) -> Watermark:
+    return Watermark(entry['attributes']['updatedAt'], entry['id'])
+
+
+async def iter_changes(
+    client: StrapiClient,
+    plural_api_id: str,
+    store: StateStore,
+    *,
+    key: Optional[str] = None,
+    filters: Optional[dict] = None,
+    populate: Optional[PopulationParameter] = None,
+    fields: Optional[List[str]] = None,
+    publication_state: Optional[Union[str, PublicationState]] = None,
+    batch_size: int = 100
+) -> AsyncIterator[EntryChange]:
+    """Iterate over the entries that were created or updated since the watermark in `store`.
+
+    The entries are requested in order of `updatedAt` and id, with filters after the watermark.
+    The watermark of `key` (`plural_api_id` by default) is saved after all the entries of a page are consumed,
+    so an entry may be yielded again if the iteration stops in the middle of a page, but no change is missed.
+    On the first sync, all the entries are inserts. Deleted entries can't be detected.
+
+    Usage:
+    >>> store = SQLiteStateStore('sync-state.db')
+    >>> async for change in iter_changes(client, 'posts', store, batch_size=500):
+    ...     mirror.upsert(change.entry) if change.kind == 'update' else mirror.insert(change.entry)
+    """
+    key = key or plural_api_id
+    since = watermark = store.get(key)
+    while True:
+        arguments = _get_changes_arguments(filters, populate, fields, publication_state, watermark, batch_size)
+        res = await client.get_entries(plural_api_id, **arguments)
+        data = res['data'] or []
+        for entry in data:
+            yield _get_change(entry, since)
+        if data:
+            watermark = _get_watermark(data[-1])
+            store.set(key, watermark)
+        if _is_last_keyset_page(res):
+            return
+
+
+def iter_changes_sync(
+    client: StrapiClientSync,
+    plural_api_id: str,
+    store: StateStore,
+    *,
+    key: Optional[str] = None,
+    filters: Optional[dict] = None,
+    populate: Optional[PopulationParameter] = None,
+    fields: Optional[List[str]] = None,
+    publication_state: Optional[Union[str, PublicationState]] = None,
+    batch_size: int = 100
+) -> Iterator[EntryChange]:
+    """Iterate over the entries that were created or updated since the watermark in `store`.
+
+    See `iter_changes`.
+
+    Usage:
+    >>> for change in iter_changes_sync(client, 'posts', FileStateStore('sync-state.json')):
+    ...     print(change.kind, change.entry['id'])
+    """
+    key = key or plural_api_id
+    since = watermark = store.get(key)
+    while True:
+        arguments = _get_changes_arguments(filters, populate, fields, publication_state, watermark, batch_size)
+        res = client.get_entries(plural_api_id, **arguments)
+        data = res['data'] or []
+        for entry in data:
+            yield _get_change(entry, since)
+        if data:
+            watermark = _get_watermark(data[-1])
+            store.set(key, watermark)
+        if _is_last_keyset_page(res):
+            return
@@ -0,0 +1,216 @@
+import asyncio
+import math
+import threading
+import time
+from collections import deque
+from contextvars import ContextVar
+from typing import Awaitable, Callable, Deque, Dict, FrozenSet, Optional, Tuple, Type, TypeVar, Union
+
+import requests
+
+from .errors import InternalServerError, RatelimitError, StrapiError
+
+
+V = TypeVar('V')
+
+
+class TokenBucket:
+    """Token bucket rate limiter: allows `rate` requests per second on average, and bursts of up to `burst`.
+
+    It is thread-safe and works for both coroutines and threads,
+    so one limiter can be shared between many clients, async and sync.
+
+    Usage:
+    >>> limiter = TokenBucket(rate=20, burst=40)
+    >>> client = StrapiClient(rate_limiter=limiter)
+    >>> sync_client = StrapiClientSync(rate_limiter=limiter)
+    """
+
+    def __init__(self, rate: float, burst: Optional[float] = None):
+        if rate <= 0:
+            raise ValueError(f'rate must be positive, got {rate}')
+        self.rate = rate
+        self.burst = burst if burst is not None else max(rate, 1)
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _reserve(self) -> float:
+        """Take a token and return the delay in seconds until it is available.
+
+        Tokens are reserved in order, so waiting callers are served first come, first served.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            return max(-self._tokens / self.rate, 0)
+
+    def acquire(self) -> None:
+        """Wait until a request is allowed."""
+        delay = self._reserve()
+        if delay:
+            time.sleep(delay)
+
+    async def acquire_async(self) -> None:
+        """Wait until a request is allowed, without blocking the event loop."""
+        delay = self._reserve()
+        if delay:
+            await asyncio.sleep(delay)
+
+
+class AdaptiveConcurrencyLimiter:
+    """AIMD concurrency limit for the concurrent requests of a client (pages of `get_all`, bulk writes).
+
+    The limit grows by one per `limit` successful requests while their latency stays within
+    `latency_tolerance` times the lowest latency of the last `window` requests,
+    and is multiplied by `backoff_ratio` when a request fails with a ratelimit, server error or timeout.
+    Failures of requests that started before the last backoff don't back off again.
+    Each attempt of a request retried by the client's `retry_policy` is observed as a request of its own;
+    without a retry policy, a failed page of `get_all` fails the whole call.
+
+    It is thread-safe, so one limiter can be shared between many calls, async and sync.
+
+    Usage:
+    >>> limiter = AdaptiveConcurrencyLimiter(initial_limit=4, max_limit=32)
+    >>> await client.get_entries('posts', get_all=True, max_concurrency=limiter)
+    >>> limiter.limit, limiter.latency_percentiles(50, 99)
+    (11, {50: 0.041, 99: 0.12})
+    """
+
+    def __init__(
+        self,
+        initial_limit: int = 4,
+        *,
+        min_limit: int = 1,
+        max_limit: int = 64,
+        backoff_ratio: float = 0.5,
+        latency_tolerance: float = 2.0,
+        window: int = 200,
+        backoff_statuses: FrozenSet[int] = frozenset({429, 500, 502, 503, 504}),
+        backoff_exceptions: Tuple[Type[BaseException], ...] = (
+            RatelimitError, InternalServerError, asyncio.TimeoutError, TimeoutError, requests.Timeout)
+    ):
+        if not 1 <= min_limit <= initial_limit <= max_limit:
+            raise ValueError('Expected 1 <= min_limit <= initial_limit <= max_limit')
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.backoff_ratio = backoff_ratio
+        self.latency_tolerance = latency_tolerance
+        self.backoff_statuses = backoff_statuses
+        self.backoff_exceptions = backoff_exceptions
+        self._limit = float(initial_limit)
+        self._latencies: Deque[float] = deque(maxlen=window)
+        self._last_backoff = float('-inf')
+        self._in_flight = 0
+        self._lock = threading.Lock()
+
+    @property
+    def limit(self) -> int:
+        """Current number of requests allowed at a time."""
+        return int(self._limit)
+
+    @property
+    def in_flight(self) -> int:
+        """Number of tracked requests that are running now."""
+        return self._in_flight
+
+    def latency_percentiles(self, *percentiles: float) -> Dict[float, float]:
+        """Return the latencies in seconds of the last requests at the given percentiles (50, 90 and 99 by default)."""
+        with self._lock:
+            latencies = sorted(self._latencies)
+        if not latencies:
+            return {}
+        return {
+            p: latencies[min(len(latencies) - 1, max(math.ceil(p / 100 * len(latencies)) - 1, 0))]
+            for p in percentiles or (50, 90, 99)
+        }
+
+    def is_backoff_error(self, error: BaseException) -> bool:
+        """Return True if the error, or the error it was raised from (like a timeout of the connector), backs off."""
+        if isinstance(error, StrapiError) and error.status_code in self.backoff_statuses:
+            return True
+        cause: Optional[BaseException] = error
+        while cause is not None:
+            if isinstance(cause, self.backoff_exceptions):
+                return True
+            cause = cause.__cause__
+        return False
+
+    def observe(self, started: float, latency: float, error: Optional[BaseException] = None) -> None:
+        """Update the limit with the outcome of a request that started at `started` (`time.monotonic()`)."""
+        with self._lock:
+            if error is not None:
+                if self.is_backoff_error(error) and started >= self._last_backoff:
+                    self._limit = max(self.min_limit, self._limit * self.backoff_ratio)
+                    self._last_backoff = time.monotonic()
+                return
+            baseline = min(self._latencies, default=latency)
+            self._latencies.append(latency)
+            if latency <= baseline * self.latency_tolerance:
+                self._limit = min(self.max_limit, self._limit + 1 / self._limit)
+
+    def _start(self) -> float:
+        with self._lock:
+            self._in_flight += 1
+        return time.monotonic()
+
+    def _finish(self, started: float, error: Optional[BaseException]) -> None:
+        with self._lock:
+            self._in_flight -= 1
+        if error is None or isinstance(error, Exception):  # don't count cancelled calls
+            self.observe(started, time.monotonic() - started, error)
+
+    def track(self, func: Callable[[], V]) -> V:
+        """Call `func` and observe its latency or error, and the errors of its retried attempts."""
+        call = _TrackedCall(self, self._start())
+        token = _tracked_call.set(call)
+        error: Optional[BaseException] = None
+        try:
+            return func()
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            _tracked_call.reset(token)
+            self._finish(call.started, error)
+
+    async def track_async(self, func: Callable[[], Awaitable[V]]) -> V:
+        """Await `func` and observe its latency or error, and the errors of its retried attempts."""
+        call = _TrackedCall(self, self._start())
+        token = _tracked_call.set(call)
+        error: Optional[BaseException] = None
+        try:
+            return await func()
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            _tracked_call.reset(token)
+            self._finish(call.started, error)
+
+
+class _TrackedCall:
+    """A call tracked by a limiter, with the start of its current attempt."""
+
+    def __init__(self, limiter: AdaptiveConcurrencyLimiter, started: float):
+        self.limiter = limiter
+        self.started = started
+
+
+_tracked_call: 'ContextVar[Optional[_TrackedCall]]' = ContextVar('_tracked_call', default=None)
+
+
+def _observe_retry(error: BaseException, delay: float) -> None:
+    """Report a failed attempt, that will be retried after `delay` seconds, to the limiter tracking the call."""
+    call = _tracked_call.get()
+    if call is None:
+        return
+    now = time.monotonic()
+    call.limiter.observe(call.started, now - call.started, error)
+    call.started = now + delay
+
+
+ConcurrencyLimit = Union[int, AdaptiveConcurrencyLimiter]
+"""Max number of concurrent requests, fixed or adaptive"""
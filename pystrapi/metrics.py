@@ -0,0 +1,309 @@
+import bisect
+import copy
+import threading
+import time
+from dataclasses import dataclass, field
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, List, Mapping, Optional, Sequence, Tuple, Union
+
+import aiohttp
+
+from .errors import StrapiError
+from .help.helpers import get_plural_api_id
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+"""Default upper bounds in seconds of the latency histogram buckets, there is one more bucket above them"""
+
+
+@dataclass(frozen=True)
+class RequestInfo:
+    """A request (or retry) about to be sent."""
+
+    method: str
+    url: str
+    plural_api_id: str
+    """First segment of the endpoint, like `posts`"""
+    attempt: int
+    """1 for the first attempt, more for retries"""
+
+
+@dataclass(frozen=True)
+class ResponseInfo:
+    """The outcome of a request: a response or an error."""
+
+    request: RequestInfo
+    status: Optional[int]
+    """Status code, None if there was no response"""
+    latency: float
+    """Seconds from sending the request to getting the response headers (or the error)"""
+    decode_time: float
+    """Seconds to read and decode the json body"""
+    size: Optional[int]
+    """Body size in bytes from the `Content-Length` header, None if it is unknown"""
+    error: Optional[StrapiError] = None
+
+
+RequestHook = Callable[[RequestInfo], None]
+ResponseHook = Callable[[ResponseInfo], None]
+
+
+class LatencyHistogram:
+    """Counts of durations in buckets of upper bounds `buckets` (in seconds), with their count and sum."""
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, seconds: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+
+    @property
+    def mean(self) -> Optional[float]:
+        return self.sum / self.count if self.count else None
+
+    def percentile(self, p: float) -> Optional[float]:
+        """Return the upper bound of the bucket of the `p` percentile (0-100), inf if it is above all buckets."""
+        if not self.count:
+            return None
+        rank = p / 100 * self.count
+        cumulative = 0
+        for bound, count in zip([*self.buckets, float('inf')], self.counts):
+            cumulative += count
+            if cumulative >= rank:
+                return bound
+        return float('inf')
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {'count': self.count, 'sum': self.sum, 'buckets': list(self.buckets), 'counts': list(self.counts)}
+
+
+@dataclass
+class EndpointMetrics:
+    """Metrics of the requests of one method to one collection."""
+
+    requests: int = 0
+    """Requests sent, including retries"""
+    retries: int = 0
+    errors: int = 0
+    statuses: Dict[int, int] = field(default_factory=dict)
+    bytes: int = 0
+    """Bytes received, of the responses with `Content-Length`"""
+    latency: LatencyHistogram = field(default_factory=LatencyHistogram)
+    decode_time: LatencyHistogram = field(default_factory=LatencyHistogram)
+    dns_time: LatencyHistogram = field(default_factory=LatencyHistogram)
+    """Host resolving of new connections, from the aiohttp trace"""
+    connect_time: LatencyHistogram = field(default_factory=LatencyHistogram)
+    """New connections, from the aiohttp trace"""
+    ttfb: LatencyHistogram = field(default_factory=LatencyHistogram)
+    """Time to the response headers (including connecting), from the aiohttp trace"""
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'requests': self.requests,
+            'retries': self.retries,
+            'errors': self.errors,
+            'statuses': dict(self.statuses),
+            'bytes': self.bytes,
+            **{name: getattr(self, name).to_dict()
+               for name in ('latency', 'decode_time', 'dns_time', 'connect_time', 'ttfb')},
+        }
+
+
+class RequestMetrics:
+    """Thread-safe counters and latency histograms of requests, by collection (plural API id) and method.
+
+    Pass it as `metrics` to a client or a connector wrapper. `StrapiClient` also adds the aiohttp trace
+    (`trace_config`) to the session it creates, for DNS, connect and time to first byte.
+    One instance can be shared by many clients.
+
+    Usage:
+    >>> metrics = RequestMetrics()
+    >>> client = StrapiClient(metrics=metrics)
+    >>> metrics.get('posts', 'GET').latency.percentile(99)
+    0.25
+    >>> json.dumps(metrics.to_dict())
+    """
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self._endpoints: Dict[Tuple[str, str], EndpointMetrics] = {}
+        self._lock = threading.Lock()
+
+    def _get_endpoint(self, plural_api_id: str, method: str) -> EndpointMetrics:
+        key = (plural_api_id, method.upper())
+        endpoint = self._endpoints.get(key)
+        if endpoint is None:
+            buckets = self.buckets
+            endpoint = self._endpoints[key] = EndpointMetrics(
+                latency=LatencyHistogram(buckets), decode_time=LatencyHistogram(buckets),
+                dns_time=LatencyHistogram(buckets), connect_time=LatencyHistogram(buckets),
+                ttfb=LatencyHistogram(buckets))
+        return endpoint
+
+    def on_response(self, info: ResponseInfo) -> None:
+        """Count a response or an error. Called by the connector wrappers, can be used as a response hook."""
+        with self._lock:
+            endpoint = self._get_endpoint(info.request.plural_api_id, info.request.method)
+            endpoint.requests += 1
+            if info.request.attempt > 1:
+                endpoint.retries += 1
+            if info.error is not None:
+                endpoint.errors += 1
+            if info.status is not None:
+                endpoint.statuses[info.status] = endpoint.statuses.get(info.status, 0) + 1
+            endpoint.bytes += info.size or 0
+            endpoint.latency.observe(info.latency)
+            endpoint.decode_time.observe(info.decode_time)
+
+    def observe_trace(self, plural_api_id: str, method: str, name: str, seconds: float) -> None:
+        """Add a duration to the trace histogram `name` (`dns_time`, `connect_time` or `ttfb`)."""
+        with self._lock:
+            histogram: LatencyHistogram = getattr(self._get_endpoint(plural_api_id, method), name)
+            histogram.observe(seconds)
+
+    def get(self, plural_api_id: str, method: str) -> EndpointMetrics:
+        """Return a copy of the metrics of one collection and method."""
+        with self._lock:
+            return copy.deepcopy(self._get_endpoint(plural_api_id, method))
+
+    def snapshot(self) -> Dict[Tuple[str, str], EndpointMetrics]:
+        """Return a copy of the metrics by `(plural_api_id, method)`."""
+        with self._lock:
+            return copy.deepcopy(self._endpoints)
+
+    def to_dict(self) -> Dict[str, Dict[str, Any]]:
+        """Return the metrics as a json-serializable dict, by `'<plural_api_id> <method>'`."""
+        return {f'{name} {method}': endpoint.to_dict() for (name, method), endpoint in self.snapshot().items()}
+
+    def reset(self) -> None:
+        with self._lock:
+            self._endpoints.clear()
+
+    def trace_config(self, api_url: str) -> aiohttp.TraceConfig:
+        """Return an aiohttp trace config that observes DNS, connect and time to first byte of requests."""
+        trace_config = aiohttp.TraceConfig()
+
+        def elapsed(context: SimpleNamespace, name: str) -> float:
+            started: float = getattr(context, name)
+            return time.perf_counter() - started
+
+        def observe(context: SimpleNamespace, name: str, seconds: float) -> None:
+            if hasattr(context, 'plural_api_id'):
+                self.observe_trace(context.plural_api_id, context.method, name, seconds)
+
+        async def on_request_start(session: Any, context: SimpleNamespace, params: Any) -> None:
+            context.plural_api_id = get_plural_api_id(api_url, str(params.url))
+            context.method = params.method
+            context.request_start = time.perf_counter()
+
+        async def on_request_end(session: Any, context: SimpleNamespace, params: Any) -> None:
+            observe(context, 'ttfb', elapsed(context, 'request_start'))
+
+        async def on_dns_resolvehost_start(session: Any, context: SimpleNamespace, params: Any) -> None:
+            context.dns_start = time.perf_counter()
+
+        async def on_dns_resolvehost_end(session: Any, context: SimpleNamespace, params: Any) -> None:
+            observe(context, 'dns_time', elapsed(context, 'dns_start'))
+
+        async def on_connection_create_start(session: Any, context: SimpleNamespace, params: Any) -> None:
+            context.connect_start = time.perf_counter()
+
+        async def on_connection_create_end(session: Any, context: SimpleNamespace, params: Any) -> None:
+            observe(context, 'connect_time', elapsed(context, 'connect_start'))
+
+        trace_config.on_request_start.append(on_request_start)
+        trace_config.on_request_end.append(on_request_end)
+        trace_config.on_dns_resolvehost_start.append(on_dns_resolvehost_start)
+        trace_config.on_dns_resolvehost_end.append(on_dns_resolvehost_end)
+        trace_config.on_connection_create_start.append(on_connection_create_start)
+        trace_config.on_connection_create_end.append(on_connection_create_end)
+        return trace_config
+
+
+class _RequestTimer:
+    """Times one request attempt and reports it to the instruments when it finishes."""
+
+    def __init__(self, instruments: 'Instruments', request: RequestInfo):
+        self._instruments = instruments
+        self.request = request
+        self.status: Optional[int] = None
+        self.size: Optional[int] = None
+        self.latency: Optional[float] = None
+        self.decode_time = 0.0
+        self._started = time.perf_counter()
+
+    def received(self, status: int, headers: Mapping[str, str]) -> None:
+        self.latency = time.perf_counter() - self._started
+        self.status = status
+        length = headers.get('Content-Length')
+        self.size = int(length) if length and length.isdigit() else None
+
+    def decoded(self) -> None:
+        self.decode_time = time.perf_counter() - self._started - (self.latency or 0)
+
+    def finish(self, error: Optional[StrapiError] = None) -> None:
+        if self.latency is None:
+            self.latency = time.perf_counter() - self._started
+        if self.status is None and error is not None:
+            self.status = error.status_code
+        self._instruments.report(ResponseInfo(
+            self.request, self.status, self.latency, self.decode_time, self.size, error))
+
+
+class _NoTimer:
+    """Timer of requests that aren't instrumented, does nothing."""
+
+    def received(self, status: int, headers: Mapping[str, str]) -> None:
+        pass
+
+    def decoded(self) -> None:
+        pass
+
+    def finish(self, error: Optional[StrapiError] = None) -> None:
+        pass
+
+
+_NO_TIMER = _NoTimer()
+
+
+class Instruments:
+    """Request hooks and metrics of a connector wrapper.
+
+    `on_request` hooks are called before each attempt, `on_response` hooks after it, with the response or the error.
+    Exceptions from hooks are raised to the caller.
+    """
+
+    def __init__(
+        self,
+        api_url: str,
+        on_request: Sequence[RequestHook] = (),
+        on_response: Sequence[ResponseHook] = (),
+        metrics: Optional[RequestMetrics] = None
+    ):
+        self.api_url = api_url
+        self.on_request: List[RequestHook] = list(on_request)
+        self.on_response: List[ResponseHook] = list(on_response)
+        self.metrics = metrics
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.on_request or self.on_response or self.metrics)
+
+    def start(self, method: str, url: str, attempt: int) -> Union[_RequestTimer, _NoTimer]:
+        """Call the request hooks and return a timer of the attempt, with `received`, `decoded` and `finish`."""
+        if not self.enabled:
+            return _NO_TIMER
+        request = RequestInfo(method, url, get_plural_api_id(self.api_url, url), attempt)
+        for hook in self.on_request:
+            hook(request)
+        return _RequestTimer(self, request)
+
+    def report(self, info: ResponseInfo) -> None:
+        if self.metrics is not None:
+            self.metrics.on_response(info)
+        for hook in self.on_response:
+            hook(info)
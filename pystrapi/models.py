@@ -0,0 +1,148 @@
+import importlib
+import json
+from pathlib import Path
+from typing import Any, Dict, List, Mapping, Optional, Tuple, Type, Union
+
+from .types import StrapiEntryOrEntriesResponse, StrapiResponseEntryData
+
+
+_ATTRIBUTE_TYPES: Dict[str, Any] = {
+    'string': str,
+    'text': str,
+    'richtext': str,
+    'email': str,
+    'password': str,
+    'uid': str,
+    'enumeration': str,
+    'biginteger': str,  # Strapi sends big integers as strings
+    'date': str,
+    'datetime': str,
+    'time': str,
+    'integer': int,
+    'float': float,
+    'decimal': float,
+    'boolean': bool,
+}
+"""Python types of Strapi attribute types. Other types (json, relation, media, component) are `Any`"""
+
+_TIMESTAMPS = ['createdAt', 'updatedAt']
+
+
+class StrapiModel:
+    """Base of slotted models generated by `create_model`. Missing attributes are None."""
+
+    __slots__: Tuple[str, ...] = ()
+
+    def __init__(self, **values: Any):
+        for name in self.__slots__:
+            setattr(self, name, values.get(name))
+
+    def __repr__(self) -> str:
+        values = ', '.join(f'{name}={getattr(self, name)!r}' for name in self.__slots__)
+        return f'{type(self).__name__}({values})'
+
+    def __eq__(self, other: object) -> bool:
+        if type(other) is not type(self):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in self.__slots__)
+
+
+def _import_msgspec() -> Any:
+    try:
+        return importlib.import_module('msgspec')
+    except ImportError:
+        return None
+
+
+def _get_attribute_types(schema: Mapping[str, Any]) -> Dict[str, Any]:
+    """Return the python type of the id, the attributes and the timestamps of a content type schema."""
+    attributes: Mapping[str, Any] = schema.get('attributes', {})
+    names = ['id', *attributes, *_TIMESTAMPS]
+    if schema.get('options', {}).get('draftAndPublish'):
+        names.append('publishedAt')
+    types = {'id': int, **{name: _ATTRIBUTE_TYPES.get(a.get('type'), Any) for name, a in attributes.items()}}
+    return {name: types.get(name, str) for name in dict.fromkeys(names)}
+
+
+def _get_model_fields(schema: Mapping[str, Any]) -> List[Tuple[str, Any]]:
+    types = _get_attribute_types(schema)
+    for name in types:
+        if not name.isidentifier():
+            raise ValueError(f'Attribute name {name!r} is not a valid python identifier')
+    return [(name, Optional[field_type]) for name, field_type in types.items()]
+
+
+def create_model(schema: Mapping[str, Any], *, use_msgspec: Optional[bool] = None) -> type:
+    """Create a compact model class of a content type from its Strapi schema (`schema.json`).
+
+    The model has the entry id, the schema attributes and the timestamps as fields.
+    It is a `msgspec.Struct` if msgspec is installed (or `use_msgspec` is True), or a `StrapiModel` with `__slots__`.
+    Both keep no per-instance dict, so they take much less memory than the response dicts.
+
+    Usage:
+    >>> Post = create_model(json.load(open('src/api/post/content-types/post/schema.json')))
+    >>> Post(id=1, title='Post')
+    Post(id=1, description=None, content=None, title='Post', createdAt=None, updatedAt=None, publishedAt=None)
+    """
+    name = schema.get('info', {}).get('displayName') or schema['info']['singularName']
+    name = ''.join(part[:1].upper() + part[1:] for part in name.replace('-', ' ').split())
+    fields = _get_model_fields(schema)
+    msgspec = _import_msgspec() if use_msgspec is not False else None
+    if use_msgspec and msgspec is None:
+        raise ImportError('msgspec is not installed')
+    if msgspec is not None:
+        model: type = msgspec.defstruct(name, [(field, typ, None) for field, typ in fields], kw_only=True)
+        return model
+    return type(name, (StrapiModel,), {
+        '__slots__': tuple(field for field, _ in fields),
+        '__annotations__': dict(fields),
+        '__module__': __name__,
+    })
+
+
+def load_models(path: Union[str, Path], *, use_msgspec: Optional[bool] = None) -> Dict[str, type]:
+    """Create the models of all the content types under a Strapi project (or its `src/api` directory).
+
+    Return a dict of models by the plural API id of their content type, like `client.get_entries` takes.
+
+    Usage:
+    >>> models = load_models('path/to/strapi/project')
+    >>> posts = decode_data(models['posts'], await client.get_entries('posts'))
+    """
+    models: Dict[str, type] = {}
+    for schema_path in sorted(Path(path).glob('**/content-types/*/schema.json')):
+        if 'node_modules' in schema_path.parts:
+            continue
+        schema = json.loads(schema_path.read_text(encoding='utf-8'))
+        models[schema['info']['pluralName']] = create_model(schema, use_msgspec=use_msgspec)
+    return models
+
+
+def get_model_fields(model: type) -> Tuple[str, ...]:
+    """Return the field names of a model created by `create_model`."""
+    fields: Tuple[str, ...] = getattr(model, '__struct_fields__', None) or getattr(model, '__slots__')
+    return fields
+
+
+def decode_entry(model: Type[Any], entry: StrapiResponseEntryData) -> Any:
+    """Create a model instance of an entry from response. Attributes that the model doesn't have are dropped."""
+    attributes = entry['attributes']
+    values = {name: attributes[name] for name in get_model_fields(model) if name in attributes}
+    values['id'] = entry['id']
+    return model(**values)
+
+
+def decode_data(model: Type[Any], response: Union[Mapping, dict]) -> Union[Any, List[Any]]:
+    """Decode the entries of response to model instances, like `process_data`.
+
+    Usage:
+    >>> decode_data(Post, await client.get_entries('posts'))
+    [Post(id=1, title='Post', ...), Post(id=2, title='Other', ...)]
+    """
+    response: StrapiEntryOrEntriesResponse = response  # type: ignore
+    data = response['data']
+    if not data:
+        return []
+    if isinstance(data, list):
+        return [decode_entry(model, d) for d in data]
+    return decode_entry(model, data)
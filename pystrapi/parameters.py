@@ -53,3 +53,10 @@ class PublicationState(str, Enum):
     """returns only published entries (default)"""
     preview = 'preview'
     """returns both draft entries & published entries"""
+
+
+class PaginationStrategy(str, Enum):
+    page = 'page'
+    """pages by `page` and `pageSize` (default), can be fetched concurrently"""
+    keyset = 'keyset'
+    """pages sorted by a unique monotonic field, each page starts after the last value of the previous one"""
@@ -0,0 +1,75 @@
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from .types import PopulationParameter
+
+Projection = Iterable[str]
+"""Dotted paths of the attributes to get, like `['title', 'author.name', 'colors.*']`"""
+
+
+def _build_tree(paths: Iterable[str]) -> Dict[str, Any]:
+    """Nest the paths, a field is None and a relation is a dict of its paths."""
+    tree: Dict[str, Any] = {}
+    for path in paths:
+        parts = path.split('.')
+        if not all(parts):
+            raise ValueError(f'Invalid projection path {path!r}')
+        node = tree
+        for part in parts[:-1]:
+            if node.get(part) is None:
+                node[part] = {}  # a relation, even if its name was also given as a field
+            node = node[part]
+        node.setdefault(parts[-1], None)
+    return tree
+
+
+def _compile_node(node: Dict[str, Any]) -> Tuple[Optional[List[str]], Dict[str, Any]]:
+    """Return the fields (None for all of them) and the populate of the relations of one level."""
+    populate = {name: _compile_relation(child) for name, child in node.items() if isinstance(child, dict)}
+    if '*' in node:
+        return None, populate
+    fields = [name for name, child in node.items() if child is None]
+    return fields or ['id'], populate
+
+
+def _compile_relation(node: Dict[str, Any]) -> Any:
+    fields, populate = _compile_node(node)
+    if fields is None and not populate:
+        return '*'
+    compiled: Dict[str, Any] = {}
+    if fields is not None:
+        compiled['fields'] = fields
+    if populate:
+        compiled['populate'] = populate
+    return compiled
+
+
+def compile_projection(projection: Projection) -> Tuple[Optional[List[str]], Optional[PopulationParameter]]:
+    """Compile dotted paths to the minimal `fields` and `populate` parameters that get them.
+
+    A path is a field of the entry (`title`), or a relation, component or media followed by the path of
+    its field (`author.name`, `author.avatar.url`). `*` gets all the fields of a level (`colors.*`).
+    Relations are populated only with the fields in the paths, so the response has nothing else.
+    A level with only relations gets only the id.
+
+    Usage:
+    >>> compile_projection(['title', 'author.name', 'colors.*'])
+    (['title'], {'author': {'fields': ['name']}, 'colors': '*'})
+    """
+    if isinstance(projection, str):
+        projection = [projection]
+    fields, populate = _compile_node(_build_tree(projection))
+    return fields, populate or None
+
+
+def _get_projection_parameters(
+    projection: Optional[Projection],
+    populate: Optional[PopulationParameter],
+    fields: Optional[List[str]]
+) -> Tuple[Optional[PopulationParameter], Optional[List[str]]]:
+    """Return populate and fields of the projection, or the given ones. Raise ValueError if both are given."""
+    if projection is None:
+        return populate, fields
+    if populate is not None or fields is not None:
+        raise ValueError('Pass either `projection` or populate and fields')
+    projected_fields, projected_populate = compile_projection(projection)
+    return projected_populate, projected_fields
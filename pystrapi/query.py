@@ -0,0 +1,78 @@
+from dataclasses import dataclass, field
+from typing import List, Optional, Tuple, Union
+
+from .help.helpers import _add_query_string, _encode_parameters, _get_entries_parameters
+from .parameters import PublicationState
+from .types import PopulationParameter
+
+
+@dataclass(frozen=True)
+class Query:
+    """Query parameters of a get entries request, encoded once to a query string.
+
+    Reuse one query for many calls (and all the pages of `get_all`) to skip encoding the same
+    deep filters again on each request. Lists, like the values of `$in`, are encoded with indexes.
+    Queries with the same query string are equal.
+
+    The parameters are not copied, don't modify them after the query is created.
+
+    Usage:
+    >>> query = Query(filters={'id': {Filter.IN: [1, 2, 3]}}, populate=['author'], fields=['title'])
+    >>> query.query_string
+    'filters[id][$in][0]=1&filters[id][$in][1]=2&filters[id][$in][2]=3&populate=author&fields=title'
+    >>> client.get_entries('posts', query=query, get_all=True)
+    """
+
+    sort: Optional[List[str]] = None
+    filters: Optional[dict] = None
+    populate: Optional[PopulationParameter] = None
+    fields: Optional[List[str]] = None
+    publication_state: Optional[Union[str, PublicationState]] = None
+    query_string: str = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        params = _get_entries_parameters(
+            self.sort, self.filters, self.populate, self.fields, None, self.publication_state)
+        object.__setattr__(self, 'query_string', _encode_parameters(params))
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, Query) and self.query_string == other.query_string
+
+    def __hash__(self) -> int:
+        return hash(self.query_string)
+
+
+def _get_query(
+    query: Optional[Query],
+    sort: Optional[List[str]],
+    filters: Optional[dict],
+    populate: Optional[PopulationParameter],
+    fields: Optional[List[str]],
+    publication_state: Optional[Union[str, PublicationState]]
+) -> Query:
+    """Return the given query, or a new query of the other parameters. Raise ValueError if both are given."""
+    if query is None:
+        return Query(sort, filters, populate, fields, publication_state)
+    if any(p is not None for p in (sort, filters, populate, fields, publication_state)):
+        raise ValueError('Pass sort, filters, populate, fields and publication_state either in `query` or as arguments')
+    return query
+
+
+def _get_query_request(
+    plural_api_id: str,
+    query: Optional[Query],
+    sort: Optional[List[str]],
+    filters: Optional[dict],
+    populate: Optional[PopulationParameter],
+    fields: Optional[List[str]],
+    publication_state: Optional[Union[str, PublicationState]]
+) -> Tuple[str, dict]:
+    """Return the endpoint and the query `params` of a get entries request.
+
+    The precompiled query string of a given `query` is added to the endpoint, and `params` is empty.
+    Otherwise the parameters are passed as `params`, like in the other requests.
+    """
+    if query is None:
+        return plural_api_id, _get_entries_parameters(sort, filters, populate, fields, None, publication_state)
+    query = _get_query(query, sort, filters, populate, fields, publication_state)
+    return _add_query_string(plural_api_id, query.query_string), {}
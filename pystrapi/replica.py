@@ -0,0 +1,437 @@
+"""Local replicas of collections, queried in memory without requests to Strapi."""
+import asyncio
+import operator
+import threading
+from enum import Enum
+from types import TracebackType
+from typing import (Any, Callable, Dict, Hashable, Iterable, List, Mapping, Optional, Sequence, Set, Tuple, Type,
+                    Union)
+
+from .errors import NotFoundError
+from .incremental import MemoryStateStore, iter_changes, iter_changes_sync
+from .parameters import PublicationState
+from .strapi_client import StrapiClient
+from .strapi_client_sync import StrapiClientSync
+from .types import (PopulationParameter, StrapiEntriesResponse, StrapiEntryResponse, StrapiResponseEntryData,
+                    StrapiResponseMeta)
+
+
+def _contains(value: Any, expected: Any) -> bool:
+    return isinstance(value, str) and str(expected) in value
+
+
+def _containsi(value: Any, expected: Any) -> bool:
+    return isinstance(value, str) and str(expected).lower() in value.lower()
+
+
+def _compare(compare: Callable[[Any, Any], bool]) -> Callable[[Any, Any], bool]:
+    """Comparisons with null are false, like in SQL."""
+    return lambda value, expected: value is not None and expected is not None and compare(value, expected)
+
+
+_OPERATORS: Dict[str, Callable[[Any, Any], bool]] = {
+    '$eq': operator.eq,
+    '$ne': operator.ne,
+    '$lt': _compare(operator.lt),
+    '$lte': _compare(operator.le),
+    '$gt': _compare(operator.gt),
+    '$gte': _compare(operator.ge),
+    '$in': lambda value, expected: value in expected,
+    '$notIn': lambda value, expected: value not in expected,
+    '$contains': _contains,
+    '$notContains': lambda value, expected: not _contains(value, expected),
+    '$containsi': _containsi,
+    '$notContainsi': lambda value, expected: not _containsi(value, expected),
+    '$null': lambda value, expected: (value is None) == _is_true(expected),
+    '$notNull': lambda value, expected: (value is not None) == _is_true(expected),
+    '$between': lambda value, expected: value is not None and expected[0] <= value <= expected[1],
+    '$startsWith': lambda value, expected: isinstance(value, str) and value.startswith(str(expected)),
+    '$endsWith': lambda value, expected: isinstance(value, str) and value.endswith(str(expected)),
+}
+"""Local implementations of the `Filter` operators, except `$or` and `$and`"""
+
+
+def _is_true(value: Any) -> bool:
+    return value is True or str(value).lower() == 'true'
+
+
+def _key(key: Any) -> str:
+    return str(key.value) if isinstance(key, Enum) else str(key)
+
+
+def _get_value(entry: StrapiResponseEntryData, field: str) -> Any:
+    return entry['id'] if field == 'id' else entry['attributes'].get(field)
+
+
+def _match(entry: StrapiResponseEntryData, filters: Mapping) -> bool:
+    """Return True if the entry matches Strapi filters, like `{'title': {'$eq': 'a'}, '$or': [...]}`."""
+    for key, condition in filters.items():
+        key = _key(key)
+        if key == '$or':
+            if not any(_match(entry, f) for f in condition):
+                return False
+        elif key == '$and':
+            if not all(_match(entry, f) for f in condition):
+                return False
+        elif key.startswith('$'):
+            raise ValueError(f'Filter {key} is not supported by local replicas')
+        elif not _match_field(_get_value(entry, key), condition):
+            return False
+    return True
+
+
+def _match_field(value: Any, condition: Any) -> bool:
+    if not isinstance(condition, Mapping):
+        return bool(value == condition)
+    for op, expected in condition.items():
+        op = _key(op)
+        if op not in _OPERATORS:
+            raise ValueError(f'Filter {op} is not supported by local replicas, only filters on attributes are')
+        if not _OPERATORS[op](value, expected):
+            return False
+    return True
+
+
+def _get_indexed_values(condition: Any) -> Optional[List[Any]]:
+    """Return the values that an attribute must equal to match the condition, if it is `$eq`, `$in` or a value."""
+    if not isinstance(condition, Mapping):
+        return [condition]
+    condition = {_key(op): expected for op, expected in condition.items()}
+    if '$eq' in condition:
+        return [condition['$eq']]
+    if '$in' in condition:
+        return list(condition['$in'])
+    return None
+
+
+def _sort_key(field: str) -> Callable[[StrapiResponseEntryData], Tuple[bool, Any]]:
+    """Nulls are first in ascending order."""
+    def key(entry: StrapiResponseEntryData) -> Tuple[bool, Any]:
+        value = _get_value(entry, field)
+        return value is not None, value
+    return key
+
+
+def _sort_entries(entries: List[StrapiResponseEntryData], sort: Sequence[str]) -> List[StrapiResponseEntryData]:
+    for item in reversed(sort):
+        field, _, order = item.partition(':')
+        entries = sorted(entries, key=_sort_key(field), reverse=order.lower() == 'desc')
+    return entries
+
+
+def _select_fields(entry: StrapiResponseEntryData, fields: Optional[List[str]]) -> StrapiResponseEntryData:
+    if fields is None:
+        return entry
+    attributes = entry['attributes']
+    return {'id': entry['id'], 'attributes': {f: attributes[f] for f in fields if f in attributes}}
+
+
+def _paginate(
+    entries: List[StrapiResponseEntryData], pagination: Optional[Mapping]
+) -> Tuple[List[StrapiResponseEntryData], StrapiResponseMeta]:
+    """Slice a page of entries and return it with the pagination meta, by page or by offset, like Strapi."""
+    pagination = {_key(k): v for k, v in (pagination or {}).items()}
+    total = len(entries)
+    if 'start' in pagination or 'limit' in pagination:
+        start, limit = int(pagination.get('start', 0)), int(pagination.get('limit', 25))
+        meta: dict = {'start': start, 'limit': limit, 'total': total}
+        return entries[start:start + limit], {'pagination': meta}  # type: ignore[typeddict-item]
+    page, page_size = int(pagination.get('page', 1)), int(pagination.get('pageSize', 25))
+    meta = {'page': page, 'pageSize': page_size, 'pageCount': -(-total // page_size), 'total': total}
+    return entries[(page - 1) * page_size:page * page_size], {'pagination': meta}  # type: ignore[typeddict-item]
+
+
+def _update_indexes(
+    indexes: Dict[str, Dict[Hashable, Set[int]]],
+    entry: StrapiResponseEntryData,
+    update: Callable[[Set[int], int], None]
+) -> None:
+    """Add (`set.add`) or remove (`set.discard`) the id of the entry in the index of each indexed attribute."""
+    for field, index in indexes.items():
+        value = _get_value(entry, field)
+        if isinstance(value, Hashable):
+            update(index.setdefault(value, set()), entry['id'])
+
+
+class _LocalReplicaBase:
+    def __init__(
+        self,
+        plural_api_id: str,
+        indexes: Iterable[str],
+        filters: Optional[dict],
+        populate: Optional[PopulationParameter],
+        fields: Optional[List[str]],
+        publication_state: Optional[Union[str, PublicationState]],
+        batch_size: int,
+        refresh_interval: Optional[float]
+    ):
+        self.plural_api_id = plural_api_id
+        self.filters = filters
+        self.populate = populate
+        self.fields = fields
+        self.publication_state = publication_state
+        self.batch_size = batch_size
+        self.refresh_interval = refresh_interval
+        self._entries: Dict[int, StrapiResponseEntryData] = {}
+        self._indexes: Dict[str, Dict[Hashable, Set[int]]] = {field: {} for field in indexes}
+        self._state = MemoryStateStore()
+        self._lock = threading.Lock()
+        self.last_error: Optional[Exception] = None
+        """Error of the last background refresh, None if it succeeded"""
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _changes_arguments(self) -> Dict[str, Any]:
+        return dict(filters=self.filters, populate=self.populate, fields=self.fields,
+                    publication_state=self.publication_state, batch_size=self.batch_size)
+
+    def _replace(self, entries: List[StrapiResponseEntryData], state: MemoryStateStore) -> None:
+        """Replace all the entries at once, so queries get either the old or the new ones."""
+        indexes: Dict[str, Dict[Hashable, Set[int]]] = {field: {} for field in self._indexes}
+        for entry in entries:
+            _update_indexes(indexes, entry, set.add)
+        with self._lock:
+            self._entries = {entry['id']: entry for entry in entries}
+            self._indexes = indexes
+            self._state = state
+
+    def _upsert(self, entries: List[StrapiResponseEntryData]) -> None:
+        with self._lock:
+            for entry in entries:
+                old = self._entries.get(entry['id'])
+                if old is not None:
+                    _update_indexes(self._indexes, old, set.discard)
+                self._entries[entry['id']] = entry
+                _update_indexes(self._indexes, entry, set.add)
+
+    def _get_candidates(self, filters: Mapping) -> Iterable[StrapiResponseEntryData]:
+        """Return the entries that can match the filters, narrowed by the indexes of `$eq` and `$in` filters."""
+        ids: Optional[Set[int]] = None
+        for key, condition in filters.items():
+            key = _key(key)
+            if key != 'id' and key not in self._indexes:
+                continue
+            values = _get_indexed_values(condition)
+            if values is None or not all(isinstance(v, Hashable) for v in values):
+                continue
+            if key == 'id':
+                found = {v for v in values if v in self._entries}
+            else:
+                found = set().union(*(self._indexes[key].get(v, ()) for v in values))
+            ids = found if ids is None else ids & found
+        if ids is None:
+            return list(self._entries.values())
+        return [self._entries[i] for i in sorted(ids)]
+
+    def get_entry(self, document_id: int, fields: Optional[List[str]] = None) -> StrapiEntryResponse:
+        """Get one entry by id from the replica. Raise `NotFoundError` if it isn't there.
+
+        Usage:
+        >>> replica.get_entry(123, fields=['title'])
+        """
+        entry = self._entries.get(document_id)
+        if entry is None:
+            raise NotFoundError(f'No entry {document_id} in replica of {self.plural_api_id}', status_code=404)
+        return {'data': _select_fields(entry, fields), 'meta': {}}
+
+    def get_entries(
+        self,
+        sort: Optional[List[str]] = None,
+        filters: Optional[dict] = None,
+        fields: Optional[List[str]] = None,
+        pagination: Optional[Mapping] = None,
+        get_all: bool = False
+    ) -> StrapiEntriesResponse:
+        """Get entries from the replica, like `StrapiClient.get_entries` gets them from Strapi.
+
+        Filters take the `Filter` operators on attributes of the entries, and `$or` and `$and`.
+        Values are compared as they are in the response json (dates are strings), comparisons with null are false.
+        Filters on relations aren't supported. `$eq` and `$in` filters on indexed attributes (and id) at the top
+        level of filters use the indexes instead of scanning all the entries.
+
+        Usage:
+        >>> replica.get_entries(filters={'slug': {Filter.eq: 'hello'}})
+        >>> replica.get_entries(sort=['title:desc'], fields=['title'], pagination={'page': 2, 'pageSize': 10})
+        """
+        with self._lock:
+            entries = [e for e in self._get_candidates(filters or {}) if _match(e, filters or {})]
+        entries = _sort_entries(entries, sort or ['id'])
+        if get_all:
+            pagination = {'start': 0, 'limit': len(entries)}
+        page, meta = _paginate(entries, pagination)
+        return {'data': [_select_fields(e, fields) for e in page], 'meta': meta}
+
+
+class LocalReplica(_LocalReplicaBase):
+    """In-memory replica of a collection, with indexes on chosen attributes.
+
+    The replica loads the entries (of `filters`, `populate`, `fields` and `publication_state`) with `load`,
+    and gets the entries that changed since with `refresh`, by `updatedAt` (see `iter_changes`).
+    With `refresh_interval`, it refreshes in the background after `start`, and `async with` loads and starts it.
+    The error of a failed background refresh, of any kind, is kept in `last_error` and the refresh is retried
+    at the next interval.
+    Deleted entries are only removed by `load`.
+    Queries are answered locally by `get_entries` and `get_entry`, the returned entries are shared, don't modify them.
+
+    Usage:
+    >>> async with LocalReplica(client, 'posts', indexes=['slug'], refresh_interval=30) as replica:
+    ...     replica.get_entries(filters={'slug': {'$eq': 'hello'}})
+    """
+
+    def __init__(
+        self,
+        client: StrapiClient,
+        plural_api_id: str,
+        *,
+        indexes: Iterable[str] = (),
+        filters: Optional[dict] = None,
+        populate: Optional[PopulationParameter] = None,
+        fields: Optional[List[str]] = None,
+        publication_state: Optional[Union[str, PublicationState]] = None,
+        batch_size: int = 100,
+        refresh_interval: Optional[float] = None
+    ):
+        super().__init__(plural_api_id, indexes, filters, populate, fields, publication_state, batch_size,
+                         refresh_interval)
+        self.client = client
+        self._task: Optional['asyncio.Task[None]'] = None
+
+    async def __aenter__(self) -> 'LocalReplica':
+        await self.load()
+        self.start()
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc_val: Optional[BaseException],
+        exc_tb: Optional[TracebackType]
+    ) -> None:
+        await self.stop()
+
+    async def load(self) -> None:
+        """Load all the entries again, dropping the deleted ones."""
+        state = MemoryStateStore()
+        changes = iter_changes(self.client, self.plural_api_id, state, **self._changes_arguments())
+        self._replace([change.entry async for change in changes], state)
+
+    async def refresh(self) -> int:
+        """Get the entries that were created or updated since the last load or refresh. Return their number."""
+        page: List[StrapiResponseEntryData] = []
+        count = 0
+        async for change in iter_changes(self.client, self.plural_api_id, self._state, **self._changes_arguments()):
+            page.append(change.entry)
+            if len(page) >= self.batch_size:
+                self._upsert(page)
+                count, page = count + len(page), []
+        self._upsert(page)
+        return count + len(page)
+
+    def start(self) -> None:
+        """Refresh in the background every `refresh_interval` seconds, if it is set."""
+        if self.refresh_interval is not None and self._task is None:
+            self._task = asyncio.ensure_future(self._refresh_periodically(self.refresh_interval))
+
+    async def stop(self) -> None:
+        """Stop refreshing in the background."""
+        if self._task is not None:
+            task, self._task = self._task, None
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+    async def _refresh_periodically(self, interval: float) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.refresh()
+                self.last_error = None
+            except Exception as e:  # keep refreshing, cancellation is not an Exception
+                self.last_error = e
+
+
+class LocalReplicaSync(_LocalReplicaBase):
+    """In-memory replica of a collection, with indexes on chosen attributes.
+
+    See `LocalReplica`. The background refresh runs in a daemon thread.
+
+    Usage:
+    >>> with LocalReplicaSync(client, 'posts', indexes=['slug'], refresh_interval=30) as replica:
+    ...     replica.get_entries(filters={'slug': {'$eq': 'hello'}})
+    """
+
+    def __init__(
+        self,
+        client: StrapiClientSync,
+        plural_api_id: str,
+        *,
+        indexes: Iterable[str] = (),
+        filters: Optional[dict] = None,
+        populate: Optional[PopulationParameter] = None,
+        fields: Optional[List[str]] = None,
+        publication_state: Optional[Union[str, PublicationState]] = None,
+        batch_size: int = 100,
+        refresh_interval: Optional[float] = None
+    ):
+        super().__init__(plural_api_id, indexes, filters, populate, fields, publication_state, batch_size,
+                         refresh_interval)
+        self.client = client
+        self._thread: Optional[threading.Thread] = None
+        self._stopped = threading.Event()
+
+    def __enter__(self) -> 'LocalReplicaSync':
+        self.load()
+        self.start()
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc_val: Optional[BaseException],
+        exc_tb: Optional[TracebackType]
+    ) -> None:
+        self.stop()
+
+    def load(self) -> None:
+        """Load all the entries again, dropping the deleted ones."""
+        state = MemoryStateStore()
+        changes = iter_changes_sync(self.client, self.plural_api_id, state, **self._changes_arguments())
+        self._replace([change.entry for change in changes], state)
+
+    def refresh(self) -> int:
+        """Get the entries that were created or updated since the last load or refresh. Return their number."""
+        page: List[StrapiResponseEntryData] = []
+        count = 0
+        for change in iter_changes_sync(self.client, self.plural_api_id, self._state, **self._changes_arguments()):
+            page.append(change.entry)
+            if len(page) >= self.batch_size:
+                self._upsert(page)
+                count, page = count + len(page), []
+        self._upsert(page)
+        return count + len(page)
+
+    def start(self) -> None:
+        """Refresh in the background every `refresh_interval` seconds, if it is set."""
+        if self.refresh_interval is not None and self._thread is None:
+            self._stopped.clear()
+            self._thread = threading.Thread(
+                target=self._refresh_periodically, args=(self.refresh_interval,), daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        """Stop refreshing in the background."""
+        if self._thread is not None:
+            thread, self._thread = self._thread, None
+            self._stopped.set()
+            thread.join()
+
+    def _refresh_periodically(self, interval: float) -> None:
+        while not self._stopped.wait(interval):
+            try:
+                self.refresh()
+                self.last_error = None
+            except Exception as e:  # keep refreshing, cancellation is not an Exception
+                self.last_error = e
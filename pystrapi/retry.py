@@ -0,0 +1,49 @@
+import random
+from dataclasses import dataclass
+from typing import FrozenSet, Tuple, Type
+
+from .errors import InternalServerError, RatelimitError, StrapiError
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """When and how long to wait before retrying a failed request.
+
+    A request is retried if its method is in `methods` (idempotent methods by default),
+    and the error is one of `retry_exceptions` or its status code is in `retry_statuses`.
+    The delay before attempt `n + 1` is `backoff * 2 ** (n - 1)`, up to `max_backoff`,
+    with random jitter. If the server sent `Retry-After`, it is used instead, also up to `max_backoff`.
+
+    Usage:
+    >>> client = StrapiClient(retry_policy=RetryPolicy(max_attempts=5))
+    >>> client = StrapiClient(retry_policy=RetryPolicy(methods=RetryPolicy.methods | {'POST'}))
+    """
+
+    max_attempts: int = 3
+    """Max number of attempts, including the first one"""
+    backoff: float = 0.5
+    """Delay in seconds before the first retry"""
+    max_backoff: float = 30
+    """Max delay in seconds between attempts, also of `Retry-After`"""
+    jitter: bool = True
+    """Randomize the delay between half and all of it, so clients don't retry at the same moment"""
+    respect_retry_after: bool = True
+    """Wait the delay from `Retry-After` response header instead of the backoff"""
+    retry_statuses: FrozenSet[int] = frozenset({429, 500, 502, 503, 504})
+    retry_exceptions: Tuple[Type[StrapiError], ...] = (RatelimitError, InternalServerError)
+    methods: FrozenSet[str] = frozenset({'GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE'})
+
+    def should_retry(self, method: str, error: StrapiError, attempt: int) -> bool:
+        """Return True if a request that failed on `attempt` (starts from 1) should be sent again."""
+        if attempt >= self.max_attempts or method.upper() not in self.methods:
+            return False
+        return isinstance(error, self.retry_exceptions) or error.status_code in self.retry_statuses
+
+    def get_delay(self, error: StrapiError, attempt: int) -> float:
+        """Return the delay in seconds before the next attempt."""
+        if self.respect_retry_after and error.retry_after is not None:
+            return min(error.retry_after, self.max_backoff)
+        delay: float = min(self.backoff * 2 ** (attempt - 1), self.max_backoff)
+        if self.jitter:
+            delay = random.uniform(delay / 2, delay)  # nosec
+        return delay
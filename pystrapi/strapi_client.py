@@ -1,22 +1,90 @@
+import asyncio
 import aiohttp
-from typing import List, Optional, Union
+from functools import partial
+from types import TracebackType
+from typing import (Any, AsyncIterator, Awaitable, Callable, Iterable, List, Optional, Sequence, Tuple, Type,
+                    Union)
 
+from ._utils import gather_limited, iter_limited, tracked_async
 from .errors import StrapiError
-from .help.helpers import _stringify_parameters
-from .parameters import PublicationState
+from .help.helpers import (
+    _check_keyset_pagination,
+    _chunk_rows_by_keys,
+    _get_keys_filter,
+    _get_keyset_parameters,
+    _get_keyset_value,
+    _get_page_meta,
+    _has_unmatched_entries,
+    _index_entries_by_keys,
+    _is_last_keyset_page,
+    _is_last_page,
+    _merge_keyset_pages,
+    _stringify_parameters
+)
+from .help.json_helpers import JsonDumps, JsonLoads
+from .limiters import ConcurrencyLimit, TokenBucket
+from .metrics import RequestHook, RequestMetrics, ResponseHook
+from .parameters import PaginationStrategy, PublicationState
+from .projection import Projection, _get_projection_parameters
+from .query import Query, _get_query, _get_query_request
+from .retry import RetryPolicy
 from .connector import ConnectorWrapper, DefaultConnector, Connector
 from .types import (
+    BulkItemResult,
     PaginationParameter,
     PopulationParameter,
     StrapiAuthResponse,
     StrapiEntriesResponse,
-    StrapiEntryResponse
+    StrapiEntryResponse,
+    StrapiResponseEntryData,
+    StrapiResponseMeta
 )
 
 
+DEFAULT_TCP_CONNECTOR_ARGS = {
+    'limit': 100,
+    'limit_per_host': 0,
+    'keepalive_timeout': 15,
+    'use_dns_cache': True,
+    'ttl_dns_cache': 10,
+}
+"""Default arguments of the `aiohttp.TCPConnector` used by the client session."""
+
+
+def _discard_session(session: aiohttp.ClientSession, loop: Optional[asyncio.AbstractEventLoop]) -> None:
+    """Close a session of another event loop: on that loop if it runs (in another thread), or drop its connections."""
+    if session.closed:
+        return
+    if loop is not None and loop.is_running():
+        asyncio.run_coroutine_threadsafe(session.close(), loop)
+        return
+    connector = session.connector
+    session.detach()
+    if connector is not None:
+        connector._close()  # pylint: disable=protected-access  # close() schedules on the loop that doesn't run
+
+
 class StrapiClient:
     """REST API client for Strapi.
 
+    The client owns a long-lived `aiohttp.ClientSession` (created on first use), so requests
+    share one connection pool. Close it with `close()` or use the client as a context manager.
+    The pool is configured by `tcp_connector_args` (merged over `DEFAULT_TCP_CONNECTOR_ARGS`).
+    An external `session` can be given instead, the client will not close it.
+
+    Responses are decoded with `json_loads`, by default of the fastest installed json library
+    (orjson, ujson or json). Request bodies are encoded by the connector, or with `json_dumps` if given.
+    Failed requests (like ratelimit and server errors) are retried according to `retry_policy`,
+    each page of `get_all` and of the iterators is retried on its own.
+    Requests are paced by `rate_limiter`, which can be shared between clients.
+    With `coalesce_gets`, concurrent identical GET requests share one in-flight request (see `ConnectorWrapper`).
+    Requests are reported to the `on_request` and `on_response` hooks and counted in `metrics`, by collection and
+    method (see `RequestMetrics`), the session created by the client also traces DNS, connect and TTFB.
+
+    Usage:
+    >>> async with StrapiClient(api_url=api_url, tcp_connector_args={'limit_per_host': 20}) as client:
+    ...     await client.get_entries('posts')
+
     Strapi docs:
     https://docs.strapi.io/developer-docs/latest/developer-resources/database-apis-reference/rest-api.html
     """
@@ -25,14 +93,51 @@ class StrapiClient:
         self, *,
         api_url: Optional[str] = None,
         connector: Optional[Connector] = None,
-        token: Optional[str] = None
+        token: Optional[str] = None,
+        session: Optional[aiohttp.ClientSession] = None,
+        tcp_connector_args: Optional[dict] = None,
+        coalesce_gets: bool = False,
+        json_loads: Optional[JsonLoads] = None,
+        json_dumps: Optional[JsonDumps] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        rate_limiter: Optional[TokenBucket] = None,
+        on_request: Sequence[RequestHook] = (),
+        on_response: Sequence[ResponseHook] = (),
+        metrics: Optional[RequestMetrics] = None
     ):
         api_url = api_url or 'http://localhost:1337/api/'
         if not api_url.endswith('/'):
             api_url = api_url + '/'
         connector = connector or DefaultConnector()
-        self._connector = ConnectorWrapper(api_url, connector)
+        self._connector = ConnectorWrapper(
+            api_url, connector, coalesce_gets=coalesce_gets, json_loads=json_loads, json_dumps=json_dumps,
+            retry_policy=retry_policy, rate_limiter=rate_limiter, on_request=on_request, on_response=on_response,
+            metrics=metrics)
         self._token: Optional[str] = token
+        self._session = session
+        self._session_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._owns_session = session is None
+        self._tcp_connector_args = {**DEFAULT_TCP_CONNECTOR_ARGS, **(tcp_connector_args or {})}
+
+    async def __aenter__(self) -> 'StrapiClient':
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc_val: Optional[BaseException],
+        exc_tb: Optional[TracebackType]
+    ) -> None:
+        await self.close()
+
+    async def close(self) -> None:
+        """Close the client's own session. An external session is left open."""
+        if self._owns_session and self._session is not None:
+            session, self._session = self._session, None
+            if self._session_loop is asyncio.get_running_loop():
+                await session.close()
+            else:
+                _discard_session(session, self._session_loop)
 
     def set_token(self, token: str) -> None:
         self._token = token
@@ -41,6 +146,24 @@ class StrapiClient:
     def api_url(self) -> str:
         return self._connector.api_url
 
+    def _get_session(self) -> aiohttp.ClientSession:
+        """Return the session of the client, create it if needed.
+
+        The session is created lazily because aiohttp requires a running event loop.
+        An own session of another event loop (like of an earlier `asyncio.run()`) is replaced.
+        """
+        loop = asyncio.get_running_loop()
+        if self._owns_session and self._session is not None and self._session_loop is not loop:
+            _discard_session(self._session, self._session_loop)
+            self._session = None
+        if self._session is None or (self._owns_session and self._session.closed):
+            self._session_loop = loop
+            connector = aiohttp.TCPConnector(**self._tcp_connector_args)
+            metrics = self._connector.instruments.metrics
+            trace_configs = [metrics.trace_config(self.api_url)] if metrics is not None else None
+            self._session = aiohttp.ClientSession(connector=connector, trace_configs=trace_configs)
+        return self._session
+
     async def authorize(self, *, identifier: str, password: str) -> None:
         """Set up or retrieve access token.
 
@@ -51,7 +174,8 @@ class StrapiClient:
         """
         endpoint = 'auth/local'
         body = {'identifier': identifier, 'password': password}
-        res_obj: StrapiAuthResponse = await self._connector.post(endpoint, reqargs=dict(json=body))
+        res_obj: StrapiAuthResponse = await self._connector.post(
+            endpoint, session=self._get_session(), reqargs=dict(json=body))
         if 'jwt' in res_obj and res_obj['jwt']:
             self._token = res_obj['jwt']
         else:
@@ -62,7 +186,8 @@ class StrapiClient:
         plural_api_id: str,
         document_id: int,
         populate: Optional[PopulationParameter] = None,
-        fields: Optional[List[str]] = None
+        fields: Optional[List[str]] = None,
+        projection: Optional[Projection] = None
     ) -> StrapiEntryResponse:
         """Get one entry by id.
 
@@ -70,13 +195,18 @@ class StrapiClient:
         >>> client.get_entry('posts', 123)
         >>> client.get_entry('posts', 123, populate='*')
         >>> client.get_entry('posts', 123, fields=['description'])
+        >>> client.get_entry('posts', 123, projection=['title', 'author.name'])
+
+        `projection` (dotted paths of attributes) is compiled to the minimal populate and fields,
+        see `compile_projection`.
         """
+        populate, fields = _get_projection_parameters(projection, populate, fields)
         populate_param = _stringify_parameters('populate', populate)
         fields_param = _stringify_parameters('fields', fields)
         params = {**populate_param, **fields_param}
         endpoint = f'{plural_api_id}/{document_id}'
         res: StrapiEntryResponse = await self._connector.get(
-            endpoint, reqargs=dict(headers=self._get_auth_header(), params=params))
+            endpoint, session=self._get_session(), reqargs=dict(headers=self._get_auth_header(), params=params))
         return res
 
     async def get_entries(
@@ -89,14 +219,23 @@ class StrapiClient:
         pagination: Optional[PaginationParameter] = None,
         publication_state: Optional[Union[str, PublicationState]] = None,
         get_all: bool = False,
-        batch_size: int = 100
+        batch_size: int = 100,
+        max_concurrency: ConcurrencyLimit = 1,
+        pagination_strategy: Union[str, PaginationStrategy] = PaginationStrategy.page,
+        keyset_field: str = 'id',
+        query: Optional[Query] = None,
+        projection: Optional[Projection] = None
     ) -> StrapiEntriesResponse:
         """Get list of entries.
-        Optionally can operate in batch mode (if get_all is True) to get all entries with pagination
+        Optionally can operate in batch mode (if get_all is True) to get all entries with pagination.
+        In batch mode, the pages after the first are fetched concurrently, up to `max_concurrency` at a time.
+        `max_concurrency` can also be an `AdaptiveConcurrencyLimiter`, that adjusts it to the server load.
 
         Usage:
         >>> client.get_entries('posts')
         >>> client.get_entries('posts', get_all=True)
+        >>> client.get_entries('posts', get_all=True, max_concurrency=8)
+        >>> client.get_entries('posts', get_all=True, max_concurrency=AdaptiveConcurrencyLimiter(max_limit=16))
         >>> client.get_entries('disks', sort=['name'])
         >>> client.get_entries('disks', sort=['name:desc'])
         >>> client.get_entries('posts', filters={'name': {'$eq': 'The Name'}})
@@ -107,50 +246,193 @@ class StrapiClient:
         >>> client.get_entries('posts', fields=['description'])
         >>> client.get_entries('posts', pagination={'limit': 3})
         >>> client.get_entries('posts', publication_state=PublicationState.preview)
+        >>> client.get_entries('posts', query=Query(filters={'id': {Filter.IN: [1, 2]}}, populate='*'))
+
+        With `pagination_strategy='keyset'`, the entries are sorted by `keyset_field` (unique and monotonic, like id),
+        and each page is requested with a `$gt` filter on the last value of the previous page, instead of an offset.
+        It keeps deep pages fast and doesn't skip or repeat entries that are added or deleted meanwhile,
+        but the pages are fetched one after another and `sort` can't be used.
+
+        Usage:
+        >>> client.get_entries('posts', get_all=True, pagination_strategy='keyset')
+        >>> client.get_entries('posts', get_all=True, pagination_strategy=PaginationStrategy.keyset, keyset_field='uid')
+
+        A prebuilt `Query` can be passed instead of sort, filters, populate, fields and publication_state,
+        its query string is encoded only once and sent in the endpoint url.
+        The parameters of the other calls are passed as `params`.
+
+        A `projection` (dotted paths of attributes) can be passed instead of populate and fields, it is compiled
+        to the minimal populate and fields that get them (see `compile_projection`).
+
+        Usage:
+        >>> client.get_entries('posts', projection=['title', 'author.name', 'colors.hex'])
 
         Note: Pagination methods can not be mixed. Don't use `get_all` with `pagination`.
         """
-        sort_param = _stringify_parameters('sort', sort)
-        filters_param = _stringify_parameters('filters', filters)
-        populate_param = _stringify_parameters('populate', populate)
-        fields_param = _stringify_parameters('fields', fields)
-        pagination_param = _stringify_parameters('pagination', pagination) if not get_all else {}
-        publication_state_param = _stringify_parameters('publicationState', publication_state)
-        endpoint = plural_api_id
-        params = {
-            **sort_param,
-            **filters_param,
-            **pagination_param,
-            **populate_param,
-            **fields_param,
-            **publication_state_param
-        }
+        populate, fields = _get_projection_parameters(projection, populate, fields)
+        if get_all and PaginationStrategy(pagination_strategy) == PaginationStrategy.keyset:
+            query = _get_query(query, sort, filters, populate, fields, publication_state)
+            _check_keyset_pagination(query.sort, max_concurrency)
+            return await self._get_all_entries_by_keyset(plural_api_id, query, keyset_field, batch_size)
+        endpoint, params = _get_query_request(plural_api_id, query, sort, filters, populate, fields, publication_state)
         if not get_all:
+            params = {**params, **_stringify_parameters('pagination', pagination)}
             res: StrapiEntriesResponse = await self._connector.get(
-                endpoint, reqargs=dict(headers=self._get_auth_header(), params=params))
+                endpoint, session=self._get_session(), reqargs=dict(headers=self._get_auth_header(), params=params))
             return res
         else:
-            async with aiohttp.ClientSession() as session:
-                page = 1
-                get_more = True
-                while get_more:
-                    pagination = {'page': page, 'pageSize': batch_size}
-                    pagination_param = _stringify_parameters('pagination', pagination)
-                    for key in pagination_param:
-                        params[key] = pagination_param[key]
-                    res_obj1: StrapiEntriesResponse = await self._connector.get(
-                        endpoint, session=session, reqargs=dict(headers=self._get_auth_header(), params=params))
-                    res_obj: StrapiEntriesResponse
-                    if page == 1:
-                        res_obj = res_obj1
-                    else:
-                        if res_obj['data'] is not None and res_obj1['data'] is not None:
-                            res_obj['data'] += res_obj1['data']
-                        res_obj['meta'] = res_obj1['meta']
-                    page += 1
-                    pages = res_obj['meta']['pagination']['pageCount']
-                    get_more = page <= pages
-                return res_obj
+            return await self._get_all_entries(endpoint, params, batch_size, max_concurrency)
+
+    async def iter_pages(
+        self,
+        plural_api_id: str,
+        sort: Optional[List[str]] = None,
+        filters: Optional[dict] = None,
+        populate: Optional[PopulationParameter] = None,
+        fields: Optional[List[str]] = None,
+        publication_state: Optional[Union[str, PublicationState]] = None,
+        batch_size: int = 100,
+        prefetch: bool = False,
+        pagination_strategy: Union[str, PaginationStrategy] = PaginationStrategy.page,
+        keyset_field: str = 'id',
+        query: Optional[Query] = None,
+        projection: Optional[Projection] = None
+    ) -> AsyncIterator[StrapiEntriesResponse]:
+        """Iterate over all pages of entries, page by page.
+        If `prefetch` is True, the next page is fetched while the caller processes the current one.
+        Only the first page is requested with count, the meta of the others is completed from it.
+
+        Usage:
+        >>> async for page in client.iter_pages('posts', batch_size=500, prefetch=True):
+        ...     print(page['data'])
+        >>> async for page in client.iter_pages('posts', batch_size=500, pagination_strategy='keyset'):
+        ...     print(page['data'])
+        """
+        populate, fields = _get_projection_parameters(projection, populate, fields)
+        if PaginationStrategy(pagination_strategy) == PaginationStrategy.keyset:
+            query = _get_query(query, sort, filters, populate, fields, publication_state)
+            _check_keyset_pagination(query.sort, prefetch=prefetch)
+            async for res in self._iter_keyset_pages(plural_api_id, query, keyset_field, batch_size):
+                yield res
+            return
+        endpoint, params = _get_query_request(plural_api_id, query, sort, filters, populate, fields, publication_state)
+        page = 1
+        res = await self._get_page(endpoint, params, page, batch_size)
+        first_pagination = res['meta']['pagination']
+        next_page: Optional[asyncio.Future] = None
+        try:
+            while True:
+                is_last = _is_last_page(res, first_pagination, page)
+                if prefetch and not is_last:
+                    next_page = asyncio.ensure_future(self._get_page(endpoint, params, page + 1, batch_size, False))
+                yield res
+                if is_last:
+                    return
+                page += 1
+                if next_page is not None:
+                    res, next_page = await next_page, None
+                else:
+                    res = await self._get_page(endpoint, params, page, batch_size, False)
+                res = {**res, 'meta': _get_page_meta(res, first_pagination, page)}
+        finally:
+            if next_page is not None:
+                next_page.cancel()
+
+    async def iter_entries(
+        self,
+        plural_api_id: str,
+        sort: Optional[List[str]] = None,
+        filters: Optional[dict] = None,
+        populate: Optional[PopulationParameter] = None,
+        fields: Optional[List[str]] = None,
+        publication_state: Optional[Union[str, PublicationState]] = None,
+        batch_size: int = 100,
+        prefetch: bool = False,
+        pagination_strategy: Union[str, PaginationStrategy] = PaginationStrategy.page,
+        keyset_field: str = 'id',
+        query: Optional[Query] = None,
+        projection: Optional[Projection] = None
+    ) -> AsyncIterator[StrapiResponseEntryData]:
+        """Iterate over all entries. Only one page (two with `prefetch`) is kept in memory at a time.
+
+        Usage:
+        >>> async for entry in client.iter_entries('posts', filters={'title': {Filter.startsWith: 'a'}}):
+        ...     print(entry['id'])
+        """
+        async for res in self.iter_pages(
+            plural_api_id, sort=sort, filters=filters, populate=populate, fields=fields,
+            publication_state=publication_state, batch_size=batch_size, prefetch=prefetch,
+            pagination_strategy=pagination_strategy, keyset_field=keyset_field, query=query, projection=projection
+        ):
+            for entry in res['data'] or []:
+                yield entry
+
+    async def _get_page(
+        self, endpoint: str, params: dict, page: int, batch_size: int, with_count: bool = True
+    ) -> StrapiEntriesResponse:
+        """Get a page of entries.
+        Without count, Strapi skips the count query, and the meta has no `pageCount` and `total`.
+        """
+        pagination = {'page': page, 'pageSize': batch_size} if with_count else \
+            {'page': page, 'pageSize': batch_size, 'withCount': 'false'}
+        pagination_param = _stringify_parameters('pagination', pagination)
+        res: StrapiEntriesResponse = await self._connector.get(
+            endpoint,
+            session=self._get_session(),
+            reqargs=dict(headers=self._get_auth_header(), params={**params, **pagination_param}))
+        return res
+
+    async def _iter_keyset_pages(
+        self, endpoint: str, query: Query, keyset_field: str, batch_size: int
+    ) -> AsyncIterator[StrapiEntriesResponse]:
+        """Iterate over pages sorted by `keyset_field`, each one after the last value of the previous page."""
+        last_value = None
+        while True:
+            params = _get_keyset_parameters(
+                query.filters, query.populate, query.fields, query.publication_state, keyset_field, last_value,
+                batch_size)
+            res: StrapiEntriesResponse = await self._connector.get(
+                endpoint, session=self._get_session(), reqargs=dict(headers=self._get_auth_header(), params=params))
+            yield res
+            if _is_last_keyset_page(res):
+                return
+            last_value = _get_keyset_value((res['data'] or [])[-1], keyset_field)
+
+    async def _get_all_entries_by_keyset(
+        self, endpoint: str, query: Query, keyset_field: str, batch_size: int
+    ) -> StrapiEntriesResponse:
+        """Get all entries with keyset pagination and merge them to one page."""
+        pages = self._iter_keyset_pages(endpoint, query, keyset_field, batch_size)
+        data: List[StrapiResponseEntryData] = []
+        meta: StrapiResponseMeta = {}
+        async for res in pages:
+            data += res['data'] or []
+            meta = res['meta']
+        return _merge_keyset_pages(data, meta)
+
+    async def _get_all_entries(
+        self, endpoint: str, params: dict, batch_size: int, max_concurrency: ConcurrencyLimit
+    ) -> StrapiEntriesResponse:
+        """Get all entries page by page and merge the pages in order.
+
+        Only the first page is requested with count, the page count of the others is known from it.
+        """
+        first_page = await tracked_async(partial(self._get_page, endpoint, params, 1, batch_size), max_concurrency)()
+        first_pagination = first_page['meta']['pagination']
+        page_count = first_pagination['pageCount']
+        pages = await gather_limited(
+            [tracked_async(partial(self._get_page, endpoint, params, page, batch_size, False), max_concurrency)
+             for page in range(2, page_count + 1)],
+            max_concurrency)
+        if first_page['data'] is None:
+            return first_page
+        data = list(first_page['data'])
+        for res in pages:
+            data += res['data'] or []
+        res_obj: StrapiEntriesResponse = {**first_page, 'data': data}
+        if pages:
+            res_obj['meta'] = _get_page_meta(pages[-1], first_pagination, page_count)
+        return res_obj
 
     async def create_entry(self, plural_api_id: str, data: dict) -> StrapiEntryResponse:
         """Create new entry.
@@ -160,7 +442,7 @@ class StrapiClient:
         """
         body = {'data': data}
         res: StrapiEntryResponse = await self._connector.post(
-            plural_api_id, reqargs=dict(headers=self._get_auth_header(), json=body))
+            plural_api_id, session=self._get_session(), reqargs=dict(headers=self._get_auth_header(), json=body))
         return res
 
     async def update_entry(
@@ -177,7 +459,7 @@ class StrapiClient:
         endpoint = f'{plural_api_id}/{document_id}'
         body = {'data': data}
         res: StrapiEntryResponse = await self._connector.put(
-            endpoint, reqargs=dict(headers=self._get_auth_header(), json=body))
+            endpoint, session=self._get_session(), reqargs=dict(headers=self._get_auth_header(), json=body))
         return res
 
     async def delete_entry(self, plural_api_id: str, document_id: int) -> StrapiEntryResponse:
@@ -188,9 +470,81 @@ class StrapiClient:
         """
         endpoint = f'{plural_api_id}/{document_id}'
         res: StrapiEntryResponse = await self._connector.delete(
-            endpoint, reqargs=dict(headers=self._get_auth_header()))
+            endpoint, session=self._get_session(), reqargs=dict(headers=self._get_auth_header()))
         return res
 
+    async def create_entries(
+        self, plural_api_id: str, data: Iterable[dict], max_concurrency: ConcurrencyLimit = 10
+    ) -> AsyncIterator[BulkItemResult]:
+        """Create many entries, up to `max_concurrency` requests at a time.
+
+        Yield a `BulkItemResult` for each item as soon as it is done (not in order).
+        A failed item doesn't stop the batch, its error is set in the result.
+
+        Usage:
+        >>> async for result in client.create_entries('posts', [{'name': 'A'}, {'name': 'B'}]):
+        ...     if not result.ok:
+        ...         print(result.index, result.error)
+        """
+        async for result in self._run_bulk(
+            ((index, item, partial(self.create_entry, plural_api_id, item)) for index, item in enumerate(data)),
+            max_concurrency
+        ):
+            yield result
+
+    async def update_entries(
+        self, plural_api_id: str, entries: Iterable[Tuple[int, dict]], max_concurrency: ConcurrencyLimit = 10
+    ) -> AsyncIterator[BulkItemResult]:
+        """Update many entries, given as `(document_id, data)` pairs, up to `max_concurrency` requests at a time.
+
+        Yield a `BulkItemResult` for each item as soon as it is done (not in order).
+        A failed item doesn't stop the batch, its error is set in the result.
+
+        Usage:
+        >>> async for result in client.update_entries('posts', [(1, {'name': 'A'}), (2, {'name': 'B'})]):
+        ...     print(result.ok)
+        """
+        async for result in self._run_bulk(
+            ((index, entry, partial(self.update_entry, plural_api_id, entry[0], entry[1]))
+             for index, entry in enumerate(entries)),
+            max_concurrency
+        ):
+            yield result
+
+    async def delete_entries(
+        self, plural_api_id: str, document_ids: Iterable[int], max_concurrency: ConcurrencyLimit = 10
+    ) -> AsyncIterator[BulkItemResult]:
+        """Delete many entries by id, up to `max_concurrency` requests at a time.
+
+        Yield a `BulkItemResult` for each item as soon as it is done (not in order).
+        A failed item doesn't stop the batch, its error is set in the result.
+
+        Usage:
+        >>> async for result in client.delete_entries('posts', [1, 2, 3]):
+        ...     print(result.ok)
+        """
+        async for result in self._run_bulk(
+            ((index, document_id, partial(self.delete_entry, plural_api_id, document_id))
+             for index, document_id in enumerate(document_ids)),
+            max_concurrency
+        ):
+            yield result
+
+    async def _run_bulk(
+        self,
+        calls: Iterable[Tuple[int, Any, Callable[[], Awaitable[StrapiEntryResponse]]]],
+        max_concurrency: ConcurrencyLimit
+    ) -> AsyncIterator[BulkItemResult]:
+        """Run `(index, item, func)` calls concurrently and yield the results as they complete."""
+        async def run(index: int, item: Any, func: Callable[[], Awaitable[StrapiEntryResponse]]) -> BulkItemResult:
+            try:
+                return BulkItemResult(index, item, response=await tracked_async(func, max_concurrency)())
+            except (StrapiError, ValueError) as e:
+                return BulkItemResult(index, item, error=e)
+
+        async for result in iter_limited((partial(run, *call) for call in calls), max_concurrency):
+            yield result
+
     async def upsert_entry(
         self,
         plural_api_id: str,
@@ -225,6 +579,54 @@ class StrapiClient:
         else:
             return await self.create_entry(plural_api_id=plural_api_id, data=data)
 
+    async def upsert_entries(
+        self,
+        plural_api_id: str,
+        data: Iterable[dict],
+        keys: List[str],
+        chunk_size: int = 50,
+        max_concurrency: ConcurrencyLimit = 10
+    ) -> AsyncIterator[BulkItemResult]:
+        """Create entries or update fields, like `upsert_entry()` for many items.
+
+        The existing entries of each chunk of `chunk_size` items are found with one request,
+        then the entries of the chunk are created or updated, up to `max_concurrency` requests at a time.
+        Yield a `BulkItemResult` for each item as soon as it is done (not in order).
+        The error of an item whose keys match more than one entry is `ValueError`.
+        Keys are compared in Python first; when the server found entries that equal no item of the chunk
+        (e.g. by a case-insensitive collation, or dates and numbers formatted differently),
+        each unmatched item of the chunk is upserted with `upsert_entry()`, so the server compares its keys.
+        Items of a chunk that only the server considers equal are not merged.
+
+        Usage:
+        >>> async for result in client.upsert_entries('posts', rows, ['name'], chunk_size=100):
+        ...     print(result.ok)
+        """
+        for chunk in _chunk_rows_by_keys(data, keys, chunk_size):
+            try:
+                existing = await self.get_entries(
+                    plural_api_id, fields=keys, filters=_get_keys_filter([row for _, row in chunk], keys), get_all=True)
+            except StrapiError as e:
+                for index, row in chunk:
+                    yield BulkItemResult(index, row, error=e)
+                continue
+            ids = _index_entries_by_keys(existing['data'] or [], keys)
+            unmatched = _has_unmatched_entries(ids, [row for _, row in chunk], keys)
+            calls: List[Tuple[int, Any, Callable[[], Awaitable[StrapiEntryResponse]]]] = []
+            for index, row in chunk:
+                entry_ids = ids.get(tuple(row[key] for key in keys), [])
+                if len(entry_ids) > 1:
+                    error = ValueError(f'Keys are ambiguous, found {len(entry_ids)} records')
+                    yield BulkItemResult(index, row, error=error)
+                elif len(entry_ids) == 1:
+                    calls.append((index, row, partial(self.update_entry, plural_api_id, entry_ids[0], row)))
+                elif unmatched:
+                    calls.append((index, row, partial(self.upsert_entry, plural_api_id, row, keys)))
+                else:
+                    calls.append((index, row, partial(self.create_entry, plural_api_id, row)))
+            async for result in self._run_bulk(calls, max_concurrency):
+                yield result
+
     def _get_auth_header(self) -> Optional[dict]:
         """Compose auth header from token."""
         if self._token:
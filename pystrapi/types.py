@@ -1,4 +1,5 @@
-from typing import Any, Dict, List, Optional, Union
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Union
 from typing_extensions import TypedDict, NotRequired
 
 
@@ -84,3 +85,70 @@ class PaginationParameterByOffset(TypedDict):
 
 PaginationParameter = Union[PaginationParameterByPage, PaginationParameterByOffset]
 PopulationParameter = Union[str, List[str], Dict[str, Any]]
+
+
+# ------------------- RESULT TYPES -------------------
+
+@dataclass
+class BulkItemResult:
+    """Result of one item of a bulk operation, like `create_entries()`.
+
+    If the request of the item failed, `error` is set and `response` is None.
+    """
+    index: int
+    """Index of the item in the given items"""
+    item: Any
+    """The given item"""
+    response: Optional[StrapiEntryResponse] = None
+    error: Optional[Exception] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+class Entry(Mapping[str, Any]):
+    """Read-only view of an entry from response, like `{'id': 1, **attributes}` without copying the attributes.
+
+    Values are looked up in the wrapped entry (`raw`) on access, so a view costs one small object per entry.
+    The view is equal to the dict that `process_data` builds, use `dict(entry)` to get a copy.
+
+    Usage:
+    >>> entry = Entry(response['data'])
+    >>> entry['id'], entry['title'], entry.attributes['title']
+    (1, 'Post', 'Post')
+    """
+
+    __slots__ = ('raw',)
+
+    def __init__(self, raw: StrapiResponseEntryData):
+        self.raw = raw
+
+    @property
+    def id(self) -> int:
+        return self.raw['id']
+
+    @property
+    def attributes(self) -> Dict[str, Any]:
+        return self.raw['attributes']
+
+    def __getitem__(self, key: str) -> Any:
+        if key == 'id':
+            return self.raw['id']
+        return self.raw['attributes'][key]
+
+    def __iter__(self) -> Iterator[str]:
+        yield 'id'
+        for key in self.raw['attributes']:
+            if key != 'id':
+                yield key
+
+    def __len__(self) -> int:
+        attributes = self.raw['attributes']
+        return len(attributes) + (0 if 'id' in attributes else 1)
+
+    def __contains__(self, key: object) -> bool:
+        return key == 'id' or key in self.raw['attributes']
+
+    def __repr__(self) -> str:
+        return f'Entry({dict(self)!r})'
@@ -0,0 +1,54 @@
+import json
+from pathlib import Path
+
+from benchmarks.run import BenchmarkConfig, main, run_benchmarks
+from benchmarks.server import FakeStrapiServer
+from pystrapi.strapi_client import StrapiClient
+from pystrapi.strapi_client_sync import StrapiClientSync
+
+
+def test_fake_strapi_server() -> None:
+    with FakeStrapiServer({'posts': 30}, payload_size=10) as server:
+        with StrapiClientSync(api_url=server.api_url) as client:
+            res = client.get_entries('posts', get_all=True, batch_size=7, max_concurrency=3)
+            assert [e['id'] for e in res['data'] or []] == list(range(1, 31))
+            keyset = list(client.iter_entries('posts', batch_size=7, pagination_strategy='keyset'))
+            assert len(keyset) == 30
+            rows = [{'slug': 'posts-3', 'title': 'A'}, {'slug': 'new'}]
+            results = list(client.upsert_entries('posts', rows, ['slug']))
+            assert all(r.ok for r in results)
+            assert client.get_entry('posts', 3)['data'] == {'id': 3, 'attributes': {
+                'body': 'x' * 10, 'slug': 'posts-3', 'title': 'A', 'rating': 3, 'createdAt': '2024-01-01T00:00:00.000Z',
+                'updatedAt': '2024-01-01T00:00:00.000Z', 'publishedAt': '2024-01-01T00:00:00.000Z'}}
+            assert len(client.get_entries('posts', filters={'rating': {'$gt': 29}}, get_all=True)['data'] or []) == 1
+
+
+async def test_fake_strapi_server_async() -> None:
+    with FakeStrapiServer({'posts': 10}, latency=0.001) as server:
+        async with StrapiClient(api_url=server.api_url) as client:
+            results = [r async for r in client.delete_entries('posts', [1, 2, 20])]
+            assert sorted(r.ok for r in results) == [False, True, True]
+            res = await client.get_entries('posts', sort=['id:desc'], pagination={'start': 0, 'limit': 3})
+    assert [e['id'] for e in res['data'] or []] == [10, 9, 8]
+
+
+def test_fake_strapi_server_max_limit() -> None:
+    with FakeStrapiServer({'posts': 12}, payload_size=1, max_limit=5) as server:
+        with StrapiClientSync(api_url=server.api_url) as client:
+            res = client.get_entries('posts', pagination={'page': 1, 'pageSize': 100})
+            assert res['meta']['pagination'] == {'page': 1, 'pageSize': 5, 'pageCount': 3, 'total': 12}
+            res = client.get_entries('posts', pagination={'start': 0, 'limit': 100})
+            assert len(res['data'] or []) == 5
+            assert res['meta']['pagination'] == {'start': 0, 'limit': 5, 'total': 12}
+            assert len(list(client.iter_entries('posts', batch_size=100))) == 12
+            assert len(list(client.iter_entries('posts', batch_size=100, pagination_strategy='keyset'))) == 12
+
+
+def test_run_benchmarks(tmp_path: Path) -> None:
+    results = run_benchmarks(BenchmarkConfig(entries=20, writes=4, batch_size=5, repeat=1))
+    names = [r['name'] for r in results['results']]
+    assert 'get_entries_get_all[async]' in names and 'upsert_entries[sync]' in names
+    assert all(r['median'] > 0 for r in results['results'])
+    output = tmp_path / 'results.json'
+    main(['--entries', '10', '--writes', '2', '--repeat', '1', '--output', str(output)])
+    assert json.loads(output.read_text())['config']['entries'] == 10
@@ -0,0 +1,110 @@
+import time
+
+from pystrapi.cache import CacheEntry, CachingConnector, CachingConnectorSync, ResponseCache
+from pystrapi.strapi_client import StrapiClient
+from pystrapi.strapi_client_sync import StrapiClientSync
+from test.utils.fakes import FakeConnector, FakeConnectorSync, FakeStrapi
+
+
+def _posts() -> FakeStrapi:
+    return FakeStrapi({'posts': [{'title': 'a'}, {'title': 'b'}], 'settings': [{'theme': 'dark'}]})
+
+
+def test_response_cache_lru_and_ttl() -> None:
+    cache = ResponseCache(maxsize=2)
+    now = time.monotonic()
+    cache.set('a', CacheEntry(200, 'OK', {}, 'A', now + 60))
+    cache.set('b', CacheEntry(200, 'OK', {}, 'B', now + 60))
+    assert cache.get('a') is not None  # 'b' is now the least recently used
+    cache.set('c', CacheEntry(200, 'OK', {}, 'C', now + 60))
+    cache.set('d', CacheEntry(200, 'OK', {}, 'D', now - 1))
+    assert cache.get('b') is None
+    assert cache.get('d') is None
+    assert cache.stats.hits == 1
+    assert cache.stats.misses == 2
+    assert cache.stats.evictions == 2
+
+
+async def test_caching_connector() -> None:
+    strapi = _posts()
+    connector = CachingConnector(FakeConnector(strapi), endpoint_ttls={'settings': 0})
+    async with StrapiClient(api_url=strapi.api_url, connector=connector) as client:
+        first = await client.get_entry('posts', 1)
+        assert await client.get_entry('posts', 1) == first
+        await client.get_entry('posts', 1, fields=['title'])
+        client.set_token('token')
+        await client.get_entry('posts', 1)
+        await client.get_entry('settings', 1)
+        await client.get_entry('settings', 1)
+        await client.update_entry('posts', 1, {'title': 'c'})
+        await client.update_entry('posts', 1, {'title': 'c'})
+    assert len(strapi.requests) == 7
+    assert connector.cache.stats.hits == 1
+    assert connector.cache.stats.misses == 3
+
+
+def test_endpoint_ttls() -> None:
+    connector = CachingConnectorSync(endpoint_ttls={'settings': 0, 'posts': 5})
+    assert connector._get_ttl('http://localhost:1337/api/settings?populate=*') == 0
+    assert connector._get_ttl('http://localhost:1337/api/posts/settings') == 5
+    assert connector._get_ttl('http://localhost:1337/api/authors/1/posts') == 60
+    connector = CachingConnectorSync(endpoint_ttls={'api': 0, 'posts': 5}, api_url='http://cms/api/v2/')
+    assert connector._get_ttl('http://cms/api/v2/posts/1') == 5
+    assert connector._get_ttl('http://cms/api/v2/authors') == 60
+
+
+def test_caching_connector_sync() -> None:
+    strapi = _posts()
+    connector = CachingConnectorSync(FakeConnectorSync(strapi))
+    with StrapiClientSync(api_url=strapi.api_url, connector=connector) as client:
+        first = client.get_entries('posts')
+        assert client.get_entries('posts') == first
+        assert client.get_entries('posts', sort=['title:desc']) != first
+    assert len(strapi.requests) == 2
+    assert connector.cache.stats.hits == 1
+
+
+async def test_conditional_requests() -> None:
+    strapi = FakeStrapi({'posts': [{'title': 'a'}]}, etags=True)
+    connector = CachingConnector(FakeConnector(strapi), ttl=0, conditional=True)
+    async with StrapiClient(api_url=strapi.api_url, connector=connector) as client:
+        first = await client.get_entry('posts', 1)
+        assert await client.get_entry('posts', 1) == first
+        await client.update_entry('posts', 1, {'title': 'b'})
+        res = await client.get_entry('posts', 1)
+    assert res['data']
+    assert res['data']['attributes']['title'] == 'b'
+    assert connector.cache.stats.revalidations == 1
+
+
+def test_conditional_requests_sync() -> None:
+    strapi = FakeStrapi({'posts': [{'title': 'a'}]}, etags=True)
+    connector = CachingConnectorSync(FakeConnectorSync(strapi), ttl=0, conditional=True)
+    with StrapiClientSync(api_url=strapi.api_url, connector=connector) as client:
+        first = client.get_entry('posts', 1)
+        assert client.get_entry('posts', 1) == first
+    assert connector.cache.stats.revalidations == 1
+
+
+async def test_conditional_headers_of_caller() -> None:
+    strapi = FakeStrapi({'posts': [{'title': 'a'}]}, etags=True)
+    connector = CachingConnector(FakeConnector(strapi), conditional=True)
+    url = strapi.api_url + 'posts/1'
+    etag = (await connector.request('GET', url)).headers['ETag']
+    connector.cache.clear()
+    response = await connector.request('GET', url, reqargs={'headers': {'If-None-Match': etag}})
+    assert response.status == 200
+    assert (await response.json())['data']['id'] == 1
+    assert len(strapi.requests) == 3
+
+
+def test_conditional_headers_of_caller_sync() -> None:
+    strapi = FakeStrapi({'posts': [{'title': 'a'}]}, etags=True)
+    connector = CachingConnectorSync(FakeConnectorSync(strapi), ttl=0, conditional=True)
+    url = strapi.api_url + 'posts/1'
+    etag = connector.request('GET', url).headers['ETag']
+    connector.cache.clear()
+    response = connector.request('GET', url, reqargs={'headers': {'If-None-Match': etag}})
+    assert response.status_code == 200
+    assert response.json()['data']['attributes'] == {'title': 'a'}
+    assert len(strapi.requests) == 3
@@ -0,0 +1,145 @@
+import csv
+import json
+import threading
+from pathlib import Path
+
+import pytest
+
+from pystrapi import errors
+from pystrapi.export import EntriesWriter, export_entries, export_entries_sync, get_file_format
+from pystrapi.strapi_client import StrapiClient
+from pystrapi.strapi_client_sync import StrapiClientSync
+from test.utils.fakes import FakeConnector, FakeConnectorSync, FakeStrapi
+
+
+_SCHEMA = {'attributes': {'title': {'type': 'string'}, 'rating': {'type': 'integer'}, 'tags': {'type': 'json'}}}
+
+
+def _fake_strapi() -> FakeStrapi:
+    return FakeStrapi({'posts': [
+        {'title': f'post-{i}', 'rating': i if i % 2 else None, 'tags': ['a', 'b']} for i in range(7)]})
+
+
+def test_get_file_format() -> None:
+    assert get_file_format('posts.jsonl') == 'ndjson'
+    assert get_file_format('posts', 'csv') == 'csv'
+    with pytest.raises(ValueError):
+        get_file_format('posts.txt')
+
+
+def test_export_csv(tmp_path: Path) -> None:
+    strapi = _fake_strapi()
+    path = tmp_path / 'posts.csv'
+    with StrapiClientSync(api_url=strapi.api_url, connector=FakeConnectorSync(strapi)) as client:
+        count = export_entries_sync(client, 'posts', path, buffer_size=3, batch_size=2)
+    assert count == 7
+    with open(path, newline='', encoding='utf-8') as f:
+        rows = list(csv.DictReader(f))
+    assert [row['title'] for row in rows] == [f'post-{i}' for i in range(7)]
+    assert {**rows[1], 'tags': json.loads(rows[1]['tags'])} == {'id': '2', 'title': 'post-1', 'rating': '1',
+                                                                'tags': ['a', 'b']}
+
+
+async def test_export_ndjson(tmp_path: Path) -> None:
+    strapi = _fake_strapi()
+    path = tmp_path / 'posts.ndjson'
+    async with StrapiClient(api_url=strapi.api_url, connector=FakeConnector(strapi)) as client:
+        count = await export_entries(client, 'posts', path, buffer_size=3, batch_size=2, pagination_strategy='keyset')
+    rows = [json.loads(line) for line in path.read_text().splitlines()]
+    assert count == len(rows) == 7
+    assert rows[0] == {'id': 1, 'title': 'post-0', 'rating': None, 'tags': ['a', 'b']}
+
+
+@pytest.mark.parametrize('suffix', ['.parquet', '.arrow'])
+def test_export_arrow(tmp_path: Path, suffix: str) -> None:
+    pa = pytest.importorskip('pyarrow')
+    strapi = _fake_strapi()
+    path = tmp_path / f'posts{suffix}'
+    with StrapiClientSync(api_url=strapi.api_url, connector=FakeConnectorSync(strapi)) as client:
+        export_entries_sync(client, 'posts', path, schema=_SCHEMA, buffer_size=1, batch_size=2)
+    if suffix == '.parquet':
+        table = pytest.importorskip('pyarrow.parquet').read_table(path)
+    else:
+        table = pa.ipc.open_file(str(path)).read_all()
+    assert table.column_names == ['id', 'title', 'rating', 'tags', 'createdAt', 'updatedAt']
+    # the type of rating is of the schema, not of the null in the first buffer
+    assert table.schema.field('rating').type == pa.int64()
+    assert table.column('rating').to_pylist() == [None, 1, None, 3, None, 5, None]
+    assert json.loads(table.column('tags').to_pylist()[0]) == ['a', 'b']
+
+
+def test_export_arrow_schema_errors(tmp_path: Path) -> None:
+    pa = pytest.importorskip('pyarrow')
+    path = tmp_path / 'posts.parquet'
+    with pytest.raises(ValueError):
+        EntriesWriter(path)
+    with pytest.raises(ValueError):
+        EntriesWriter(path, schema=_SCHEMA, columns=['id', 'author'])
+    with pytest.raises(ValueError):
+        with EntriesWriter(path, schema=pa.schema([('id', pa.int64()), ('rating', pa.int64())])) as writer:
+            writer.write({'id': 1, 'attributes': {'rating': 1.5}})
+
+
+def test_export_empty(tmp_path: Path) -> None:
+    with EntriesWriter(tmp_path / 'posts.csv', columns=['id', 'title']):
+        pass
+    assert (tmp_path / 'posts.csv').read_bytes() == b'id,title\r\n'
+    with EntriesWriter(tmp_path / 'posts.ndjson'):
+        pass
+    assert (tmp_path / 'posts.ndjson').read_bytes() == b''
+    pq = pytest.importorskip('pyarrow.parquet')
+    with EntriesWriter(tmp_path / 'posts.parquet', schema=_SCHEMA, columns=['id', 'title']):
+        pass
+    table = pq.read_table(tmp_path / 'posts.parquet')
+    assert table.num_rows == 0
+    assert table.column_names == ['id', 'title']
+
+
+def test_export_csv_new_column(tmp_path: Path) -> None:
+    with pytest.raises(ValueError):
+        with EntriesWriter(tmp_path / 'posts.csv', buffer_size=1) as writer:
+            writer.write({'id': 1, 'attributes': {'title': 'a'}})
+            writer.write({'id': 2, 'attributes': {'title': 'b', 'rating': 1}})
+    with EntriesWriter(tmp_path / 'posts.csv', schema=_SCHEMA, buffer_size=1) as writer:
+        writer.write({'id': 1, 'attributes': {'title': 'a', 'author': {'data': None}}})
+    with open(tmp_path / 'posts.csv', newline='', encoding='utf-8') as f:
+        assert next(csv.reader(f)) == ['id', 'title', 'rating', 'tags', 'createdAt', 'updatedAt']
+
+
+def test_export_json_dumps(tmp_path: Path) -> None:
+    pq = pytest.importorskip('pyarrow.parquet')
+    with EntriesWriter(tmp_path / 'posts.parquet', schema=_SCHEMA, json_dumps=lambda v: json.dumps(v, indent=1)) as w:
+        w.write({'id': 1, 'attributes': {'title': 'a', 'tags': ['x']}})
+    assert pq.read_table(tmp_path / 'posts.parquet').column('tags').to_pylist() == ['[\n "x"\n]']
+
+
+def test_export_error_keeps_file(tmp_path: Path) -> None:
+    path = tmp_path / 'posts.csv'
+    path.write_text('previous export')
+    with pytest.raises(RuntimeError):
+        with EntriesWriter(path, buffer_size=1) as writer:
+            writer.write({'id': 1, 'attributes': {'title': 'a'}})
+            raise RuntimeError
+    assert path.read_text() == 'previous export'
+    assert list(tmp_path.iterdir()) == [path]
+
+
+async def test_export_async_writes_in_thread(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    strapi = _fake_strapi()
+    threads = set()
+    flush = EntriesWriter.flush
+
+    def record_flush(self: EntriesWriter) -> None:
+        threads.add(threading.get_ident())
+        flush(self)
+
+    monkeypatch.setattr(EntriesWriter, 'flush', record_flush)
+    path = tmp_path / 'posts.ndjson'
+    async with StrapiClient(api_url=strapi.api_url, connector=FakeConnector(strapi)) as client:
+        assert await export_entries(client, 'posts', path, buffer_size=3, batch_size=2) == 7
+        assert threads and threading.get_ident() not in threads
+        respond = strapi.respond
+        strapi.respond = lambda *args: (500, None, {}) if len(strapi.requests) >= 6 else respond(*args)  # type: ignore
+        with pytest.raises(errors.StrapiError):  # the third page fails after two pages were written
+            await export_entries(client, 'posts', tmp_path / 'failed.ndjson', buffer_size=1, batch_size=2)
+    assert list(tmp_path.iterdir()) == [path]
@@ -0,0 +1,63 @@
+from pystrapi.help.helpers import (
+    _chunk_rows_by_keys,
+    _get_keys_filter,
+    _get_keyset_parameters,
+    _stringify_parameters,
+    iter_data,
+    process_data
+)
+from pystrapi.types import Entry
+
+
+def test_stringify_parameters_with_lists() -> None:
+    filters = {'$or': [{'title': {'$eq': 'a'}}, {'id': {'$in': [1, 2]}}]}
+    assert _stringify_parameters('filters', filters) == {
+        'filters[$or][0][title][$eq]': 'a',
+        'filters[$or][1][id][$in][0]': 1,
+        'filters[$or][1][id][$in][1]': 2,
+    }
+
+
+def test_get_keys_filter() -> None:
+    rows = [{'a': 1, 'b': 2}, {'a': 3, 'b': 4}]
+    assert _get_keys_filter(rows, ['a']) == {'a': {'$in': [1, 3]}}
+    assert _get_keys_filter(rows, ['a', 'b']) == {
+        '$or': [{'a': {'$eq': 1}, 'b': {'$eq': 2}}, {'a': {'$eq': 3}, 'b': {'$eq': 4}}]}
+
+
+def test_chunk_rows_by_keys() -> None:
+    rows = [{'k': 1}, {'k': 2}, {'k': 1}, {'k': 3}, {'k': 4}]
+    chunks = [[index for index, _ in chunk] for chunk in _chunk_rows_by_keys(rows, ['k'], chunk_size=3)]
+    assert chunks == [[0, 1], [2, 3, 4]]
+
+
+def test_get_keyset_parameters() -> None:
+    params = _get_keyset_parameters({'a': {'$eq': 1}}, None, ['a'], None, 'uid', 'x', 10)
+    assert params == {
+        'sort': 'uid:asc',
+        'filters[$and][0][a][$eq]': 1,
+        'filters[$and][1][uid][$gt]': 'x',
+        'pagination[start]': 0,
+        'pagination[limit]': 10,
+        'pagination[withCount]': 'false',
+        'fields': 'a,uid',
+    }
+    assert _get_keyset_parameters(None, None, None, None, 'id', None, 10)['sort'] == 'id:asc'
+
+
+def test_process_data_lazy() -> None:
+    response: dict = {
+        'data': [{'id': 1, 'attributes': {'title': 'a'}}, {'id': 2, 'attributes': {'title': 'b'}}], 'meta': {}}
+    entries = process_data(response, lazy=True)
+    assert isinstance(entries, list)
+    assert [dict(e) for e in entries] == process_data(response)
+    entry = entries[0]
+    assert isinstance(entry, Entry)
+    assert entry.attributes is response['data'][0]['attributes']
+    assert (entry.id, entry['title'], 'title' in entry, len(entry)) == (1, 'a', True, 2)
+    assert not hasattr(entry, '__dict__')
+    assert [dict(e) for e in iter_data(response)] == process_data(response)
+    single = process_data({'data': response['data'][0]}, lazy=True)
+    assert isinstance(single, Entry)
+    assert single == {'id': 1, 'title': 'a'}
+    assert list(iter_data({'data': None})) == []
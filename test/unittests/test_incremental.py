@@ -0,0 +1,92 @@
+import sqlite3
+from pathlib import Path
+from typing import Any, List, Optional
+
+import pytest
+
+from pystrapi.incremental import FileStateStore, SQLiteStateStore, Watermark, iter_changes, iter_changes_sync
+from pystrapi.strapi_client import StrapiClient
+from pystrapi.strapi_client_sync import StrapiClientSync
+from test.utils.fakes import FakeConnector, FakeConnectorSync, FakeStrapi
+
+_CREATED = '2024-01-01T00:00:00.000Z'
+
+
+def _fake_strapi(max_limit: Optional[int] = None) -> FakeStrapi:
+    # two entries share each updatedAt, so pages end between entries of the same timestamp
+    return FakeStrapi({'posts': [
+        {'title': f'post-{i}', 'createdAt': _CREATED, 'updatedAt': f'2024-01-0{1 + i // 2}T00:00:00.000Z'}
+        for i in range(5)]}, max_limit=max_limit)
+
+
+def test_file_state_store(tmp_path: Path) -> None:
+    store = FileStateStore(tmp_path / 'state.json')
+    assert store.get('posts') is None
+    store.set('posts', Watermark('2024-01-01T00:00:00.000Z', 3))
+    store.set('pages', Watermark('2024-01-02T00:00:00.000Z', 1))
+    assert FileStateStore(tmp_path / 'state.json').get('posts') == Watermark('2024-01-01T00:00:00.000Z', 3)
+
+
+def test_sqlite_state_store(tmp_path: Path) -> None:
+    store = SQLiteStateStore(tmp_path / 'state.db')
+    assert store.get('posts') is None
+    store.set('posts', Watermark('2024-01-01T00:00:00.000Z', 3))
+    store.set('posts', Watermark('2024-01-02T00:00:00.000Z', 1))
+    assert SQLiteStateStore(tmp_path / 'state.db').get('posts') == Watermark('2024-01-02T00:00:00.000Z', 1)
+
+
+def test_sqlite_state_store_closes_connections(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    connections: List[sqlite3.Connection] = []
+    connect = sqlite3.connect
+
+    def record_connect(*args: Any) -> sqlite3.Connection:
+        connections.append(connect(*args))
+        return connections[-1]
+
+    monkeypatch.setattr(sqlite3, 'connect', record_connect)
+    store = SQLiteStateStore(tmp_path / 'state.db')
+    store.set('posts', Watermark(_CREATED, 1))
+    assert store.get('posts') == Watermark(_CREATED, 1)
+    assert len(connections) == 3
+    for connection in connections:
+        with pytest.raises(sqlite3.ProgrammingError):  # closed
+            connection.execute('SELECT 1')
+
+
+async def test_iter_changes(tmp_path: Path) -> None:
+    strapi = _fake_strapi()
+    store = SQLiteStateStore(tmp_path / 'state.db')
+    async with StrapiClient(api_url=strapi.api_url, connector=FakeConnector(strapi)) as client:
+        changes = [c async for c in iter_changes(client, 'posts', store, batch_size=2)]
+        assert [(c.kind, c.entry['id']) for c in changes] == [('insert', i) for i in range(1, 6)]
+        assert store.get('posts') == Watermark('2024-01-03T00:00:00.000Z', 5)
+        assert [c async for c in iter_changes(client, 'posts', store, batch_size=2)] == []
+
+        rows = strapi.collections['posts']
+        rows[1]['attributes']['updatedAt'] = '2024-02-01T00:00:00.000Z'
+        rows.append({'id': 6, 'attributes': {
+            'title': 'post-5', 'createdAt': '2024-02-02T00:00:00.000Z', 'updatedAt': '2024-02-02T00:00:00.000Z'}})
+        changes = [c async for c in iter_changes(client, 'posts', store, batch_size=2)]
+    assert [(c.kind, c.entry['id']) for c in changes] == [('update', 2), ('insert', 6)]
+    assert strapi.requests[-1][2]['pagination'] == {'start': '0', 'limit': '2', 'withCount': 'false'}
+
+
+def test_iter_changes_sync(tmp_path: Path) -> None:
+    strapi = _fake_strapi()
+    store = FileStateStore(tmp_path / 'state.json')
+    with StrapiClientSync(api_url=strapi.api_url, connector=FakeConnectorSync(strapi)) as client:
+        changes = list(iter_changes_sync(client, 'posts', store, key='all-posts', fields=['title'], batch_size=3))
+        assert [c.entry['id'] for c in changes] == [1, 2, 3, 4, 5]
+        strapi.collections['posts'][3]['attributes']['updatedAt'] = '2024-02-01T00:00:00.000Z'
+        changes = list(iter_changes_sync(client, 'posts', store, key='all-posts', batch_size=3))
+    assert [(c.kind, c.entry['id']) for c in changes] == [('update', 4)]
+    assert store.get('posts') is None
+
+
+def test_iter_changes_capped_limit(tmp_path: Path) -> None:
+    strapi = _fake_strapi(max_limit=2)
+    store = FileStateStore(tmp_path / 'state.json')
+    with StrapiClientSync(api_url=strapi.api_url, connector=FakeConnectorSync(strapi)) as client:
+        changes = list(iter_changes_sync(client, 'posts', store, batch_size=100))
+    assert [c.entry['id'] for c in changes] == [1, 2, 3, 4, 5]
+    assert store.get('posts') == Watermark('2024-01-03T00:00:00.000Z', 5)
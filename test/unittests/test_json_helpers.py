@@ -0,0 +1,79 @@
+import json
+from typing import Any, List
+
+import requests
+
+from pystrapi.help.json_helpers import encode_json_body, get_json_dumps, get_json_loads
+from pystrapi.strapi_client import StrapiClient
+from pystrapi.strapi_client_sync import StrapiClientSync
+from test.utils.fakes import FakeConnector, FakeConnectorSync, FakeStrapi
+
+
+def test_default_json_functions() -> None:
+    assert get_json_loads()(get_json_dumps()({'a': [1]})) == {'a': [1]}
+
+
+def test_encode_json_body() -> None:
+    reqargs = {'headers': {'Authorization': 'Bearer x'}, 'json': {'data': {'a': 1}}}
+    encoded = encode_json_body(reqargs, json.dumps)
+    assert encoded == {
+        'headers': {'Authorization': 'Bearer x', 'Content-Type': 'application/json'},
+        'data': '{"data": {"a": 1}}',
+    }
+    assert encode_json_body({'headers': None}, json.dumps) == {'headers': None}
+
+
+def _recording_json(calls: List[str]) -> Any:
+    def loads(s: Any) -> Any:
+        calls.append('loads')
+        return json.loads(s)
+
+    def dumps(o: Any) -> str:
+        calls.append('dumps')
+        return json.dumps(o)
+    return loads, dumps
+
+
+async def test_custom_json_functions() -> None:
+    calls: List[str] = []
+    loads, dumps = _recording_json(calls)
+    strapi = FakeStrapi({'posts': []})
+    async with StrapiClient(
+        api_url=strapi.api_url, connector=FakeConnector(strapi), json_loads=loads, json_dumps=dumps
+    ) as client:
+        res = await client.create_entry('posts', {'title': 'a'})
+    assert res['data']
+    assert res['data']['attributes'] == {'title': 'a'}
+    assert calls == ['dumps', 'loads']
+
+
+def test_custom_json_functions_sync() -> None:
+    calls: List[str] = []
+    loads, dumps = _recording_json(calls)
+    strapi = FakeStrapi({'posts': []})
+    with StrapiClientSync(
+        api_url=strapi.api_url, connector=FakeConnectorSync(strapi), json_loads=loads, json_dumps=dumps
+    ) as client:
+        res = client.create_entry('posts', {'title': 'a'})
+    assert res['data']
+    assert res['data']['attributes'] == {'title': 'a'}
+    assert calls == ['dumps', 'loads']
+
+
+class _RecordingConnectorSync(FakeConnectorSync):
+    def __init__(self, strapi: FakeStrapi):
+        super().__init__(strapi)
+        self.reqargs: List[Any] = []
+
+    def request(self, method: str, url: str, *, reqargs: dict = None, session: Any = None) -> requests.Response:
+        self.reqargs.append(reqargs)
+        return super().request(method, url, reqargs=reqargs, session=session)
+
+
+def test_json_body_passed_to_connector_sync() -> None:
+    strapi = FakeStrapi({'posts': []})
+    connector = _RecordingConnectorSync(strapi)
+    with StrapiClientSync(api_url=strapi.api_url, connector=connector) as client:
+        client.create_entry('posts', {'title': 'a'})
+    assert connector.reqargs[0]['json'] == {'data': {'title': 'a'}}
+    assert 'data' not in connector.reqargs[0]
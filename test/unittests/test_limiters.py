@@ -0,0 +1,126 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import aiohttp
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from pystrapi import errors
+from pystrapi.limiters import AdaptiveConcurrencyLimiter, TokenBucket
+from pystrapi.retry import RetryPolicy
+from pystrapi.strapi_client import StrapiClient
+from pystrapi.strapi_client_sync import StrapiClientSync
+from test.utils.fakes import FakeConnector, FakeConnectorSync, FakeStrapi
+
+_SERVER_ERROR = (500, {'data': None, 'error': {'status': 500, 'name': 'InternalServerError', 'message': '',
+                                               'details': {}}})
+_RATELIMIT_ERROR = (429, {'data': None, 'error': {'status': 429, 'name': 'RateLimitError', 'message': '',
+                                                  'details': {}}})
+
+
+def test_token_bucket_threads() -> None:
+    limiter = TokenBucket(rate=100, burst=5)
+    start = time.monotonic()
+    with ThreadPoolExecutor(4) as executor:
+        list(executor.map(lambda _: limiter.acquire(), range(25)))
+    # 5 requests in the burst, then 20 more at 100 per second
+    assert time.monotonic() - start >= 0.19
+
+
+async def test_token_bucket_shared_by_clients() -> None:
+    strapi = FakeStrapi({'posts': [{'title': 'a'}]})
+    limiter = TokenBucket(rate=100, burst=2)
+    client = StrapiClient(api_url=strapi.api_url, connector=FakeConnector(strapi), rate_limiter=limiter)
+    sync_client = StrapiClientSync(api_url=strapi.api_url, connector=FakeConnectorSync(strapi), rate_limiter=limiter)
+    start = time.monotonic()
+    async with client:
+        await asyncio.gather(*[client.get_entry('posts', 1) for _ in range(6)])
+    with sync_client:
+        for _ in range(5):
+            sync_client.get_entry('posts', 1)
+    assert len(strapi.requests) == 11
+    assert time.monotonic() - start >= 0.089
+
+
+def test_adaptive_limiter() -> None:
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=2, max_limit=4)
+    for _ in range(20):
+        limiter.track(lambda: None)
+    assert limiter.limit == 4
+    started = time.monotonic()
+    limiter.observe(started, 0.1, errors.RatelimitError('', status_code=429))
+    assert limiter.limit == 2
+    limiter.observe(started, 0.1, errors.StrapiError('', status_code=503))  # same wave, no second backoff
+    assert limiter.limit == 2
+    limiter.observe(time.monotonic(), 0.1, errors.NotFoundError('', status_code=404))
+    assert limiter.limit == 2
+    assert set(limiter.latency_percentiles()) == {50, 90, 99}
+    assert limiter.in_flight == 0
+
+
+async def test_adaptive_limiter_backs_off() -> None:
+    strapi = FakeStrapi({'posts': [{'title': str(i)} for i in range(30)]})
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=8, latency_tolerance=100)  # back off on errors only
+    async with StrapiClient(api_url=strapi.api_url, connector=FakeConnector(strapi, delay=0.001)) as client:
+        res = await client.get_entries('posts', get_all=True, batch_size=3, max_concurrency=limiter)
+        assert [e['id'] for e in res['data'] or []] == list(range(1, 31))
+        assert limiter.limit > 8
+        limit = limiter.limit
+        strapi.fail_next = [_SERVER_ERROR]
+        results = [r async for r in client.delete_entries('posts', [1, 2], max_concurrency=limiter)]
+    assert sum(isinstance(r.error, errors.InternalServerError) for r in results) == 1
+    assert limiter.limit == limit // 2
+
+
+
+async def test_adaptive_limiter_observes_retries() -> None:
+    strapi = FakeStrapi({'posts': [{'title': str(i)} for i in range(30)]})
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=8, max_limit=10, latency_tolerance=100)
+    strapi.fail_next = [_RATELIMIT_ERROR] * 6
+    retry_policy = RetryPolicy(backoff=0, max_attempts=7)
+    async with StrapiClient(
+        api_url=strapi.api_url, connector=FakeConnector(strapi, delay=0.001), retry_policy=retry_policy
+    ) as client:
+        res = await client.get_entries('posts', get_all=True, batch_size=3, max_concurrency=limiter)
+    assert [e['id'] for e in res['data'] or []] == list(range(1, 31))
+    assert limiter.limit < 8
+
+def test_adaptive_limiter_sync() -> None:
+    strapi = FakeStrapi({'posts': [{'title': str(i)} for i in range(30)]})
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=2, max_limit=4)
+    with StrapiClientSync(api_url=strapi.api_url, connector=FakeConnectorSync(strapi)) as client:
+        res = client.get_entries('posts', get_all=True, batch_size=3, max_concurrency=limiter)
+        assert [e['id'] for e in res['data'] or []] == list(range(1, 31))
+        results = list(client.delete_entries('posts', range(1, 21), max_concurrency=limiter))
+    assert all(r.ok for r in results)
+    assert limiter.limit == 4
+
+
+
+def test_adaptive_limiter_observes_retries_sync() -> None:
+    strapi = FakeStrapi({'posts': [{'title': str(i)} for i in range(30)]})
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=8, max_limit=10, latency_tolerance=100)
+    strapi.fail_next = [_RATELIMIT_ERROR] * 6
+    with StrapiClientSync(
+        api_url=strapi.api_url, connector=FakeConnectorSync(strapi), retry_policy=RetryPolicy(backoff=0, max_attempts=7)
+    ) as client:
+        res = client.get_entries('posts', get_all=True, batch_size=3, max_concurrency=limiter)
+    assert [e['id'] for e in res['data'] or []] == list(range(1, 31))
+    assert limiter.limit < 8
+
+async def test_adaptive_limiter_backs_off_on_timeouts() -> None:
+    async def handle(request: web.Request) -> web.Response:
+        await asyncio.sleep(1)
+        return web.json_response({'data': None, 'meta': {}})
+
+    app = web.Application()
+    app.router.add_delete('/api/posts/{id}', handle)
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=8)
+    async with TestServer(app) as server:
+        session = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=0.05))
+        async with session, StrapiClient(api_url=str(server.make_url('/api/')), session=session) as client:
+            results = [r async for r in client.delete_entries('posts', [1], max_concurrency=limiter)]
+    assert isinstance(results[0].error, errors.StrapiError)
+    assert isinstance(results[0].error.__cause__, asyncio.TimeoutError)
+    assert limiter.limit == 4
@@ -0,0 +1,94 @@
+import json
+from typing import List
+
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from pystrapi import errors
+from pystrapi.help.helpers import get_plural_api_id
+from pystrapi.metrics import LatencyHistogram, RequestInfo, RequestMetrics, ResponseInfo
+from pystrapi.retry import RetryPolicy
+from pystrapi.strapi_client import StrapiClient
+from pystrapi.strapi_client_sync import StrapiClientSync
+from test.utils.fakes import FakeConnector, FakeConnectorSync, FakeStrapi
+
+_RATELIMIT = (429, {'data': None, 'error': {'status': 429, 'name': 'RateLimitError', 'message': '', 'details': {}}})
+
+
+def test_latency_histogram() -> None:
+    histogram = LatencyHistogram([0.1, 1])
+    for seconds in (0.05, 0.05, 0.5, 5):
+        histogram.observe(seconds)
+    assert histogram.counts == [2, 1, 1]
+    assert histogram.percentile(50) == 0.1
+    assert histogram.percentile(75) == 1
+    assert histogram.percentile(100) == float('inf')
+    assert histogram.mean == pytest.approx(1.4)
+    assert LatencyHistogram().percentile(50) is None
+
+
+def test_get_plural_api_id() -> None:
+    assert get_plural_api_id('http://localhost:1337/api/', 'http://localhost:1337/api/posts/1?populate=*') == 'posts'
+    assert get_plural_api_id('http://localhost:1337/api/', 'http://localhost:1337/api/auth/local') == 'auth'
+
+
+async def test_metrics_and_hooks() -> None:
+    strapi = FakeStrapi({'posts': [{'title': str(i)} for i in range(5)]})
+    metrics = RequestMetrics()
+    requests: List[RequestInfo] = []
+    responses: List[ResponseInfo] = []
+    async with StrapiClient(
+        api_url=strapi.api_url, connector=FakeConnector(strapi), retry_policy=RetryPolicy(backoff=0),
+        on_request=[requests.append], on_response=[responses.append], metrics=metrics
+    ) as client:
+        strapi.fail_next = [_RATELIMIT]
+        await client.get_entries('posts', get_all=True, batch_size=2)
+        with pytest.raises(errors.NotFoundError):
+            await client.get_entry('posts', 10)
+        await client.create_entry('posts', {'title': 'new'})
+    assert [(r.method, r.plural_api_id, r.attempt) for r in requests] == [
+        ('GET', 'posts', 1), ('GET', 'posts', 2), ('GET', 'posts', 1), ('GET', 'posts', 1), ('GET', 'posts', 1),
+        ('POST', 'posts', 1)]
+    assert [r.status for r in responses] == [429, 200, 200, 200, 404, 200]
+    assert isinstance(responses[0].error, errors.RatelimitError)
+    gets = metrics.get('posts', 'GET')
+    assert (gets.requests, gets.retries, gets.errors) == (5, 1, 2)
+    assert gets.statuses == {200: 3, 404: 1, 429: 1}
+    assert gets.latency.count == gets.decode_time.count == 5
+    assert metrics.get('posts', 'POST').requests == 1
+    assert json.loads(json.dumps(metrics.to_dict()))['posts GET']['statuses'] == {'200': 3, '404': 1, '429': 1}
+    metrics.reset()
+    assert metrics.snapshot() == {}
+
+
+def test_metrics_sync() -> None:
+    strapi = FakeStrapi({'posts': [{'title': str(i)} for i in range(5)]})
+    metrics = RequestMetrics()
+    with StrapiClientSync(
+        api_url=strapi.api_url, connector=FakeConnectorSync(strapi), retry_policy=RetryPolicy(backoff=0),
+        metrics=metrics
+    ) as client:
+        strapi.fail_next = [_RATELIMIT]
+        client.get_entries('posts', get_all=True, batch_size=5)
+        client.delete_entry('posts', 1)
+    assert metrics.get('posts', 'GET').statuses == {200: 1, 429: 1}
+    assert metrics.get('posts', 'GET').retries == 1
+    assert metrics.get('posts', 'DELETE').requests == 1
+
+
+async def test_metrics_trace() -> None:
+    async def handle(request: web.Request) -> web.Response:
+        return web.json_response({'data': [], 'meta': {}})
+
+    app = web.Application()
+    app.router.add_get('/api/posts', handle)
+    metrics = RequestMetrics()
+    async with TestServer(app) as server:
+        async with StrapiClient(api_url=str(server.make_url('/api/')), metrics=metrics) as client:
+            await client.get_entries('posts')
+            await client.get_entries('posts')
+    gets = metrics.get('posts', 'GET')
+    assert gets.ttfb.count == 2
+    assert gets.connect_time.count == 1
+    assert gets.bytes > 0
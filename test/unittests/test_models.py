@@ -0,0 +1,36 @@
+from pathlib import Path
+
+import pytest
+
+from pystrapi.models import StrapiModel, create_model, decode_data, decode_entry, get_model_fields, load_models
+
+_TESTSERVER = Path(__file__).parents[2] / 'testserver'
+_RESPONSE: dict = {'data': [
+    {'id': 1, 'attributes': {'title': 'a', 'content': 'x', 'unknown': 1}},
+    {'id': 2, 'attributes': {'title': 'b'}},
+]}
+
+
+def test_slotted_model() -> None:
+    Post = load_models(_TESTSERVER, use_msgspec=False)['posts']
+    assert issubclass(Post, StrapiModel)
+    assert get_model_fields(Post) == (
+        'id', 'description', 'content', 'title', 'createdAt', 'updatedAt', 'publishedAt')
+    posts = decode_data(Post, _RESPONSE)
+    assert posts == [Post(id=1, title='a', content='x'), Post(id=2, title='b')]
+    assert posts[1].content is None
+    assert not hasattr(posts[0], '__dict__')
+    assert decode_data(Post, {'data': None}) == []
+
+
+def test_msgspec_model() -> None:
+    msgspec = pytest.importorskip('msgspec')
+    Post = load_models(_TESTSERVER)['posts']
+    assert issubclass(Post, msgspec.Struct)
+    post = decode_entry(Post, _RESPONSE['data'][0])
+    assert (post.id, post.title, post.description) == (1, 'a', None)
+
+
+def test_create_model_invalid_attribute() -> None:
+    with pytest.raises(ValueError):
+        create_model({'info': {'singularName': 'post'}, 'attributes': {'not valid': {'type': 'string'}}})
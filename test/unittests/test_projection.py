@@ -0,0 +1,44 @@
+import pytest
+
+from pystrapi.projection import compile_projection
+from pystrapi.query import Query
+from pystrapi.strapi_client import StrapiClient
+from pystrapi.strapi_client_sync import StrapiClientSync
+from test.utils.fakes import FakeConnector, FakeConnectorSync, FakeStrapi
+
+
+def test_compile_projection() -> None:
+    assert compile_projection(['title', 'author.name', 'colors.*']) == (
+        ['title'], {'author': {'fields': ['name']}, 'colors': '*'})
+    assert compile_projection(['title', 'slug']) == (['title', 'slug'], None)
+    assert compile_projection('title') == (['title'], None)
+    assert compile_projection(['*', 'author.avatar.url', 'author.name', 'author']) == (
+        None, {'author': {'fields': ['name'], 'populate': {'avatar': {'fields': ['url']}}}})
+    assert compile_projection(['author.avatar.*']) == (['id'], {'author': {'fields': ['id'], 'populate': {
+        'avatar': '*'}}})
+    with pytest.raises(ValueError):
+        compile_projection(['author..name'])
+
+
+async def test_get_entries_projection() -> None:
+    strapi = FakeStrapi({'posts': [{'title': 'a'}]})
+    async with StrapiClient(api_url=strapi.api_url, connector=FakeConnector(strapi)) as client:
+        await client.get_entries('posts', projection=['title', 'colors.hex'])
+        assert strapi.requests[-1][2]['fields'] == 'title'
+        assert strapi.requests[-1][2]['populate'] == {'colors': {'fields': ['hex']}}
+        await client.get_entry('posts', 1, projection=['author.name'])
+        assert strapi.requests[-1][2]['populate'] == {'author': {'fields': ['name']}}
+        with pytest.raises(ValueError):
+            await client.get_entries('posts', fields=['title'], projection=['title'])
+        with pytest.raises(ValueError):
+            await client.get_entries('posts', query=Query(sort=['title']), projection=['title'])
+
+
+def test_get_entries_projection_sync() -> None:
+    strapi = FakeStrapi({'posts': [{'title': str(i)} for i in range(5)]})
+    with StrapiClientSync(api_url=strapi.api_url, connector=FakeConnectorSync(strapi)) as client:
+        entries = list(client.iter_entries('posts', batch_size=2, projection=['title', 'author.*']))
+        assert len(entries) == 5
+        assert all(query['populate'] == {'author': '*'} for _, _, query in strapi.requests)
+        client.get_entry('posts', 1, projection=['title'])
+    assert strapi.requests[-1][2]['fields'] == 'title'
@@ -0,0 +1,91 @@
+import pytest
+import requests
+from yarl import URL
+
+from pystrapi.parameters import Filter, PublicationState
+from pystrapi.query import Query
+from pystrapi.strapi_client import StrapiClient
+from pystrapi.strapi_client_sync import StrapiClientSync
+from test.utils.fakes import FakeConnector, FakeConnectorSync, FakeStrapi
+
+
+def test_query_string() -> None:
+    query = Query(
+        sort=['title:desc'],
+        filters={'$or': [{'id': {Filter.IN: [1, 2]}}, {'title': {Filter.eq: 'a b&c'}}], 'draft': {'$null': True}},
+        populate='*',
+        fields=['title', 'id'],
+        publication_state=PublicationState.preview)
+    assert query.query_string == (
+        'sort=title:desc&filters[$or][0][id][$in][0]=1&filters[$or][0][id][$in][1]=2'
+        '&filters[$or][1][title][$eq]=a%20b%26c&filters[draft][$null]=true'
+        '&populate=*&fields=title,id&publicationState=preview')
+    assert Query().query_string == ''
+
+
+def test_query_string_in_url() -> None:
+    query = Query(filters={'title': {'$eq': 'a b&c%'}}, populate='*')
+    url = 'http://fake/api/posts?' + query.query_string
+    expected = {'filters[title][$eq]': 'a b&c%', 'populate': '*'}
+    assert dict(URL(url).query) == expected
+    prepared = requests.Request('GET', url, params={'pagination[page]': 2}).prepare()
+    assert dict(URL(prepared.url or '').query) == {**expected, 'pagination[page]': '2'}
+
+
+def test_query_equality() -> None:
+    query = Query(filters={'id': {'$in': [1, 2]}})
+    assert query == Query(filters={'id': {Filter.IN: [1, 2]}})
+    assert query != Query(filters={'id': {'$in': [2, 1]}})
+    assert len({query, Query(filters={'id': {'$in': [1, 2]}})}) == 1
+
+
+async def test_get_entries_with_query() -> None:
+    strapi = FakeStrapi({'posts': [{'title': f'post-{i:03}'} for i in range(12)]})
+    query = Query(sort=['title:desc'], filters={'title': {'$in': ['post-001', 'post-005', 'post-007']}})
+    async with StrapiClient(api_url=strapi.api_url, connector=FakeConnector(strapi)) as client:
+        res = await client.get_entries('posts', query=query, get_all=True, batch_size=2)
+        assert [e['id'] for e in res['data'] or []] == [8, 6, 2]
+        res = await client.get_entries('posts', query=query, pagination={'page': 2, 'pageSize': 2})
+        assert [e['id'] for e in res['data'] or []] == [2]
+        with pytest.raises(ValueError):
+            await client.get_entries('posts', query=query, sort=['id'])
+
+
+def test_iter_entries_with_query_sync() -> None:
+    strapi = FakeStrapi({'posts': [{'title': f'post-{i:03}'} for i in range(12)]})
+    query = Query(filters={'title': {'$startsWith': 'post-00'}})
+    with StrapiClientSync(api_url=strapi.api_url, connector=FakeConnectorSync(strapi)) as client:
+        for strategy in ('page', 'keyset'):
+            entries = client.iter_entries('posts', query=query, batch_size=3, pagination_strategy=strategy)
+            ids = [e['id'] for e in entries]
+            assert ids == list(range(1, 11))
+
+
+async def test_query_string_only_with_query() -> None:
+    strapi = FakeStrapi({'posts': [{'title': f'post-{i:03}'} for i in range(5)]})
+    sent = []
+    respond = strapi.respond
+    strapi.respond = lambda method, url, reqargs: sent.append((url, reqargs['params'])) or respond(  # type: ignore
+        method, url, reqargs)
+    filters = {'title': {'$in': ['post-001', 'post-002', 'post-003']}}
+    async with StrapiClient(api_url=strapi.api_url, connector=FakeConnector(strapi)) as client:
+        await client.get_entries('posts', filters=filters, get_all=True, batch_size=2)
+        assert [url for url, _ in sent] == ['http://fake/api/posts'] * 2
+        assert all(params['filters[title][$in][2]'] == 'post-003' for _, params in sent)
+        sent.clear()
+        await client.get_entries('posts', query=Query(filters=filters), get_all=True, batch_size=2)
+    assert [url for url, _ in sent] == ['http://fake/api/posts?' + Query(filters=filters).query_string] * 2
+    assert all(key.startswith('pagination[') for _, params in sent for key in params)
+
+
+def test_query_string_only_with_query_sync() -> None:
+    strapi = FakeStrapi({'posts': [{'title': f'post-{i:03}'} for i in range(5)]})
+    sent = []
+    respond = strapi.respond
+    strapi.respond = lambda method, url, reqargs: sent.append(url) or respond(method, url, reqargs)  # type: ignore
+    with StrapiClientSync(api_url=strapi.api_url, connector=FakeConnectorSync(strapi)) as client:
+        assert len(list(client.iter_entries('posts', sort=['title:desc'], batch_size=2))) == 5
+        assert sent == ['http://fake/api/posts'] * 3
+        sent.clear()
+        assert len(list(client.iter_entries('posts', query=Query(sort=['title:desc']), batch_size=2))) == 5
+    assert sent == ['http://fake/api/posts?sort=title:desc'] * 3
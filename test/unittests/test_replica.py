@@ -0,0 +1,156 @@
+import asyncio
+import time
+from typing import Any, Optional
+
+import pytest
+
+from pystrapi.errors import NotFoundError
+from pystrapi.parameters import Filter
+from pystrapi.replica import LocalReplica, LocalReplicaSync
+from pystrapi.strapi_client import StrapiClient
+from pystrapi.strapi_client_sync import StrapiClientSync
+from test.utils.fakes import FakeConnector, FakeConnectorSync, FakeStrapi
+
+
+def _fake_strapi(max_limit: Optional[int] = None) -> FakeStrapi:
+    return FakeStrapi({'posts': [
+        {'title': f'post-{i}', 'color': ['red', 'green', None][i % 3], 'rating': i,
+         'createdAt': '2024-01-01T00:00:00.000Z', 'updatedAt': f'2024-01-0{1 + i}T00:00:00.000Z'}
+        for i in range(6)]}, max_limit=max_limit)
+
+
+def _ids(res: Any) -> list:
+    return [e['id'] for e in res['data']]
+
+
+def _title(res: Any) -> str:
+    data = res['data'][0] if isinstance(res['data'], list) else res['data']
+    return str(data['attributes']['title'])
+
+
+def test_replica_queries() -> None:
+    strapi = _fake_strapi()
+    with StrapiClientSync(api_url=strapi.api_url, connector=FakeConnectorSync(strapi)) as client:
+        replica = LocalReplicaSync(client, 'posts', indexes=['color'], batch_size=4)
+        replica.load()
+    requests_count = len(strapi.requests)
+    assert len(replica) == 6
+    assert _ids(replica.get_entries(filters={'color': {Filter.eq: 'red'}})) == [1, 4]
+    assert _ids(replica.get_entries(filters={'color': {'$in': ['red', 'green']}, 'rating': {'$gt': 1}})) == [4, 5]
+    assert _ids(replica.get_entries(filters={'color': {'$null': True}})) == [3, 6]
+    assert _ids(replica.get_entries(filters={'$or': [{'id': 2}, {'title': {'$endsWith': '-5'}}]})) == [2, 6]
+    assert _ids(replica.get_entries(filters={'rating': {'$between': [1, 3]}}, sort=['color', 'rating:desc'])) == [
+        3, 2, 4]
+    res = replica.get_entries(sort=['rating:desc'], fields=['title'], pagination={'page': 2, 'pageSize': 4})
+    assert res == {'data': [{'id': 2, 'attributes': {'title': 'post-1'}}, {'id': 1, 'attributes': {'title': 'post-0'}}],
+                   'meta': {'pagination': {'page': 2, 'pageSize': 4, 'pageCount': 2, 'total': 6}}}
+    assert replica.get_entry(3, fields=['rating'])['data'] == {'id': 3, 'attributes': {'rating': 2}}
+    assert len(strapi.requests) == requests_count
+    with pytest.raises(NotFoundError):
+        replica.get_entry(10)
+    with pytest.raises(ValueError):
+        replica.get_entries(filters={'author': {'name': {'$eq': 'a'}}})
+
+
+def test_replica_refresh() -> None:
+    strapi = _fake_strapi()
+    with StrapiClientSync(api_url=strapi.api_url, connector=FakeConnectorSync(strapi)) as client:
+        replica = LocalReplicaSync(client, 'posts', indexes=['color'])
+        replica.load()
+        rows = strapi.collections['posts']
+        rows[0]['attributes'].update(color='blue', updatedAt='2024-02-01T00:00:00.000Z')
+        del rows[1]
+        assert replica.refresh() == 1
+        assert _ids(replica.get_entries(filters={'color': 'red'})) == [4]
+        assert _ids(replica.get_entries(filters={'color': 'blue'})) == [1]
+        assert len(replica) == 6
+        replica.load()
+    assert len(replica) == 5
+
+
+def test_replica_load_capped_limit() -> None:
+    strapi = _fake_strapi(max_limit=4)
+    with StrapiClientSync(api_url=strapi.api_url, connector=FakeConnectorSync(strapi)) as client:
+        replica = LocalReplicaSync(client, 'posts')
+        replica.load()
+    assert len(replica) == 6
+
+
+async def test_replica_background_refresh() -> None:
+    strapi = _fake_strapi()
+    async with StrapiClient(api_url=strapi.api_url, connector=FakeConnector(strapi)) as client:
+        async with LocalReplica(client, 'posts', refresh_interval=0.01) as replica:
+            assert len(replica) == 6
+            strapi.collections['posts'].append({'id': 7, 'attributes': {
+                'title': 'post-6', 'createdAt': '2024-02-01T00:00:00.000Z', 'updatedAt': '2024-02-01T00:00:00.000Z'}})
+            for _ in range(100):
+                if len(replica) == 7:
+                    break
+                await asyncio.sleep(0.01)
+        assert _title(replica.get_entries(filters={'id': 7})) == 'post-6'
+
+
+
+async def test_replica_background_refresh_error() -> None:
+    strapi = _fake_strapi()
+    async with StrapiClient(api_url=strapi.api_url, connector=FakeConnector(strapi)) as client:
+        async with LocalReplica(client, 'posts', refresh_interval=0.01) as replica:
+            refresh = replica.refresh
+            errors = [RuntimeError('bug')]
+
+            async def failing_refresh() -> None:
+                if errors:
+                    raise errors.pop()
+                await refresh()
+
+            replica.refresh = failing_refresh  # type: ignore
+            for _ in range(100):
+                if not errors:
+                    break
+                await asyncio.sleep(0.01)
+            assert isinstance(replica.last_error, RuntimeError)
+            strapi.collections['posts'][5]['attributes']['updatedAt'] = '2024-02-01T00:00:00.000Z'
+            strapi.collections['posts'][5]['attributes']['title'] = 'updated'
+            for _ in range(100):
+                if _title(replica.get_entry(6)) == 'updated':
+                    break
+                await asyncio.sleep(0.01)
+        assert _title(replica.get_entry(6)) == 'updated'
+        assert replica.last_error is None
+
+def test_replica_sync_background_refresh() -> None:
+    strapi = _fake_strapi()
+    with StrapiClientSync(api_url=strapi.api_url, connector=FakeConnectorSync(strapi)) as client:
+        with LocalReplicaSync(client, 'posts', refresh_interval=0.01) as replica:
+            strapi.fail_next.append((500, {'data': None}))
+            strapi.collections['posts'][5]['attributes']['updatedAt'] = '2024-02-01T00:00:00.000Z'
+            strapi.collections['posts'][5]['attributes']['title'] = 'updated'
+            for _ in range(100):
+                if _title(replica.get_entry(6)) == 'updated':
+                    break
+                time.sleep(0.01)
+        assert _title(replica.get_entry(6)) == 'updated'
+        assert replica.last_error is None
+
+
+def test_replica_sync_background_refresh_error() -> None:
+    strapi = _fake_strapi()
+    with StrapiClientSync(api_url=strapi.api_url, connector=FakeConnectorSync(strapi)) as client:
+        replica = LocalReplicaSync(client, 'posts', refresh_interval=0.01)
+        refresh = replica.refresh
+        calls = []
+
+        def failing_refresh() -> None:
+            calls.append(True)
+            if len(calls) == 1:
+                raise RuntimeError('bug')
+            refresh()
+
+        replica.refresh = failing_refresh  # type: ignore
+        with replica:
+            for _ in range(100):
+                if len(calls) >= 2:
+                    break
+                time.sleep(0.01)
+        assert len(calls) >= 2
+        assert replica.last_error is None
@@ -0,0 +1,61 @@
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+
+import pytest
+
+from pystrapi import errors
+from pystrapi.help.helpers import parse_retry_after
+from pystrapi.retry import RetryPolicy
+from pystrapi.strapi_client import StrapiClient
+from pystrapi.strapi_client_sync import StrapiClientSync
+from test.utils.fakes import FakeConnector, FakeConnectorSync, FakeStrapi
+
+_RATELIMIT = (429, {'data': None, 'error': {'status': 429, 'name': 'RateLimitError', 'message': '', 'details': {}}})
+_NO_DELAY = RetryPolicy(backoff=0, max_attempts=3)
+
+
+def test_parse_retry_after() -> None:
+    assert parse_retry_after('3') == 3
+    assert parse_retry_after(None) is None
+    assert parse_retry_after('bad') is None
+    in_a_minute = format_datetime(datetime.now(timezone.utc) + timedelta(seconds=60), usegmt=True)
+    delay = parse_retry_after(in_a_minute)
+    assert delay is not None
+    assert 55 < delay <= 60
+
+
+def test_retry_policy() -> None:
+    policy = RetryPolicy(backoff=1, max_backoff=3, jitter=False)
+    error = errors.RatelimitError('', status_code=429)
+    assert policy.should_retry('GET', error, 1)
+    assert not policy.should_retry('GET', error, 3)
+    assert not policy.should_retry('POST', error, 1)
+    assert not policy.should_retry('GET', errors.NotFoundError('', status_code=404), 1)
+    assert policy.should_retry('GET', errors.JsonParsingError('', status_code=502), 1)
+    assert [policy.get_delay(error, attempt) for attempt in (1, 2, 3)] == [1, 2, 3]
+    assert policy.get_delay(errors.RatelimitError('', retry_after=2), 1) == 2
+    assert policy.get_delay(errors.RatelimitError('', retry_after=3600), 1) == 3
+
+
+async def test_retry_pages() -> None:
+    strapi = FakeStrapi({'posts': [{'title': str(i)} for i in range(10)]})
+    async with StrapiClient(api_url=strapi.api_url, connector=FakeConnector(strapi), retry_policy=_NO_DELAY) as client:
+        strapi.fail_next = [_RATELIMIT, _RATELIMIT]
+        res = await client.get_entries('posts', get_all=True, batch_size=3)
+        assert res['data']
+        assert len(res['data']) == 10
+        strapi.fail_next = [_RATELIMIT] * 3
+        with pytest.raises(errors.RatelimitError):
+            await client.get_entries('posts', get_all=True, batch_size=3)
+
+
+def test_retry_sync() -> None:
+    strapi = FakeStrapi({'posts': [{'title': 'a'}]})
+    with StrapiClientSync(
+        api_url=strapi.api_url, connector=FakeConnectorSync(strapi), retry_policy=_NO_DELAY
+    ) as client:
+        strapi.fail_next = [_RATELIMIT]
+        assert client.get_entry('posts', 1)['data']
+        strapi.fail_next = [_RATELIMIT]
+        with pytest.raises(errors.RatelimitError):
+            client.create_entry('posts', {'title': 'b'})  # POST is not retried by default
@@ -1,4 +1,19 @@
+import asyncio
+from typing import Optional
+
+import aiohttp
+import pytest
+
+from benchmarks.server import FakeStrapiServer
+from pystrapi import errors
 from pystrapi.strapi_client import StrapiClient
+from test.utils import fakes
+from test.utils.fakes import FakeConnector, FakeStrapi
+
+
+def _fake_client(size: int = 0, max_limit: Optional[int] = None) -> StrapiClient:
+    strapi = FakeStrapi({'posts': [{'title': f'post-{i:03}'} for i in range(size)]}, max_limit=max_limit)
+    return StrapiClient(api_url=strapi.api_url, connector=FakeConnector(strapi, delay=0.001))
 
 
 def test_api_url() -> None:
@@ -9,3 +24,212 @@ def test_api_url() -> None:
 def test_api_url_no_slash() -> None:
     client = StrapiClient(api_url='url')
     assert client.api_url == 'url/'
+
+
+async def test_session_is_reused() -> None:
+    async with StrapiClient(tcp_connector_args={'limit': 5}) as client:
+        session = client._get_session()  # pylint: disable=protected-access
+        assert client._get_session() is session  # pylint: disable=protected-access
+        assert session.connector is not None
+        assert session.connector.limit == 5
+    assert session.closed
+
+
+# the connections of the session of the closed loop can only be dropped, their sockets are closed on collection
+@pytest.mark.filterwarnings('ignore::pytest.PytestUnraisableExceptionWarning')
+def test_session_of_each_event_loop() -> None:
+    with FakeStrapiServer({'posts': 2}) as server:
+        client = StrapiClient(api_url=server.api_url)
+
+        async def get_entry(entry_id: int) -> aiohttp.ClientSession:
+            assert (await client.get_entry('posts', entry_id))['data']
+            return client._get_session()  # pylint: disable=protected-access
+
+        first = asyncio.run(get_entry(1))
+        second = asyncio.run(get_entry(2))
+        asyncio.run(client.close())
+    assert first is not second
+    assert first.closed and second.closed
+
+
+async def test_external_session_is_not_closed() -> None:
+    async with aiohttp.ClientSession() as session:
+        async with StrapiClient(session=session) as client:
+            assert client._get_session() is session  # pylint: disable=protected-access
+        assert not session.closed
+
+
+@pytest.mark.parametrize('max_concurrency', [1, 4])
+async def test_get_all_entries_in_order(max_concurrency: int) -> None:
+    async with _fake_client(size=23) as client:
+        res = await client.get_entries('posts', get_all=True, batch_size=5, max_concurrency=max_concurrency)
+    assert res['data']
+    assert [e['attributes']['title'] for e in res['data']] == [f'post-{i:03}' for i in range(23)]
+    assert res['meta']['pagination'] == {'page': 5, 'pageSize': 5, 'pageCount': 5, 'total': 23}
+    fake: FakeStrapi = client._connector._connector.strapi  # type: ignore  # pylint: disable=protected-access
+    assert [query['pagination'].get('withCount') for _, _, query in fake.requests] == [None] + ['false'] * 4
+
+
+@pytest.mark.parametrize('max_concurrency', [0, -1])
+async def test_get_all_entries_invalid_concurrency(max_concurrency: int) -> None:
+    async with _fake_client(size=3) as client:
+        with pytest.raises(ValueError):
+            await client.get_entries('posts', get_all=True, batch_size=5, max_concurrency=max_concurrency)
+
+
+async def test_get_all_entries_error() -> None:
+    async with _fake_client(size=23) as client:
+        fake: FakeStrapi = client._connector._connector.strapi  # type: ignore  # pylint: disable=protected-access
+        fake.fail_next = [(200, {'data': [], 'meta': {'pagination': {'pageCount': 5}}}), (500, {})]
+        with pytest.raises(errors.StrapiError):
+            await client.get_entries('posts', get_all=True, batch_size=5, max_concurrency=4)
+
+
+@pytest.mark.parametrize('size', [0, 10, 23])
+async def test_get_all_entries_by_keyset(size: int) -> None:
+    async with _fake_client(size=size) as client:
+        res = await client.get_entries(
+            'posts', get_all=True, batch_size=5, pagination_strategy='keyset', filters={'title': {'$ne': 'post-003'}})
+        fake: FakeStrapi = client._connector._connector.strapi  # type: ignore  # pylint: disable=protected-access
+    titles = [f'post-{i:03}' for i in range(size) if i != 3]
+    assert [e['attributes']['title'] for e in res['data'] or []] == titles
+    assert res['meta']['pagination']['total'] == len(titles)
+    assert len(fake.requests) == len(titles) // 5 + 1
+    last_query = fake.requests[-1][2]
+    assert last_query['sort'] == 'id:asc'
+    assert last_query['pagination']['withCount'] == 'false'
+    if size > 5:
+        # the first page has ids 1, 2, 3, 5, 6, post-003 has id 4
+        assert fake.requests[1][2]['filters']['$and'][1] == {'id': {'$gt': '6'}}
+
+
+async def test_get_all_entries_by_keyset_capped_limit() -> None:
+    async with _fake_client(size=10, max_limit=4) as client:
+        res = await client.get_entries('posts', get_all=True, batch_size=100, pagination_strategy='keyset')
+        fake: FakeStrapi = client._connector._connector.strapi  # type: ignore  # pylint: disable=protected-access
+    assert [e['id'] for e in res['data'] or []] == list(range(1, 11))
+    assert len(fake.requests) == 3
+
+
+async def test_keyset_pagination_arguments() -> None:
+    async with _fake_client() as client:
+        with pytest.raises(ValueError):
+            await client.get_entries('posts', get_all=True, sort=['title'], pagination_strategy='keyset')
+        with pytest.raises(ValueError):
+            await client.get_entries('posts', get_all=True, max_concurrency=4, pagination_strategy='keyset')
+        with pytest.raises(ValueError):
+            async for _ in client.iter_pages('posts', prefetch=True, pagination_strategy='keyset'):
+                pass
+
+
+async def test_iter_entries_by_keyset_while_deleting() -> None:
+    async with _fake_client(size=12) as client:
+        ids = []
+        async for entry in client.iter_entries('posts', batch_size=5, pagination_strategy='keyset'):
+            ids.append(entry['id'])
+            if entry['id'] == 2:
+                await client.delete_entry('posts', 1)  # an offset would skip the 6th entry
+    assert ids == list(range(1, 13))
+
+
+@pytest.mark.parametrize('prefetch', [False, True])
+async def test_iter_entries(prefetch: bool) -> None:
+    async with _fake_client(size=12) as client:
+        titles = [e['attributes']['title'] async for e in client.iter_entries('posts', batch_size=5, prefetch=prefetch)]
+    assert titles == [f'post-{i:03}' for i in range(12)]
+
+
+async def test_iter_pages_count_only_first_page() -> None:
+    async with _fake_client(size=12) as client:
+        metas = [page['meta']['pagination'] async for page in client.iter_pages('posts', batch_size=5)]
+        fake: FakeStrapi = client._connector._connector.strapi  # type: ignore  # pylint: disable=protected-access
+        assert [m['page'] for m in metas] == [1, 2, 3]
+        assert all(m['total'] == 12 and m['pageCount'] == 3 for m in metas)
+        assert [query['pagination'].get('withCount') for _, _, query in fake.requests] == [None, 'false', 'false']
+        # without a count, a page shorter than the first one is the last one
+        fake.fail_next = [(200, {'data': fake.collections['posts'][:5], 'meta': {'pagination': {
+            'page': 1, 'pageSize': 5}}})]
+        assert len([page async for page in client.iter_pages('posts', batch_size=5)]) == 3
+
+
+@pytest.mark.parametrize('prefetch', [False, True])
+async def test_iter_pages_capped_page_size(prefetch: bool) -> None:
+    async with _fake_client(size=12, max_limit=5) as client:
+        pages = [page async for page in client.iter_pages('posts', batch_size=100, prefetch=prefetch)]
+    assert [len(page['data'] or []) for page in pages] == [5, 5, 2]
+
+
+async def test_iter_pages_stop_early() -> None:
+    async with _fake_client(size=12) as client:
+        async for page in client.iter_pages('posts', batch_size=5, prefetch=True):
+            assert page['meta']['pagination']['page'] == 1
+            break
+
+
+@pytest.mark.parametrize('max_concurrency', [0, -1])
+async def test_bulk_invalid_concurrency(max_concurrency: int) -> None:
+    async with _fake_client(size=2) as client:
+        with pytest.raises(ValueError):
+            [r async for r in client.create_entries('posts', [{'title': 'a'}], max_concurrency=max_concurrency)]
+        with pytest.raises(ValueError):
+            [r async for r in client.delete_entries('posts', [1, 2], max_concurrency=max_concurrency)]
+        fake: FakeStrapi = client._connector._connector.strapi  # type: ignore  # pylint: disable=protected-access
+    assert fake.requests == []
+
+
+async def test_bulk_create_update_delete() -> None:
+    async with _fake_client(size=3) as client:
+        created = [r async for r in client.create_entries('posts', [{'title': f'new-{i}'} for i in range(5)])]
+        assert sorted(r.index for r in created) == list(range(5))
+        assert all(r.ok for r in created)
+        updated = [r async for r in client.update_entries('posts', [(1, {'title': 'x'}), (-1, {'title': 'y'})])]
+        assert {r.index: r.ok for r in updated} == {0: True, 1: False}
+        assert isinstance([r for r in updated if r.index == 1][0].error, errors.NotFoundError)
+        deleted = [r async for r in client.delete_entries('posts', [1, 2], max_concurrency=1)]
+        assert all(r.ok for r in deleted)
+        res = await client.get_entries('posts')
+    assert res['data']
+    assert [e['attributes']['title'] for e in res['data']] == ['post-002'] + [f'new-{i}' for i in range(5)]
+
+
+async def test_upsert_entries() -> None:
+    async with _fake_client(size=3) as client:
+        await client.create_entry('posts', {'title': 'post-002'})  # make 'post-002' ambiguous
+        rows = [
+            {'title': 'post-000', 'content': 'updated'},
+            {'title': 'post-002', 'content': 'ambiguous'},
+            {'title': 'new', 'content': 'created'},
+            {'title': 'new', 'content': 'created and updated'},
+        ]
+        results = {r.index: r async for r in client.upsert_entries('posts', rows, ['title'], chunk_size=3)}
+        res = await client.get_entries('posts', get_all=True)
+    assert [results[i].ok for i in range(4)] == [True, False, True, True]
+    assert isinstance(results[1].error, ValueError)
+    assert res['data']
+    contents = {e['attributes']['title']: e['attributes'].get('content') for e in res['data']}
+    assert contents == {'post-000': 'updated', 'post-001': None, 'post-002': None, 'new': 'created and updated'}
+
+
+async def test_upsert_entries_keys_compared_by_server(monkeypatch: pytest.MonkeyPatch) -> None:
+    """A case-insensitive collation matches keys that differ in Python, they must not create duplicates."""
+    monkeypatch.setitem(fakes._OPERATORS, '$eq', lambda value, expected: value.lower() == expected.lower())
+    monkeypatch.setitem(fakes._OPERATORS, '$in', lambda value, expected: value.lower() in [e.lower() for e in expected])
+    async with _fake_client(size=2) as client:
+        rows = [{'title': 'POST-000', 'content': 'updated'}, {'title': 'new', 'content': 'created'}]
+        results = [r async for r in client.upsert_entries('posts', rows, ['title'])]
+        res = await client.get_entries('posts', get_all=True)
+    assert all(r.ok for r in results)
+    assert res['data']
+    contents = {e['attributes']['title']: e['attributes'].get('content') for e in res['data']}
+    assert contents == {'POST-000': 'updated', 'post-001': None, 'new': 'created'}
+
+
+async def test_coalesce_gets() -> None:
+    strapi = FakeStrapi({'settings': [{'theme': 'dark'}]})
+    async with StrapiClient(
+        api_url=strapi.api_url, connector=FakeConnector(strapi, delay=0.01), coalesce_gets=True
+    ) as client:
+        results = await asyncio.gather(*[client.get_entry('settings', 1) for _ in range(10)])
+        await client.get_entry('settings', 1)
+    assert all(res == results[0] for res in results)
+    assert len(strapi.requests) == 2
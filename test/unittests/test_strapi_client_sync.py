@@ -1,4 +1,21 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+import pytest
+import requests
+from requests.adapters import HTTPAdapter
+
+from pystrapi import errors
 from pystrapi.strapi_client_sync import StrapiClientSync
+from test.utils import fakes
+from test.utils.fakes import FakeConnectorSync, FakeStrapi
+
+
+def _fake_client(size: int = 0, max_limit: Optional[int] = None) -> StrapiClientSync:
+    strapi = FakeStrapi({'posts': [{'title': f'post-{i:03}'} for i in range(size)]}, max_limit=max_limit)
+    return StrapiClientSync(api_url=strapi.api_url, connector=FakeConnectorSync(strapi))
 
 
 def test_api_url() -> None:
@@ -9,3 +26,153 @@ def test_api_url() -> None:
 def test_api_url_no_slash() -> None:
     client = StrapiClientSync(api_url='url')
     assert client.api_url == 'url/'
+
+
+def test_session_adapter_args() -> None:
+    with StrapiClientSync(http_adapter_args={'pool_maxsize': 32}) as client:
+        adapter = client._session.get_adapter('http://localhost')  # pylint: disable=protected-access
+        assert isinstance(adapter, HTTPAdapter)
+        assert adapter._pool_maxsize == 32  # type: ignore  # pylint: disable=protected-access
+
+
+def test_external_session_is_not_closed() -> None:
+    session = requests.Session()
+    closed = []
+    session.close = lambda: closed.append(True)  # type: ignore
+    with StrapiClientSync(session=session) as client:
+        assert client._session is session  # pylint: disable=protected-access
+    assert not closed
+
+
+@pytest.mark.parametrize('prefetch', [False, True])
+def test_iter_entries(prefetch: bool) -> None:
+    with _fake_client(size=12) as client:
+        titles = [e['attributes']['title'] for e in client.iter_entries('posts', batch_size=5, prefetch=prefetch)]
+    assert titles == [f'post-{i:03}' for i in range(12)]
+
+
+def test_iter_entries_capped_page_size() -> None:
+    with _fake_client(size=12, max_limit=5) as client:
+        ids = [e['id'] for e in client.iter_entries('posts', batch_size=100, prefetch=True)]
+        res = client.get_entries('posts', get_all=True, batch_size=100, max_concurrency=2)
+    assert ids == list(range(1, 13))
+    assert [e['id'] for e in res['data'] or []] == ids
+
+
+@pytest.mark.parametrize('max_concurrency', [1, 4])
+def test_get_all_entries_in_order(max_concurrency: int) -> None:
+    with _fake_client(size=23) as client:
+        res = client.get_entries('posts', get_all=True, batch_size=5, max_concurrency=max_concurrency)
+    assert res['data']
+    assert [e['attributes']['title'] for e in res['data']] == [f'post-{i:03}' for i in range(23)]
+    assert res['meta']['pagination'] == {'page': 5, 'pageSize': 5, 'pageCount': 5, 'total': 23}
+
+
+@pytest.mark.parametrize('max_concurrency', [0, -1])
+def test_get_all_entries_invalid_concurrency(max_concurrency: int) -> None:
+    with _fake_client(size=3) as client:
+        with pytest.raises(ValueError):
+            client.get_entries('posts', get_all=True, batch_size=5, max_concurrency=max_concurrency)
+
+
+def test_get_all_entries_error() -> None:
+    with _fake_client(size=23) as client:
+        fake: FakeStrapi = client._connector._connector.strapi  # type: ignore  # pylint: disable=protected-access
+        fake.fail_next = [(200, {'data': [], 'meta': {'pagination': {'pageCount': 5}}}), (500, {})]
+        with pytest.raises(errors.StrapiError):
+            client.get_entries('posts', get_all=True, batch_size=5, max_concurrency=4)
+
+
+def test_get_all_entries_by_keyset() -> None:
+    with _fake_client(size=23) as client:
+        res = client.get_entries('posts', get_all=True, batch_size=5, pagination_strategy='keyset', fields=['title'])
+        with pytest.raises(ValueError):
+            client.get_entries('posts', get_all=True, sort=['title'], pagination_strategy='keyset')
+    assert [e['id'] for e in res['data'] or []] == list(range(1, 24))
+    assert res['meta']['pagination']['total'] == 23
+
+
+def test_iter_entries_by_keyset_capped_limit() -> None:
+    with _fake_client(size=8, max_limit=4) as client:
+        ids = [e['id'] for e in client.iter_entries('posts', batch_size=100, pagination_strategy='keyset')]
+    assert ids == list(range(1, 9))
+
+
+def test_iter_entries_by_keyset() -> None:
+    with _fake_client(size=12) as client:
+        ids = [e['id'] for e in client.iter_entries('posts', batch_size=4, pagination_strategy='keyset')]
+    assert ids == list(range(1, 13))
+
+
+@pytest.mark.parametrize('max_concurrency', [0, -1])
+def test_bulk_invalid_concurrency(max_concurrency: int) -> None:
+    with _fake_client(size=2) as client:
+        with pytest.raises(ValueError):
+            list(client.create_entries('posts', [{'title': 'a'}], max_concurrency=max_concurrency))
+        with pytest.raises(ValueError):
+            list(client.update_entries('posts', [(1, {'title': 'b'})], max_concurrency=max_concurrency))
+        fake: FakeStrapi = client._connector._connector.strapi  # type: ignore  # pylint: disable=protected-access
+    assert fake.requests == []
+
+
+def test_bulk_create_update_delete() -> None:
+    with _fake_client(size=3) as client:
+        created = list(client.create_entries('posts', [{'title': f'new-{i}'} for i in range(5)]))
+        assert sorted(r.index for r in created) == list(range(5))
+        assert all(r.ok for r in created)
+        updated = list(client.update_entries('posts', [(1, {'title': 'x'}), (-1, {'title': 'y'})]))
+        assert {r.index: r.ok for r in updated} == {0: True, 1: False}
+        assert isinstance([r for r in updated if r.index == 1][0].error, errors.NotFoundError)
+        deleted = list(client.delete_entries('posts', [1, 2], max_concurrency=1))
+        assert all(r.ok for r in deleted)
+        res = client.get_entries('posts')
+    assert res['data']
+    assert [e['attributes']['title'] for e in res['data']] == ['post-002'] + [f'new-{i}' for i in range(5)]
+
+
+def test_upsert_entries() -> None:
+    with _fake_client(size=3) as client:
+        client.create_entry('posts', {'title': 'post-002'})  # make 'post-002' ambiguous
+        rows = [
+            {'title': 'post-000', 'content': 'updated'},
+            {'title': 'post-002', 'content': 'ambiguous'},
+            {'title': 'new', 'content': 'created'},
+            {'title': 'new', 'content': 'created and updated'},
+        ]
+        results = {r.index: r for r in client.upsert_entries('posts', rows, ['title'], chunk_size=3)}
+        res = client.get_entries('posts', get_all=True)
+    assert [results[i].ok for i in range(4)] == [True, False, True, True]
+    assert isinstance(results[1].error, ValueError)
+    assert res['data']
+    contents = {e['attributes']['title']: e['attributes'].get('content') for e in res['data']}
+    assert contents == {'post-000': 'updated', 'post-001': None, 'post-002': None, 'new': 'created and updated'}
+
+
+def test_upsert_entries_keys_compared_by_server(monkeypatch: pytest.MonkeyPatch) -> None:
+    """A case-insensitive collation matches keys that differ in Python, they must not create duplicates."""
+    monkeypatch.setitem(fakes._OPERATORS, '$eq', lambda value, expected: value.lower() == expected.lower())
+    monkeypatch.setitem(fakes._OPERATORS, '$in', lambda value, expected: value.lower() in [e.lower() for e in expected])
+    with _fake_client(size=2) as client:
+        rows = [{'title': 'POST-000', 'content': 'updated'}, {'title': 'new', 'content': 'created'}]
+        results = [r for r in client.upsert_entries('posts', rows, ['title'])]
+        res = client.get_entries('posts', get_all=True)
+    assert all(r.ok for r in results)
+    assert res['data']
+    contents = {e['attributes']['title']: e['attributes'].get('content') for e in res['data']}
+    assert contents == {'POST-000': 'updated', 'post-001': None, 'new': 'created'}
+
+
+def test_coalesce_gets() -> None:
+    strapi = FakeStrapi({'settings': [{'theme': 'dark'}]})
+    connector = FakeConnectorSync(strapi)
+    release = threading.Event()
+    handle = strapi.handle
+    strapi.handle = lambda *args: release.wait(1) and handle(*args)  # type: ignore
+    with StrapiClientSync(api_url=strapi.api_url, connector=connector, coalesce_gets=True) as client:
+        with ThreadPoolExecutor(max_workers=5) as executor:
+            futures = [executor.submit(client.get_entry, 'settings', 1) for _ in range(5)]
+            time.sleep(0.05)
+            release.set()
+            results = [f.result() for f in futures]
+    assert all(res == results[0] for res in results)
+    assert len(strapi.requests) == 1
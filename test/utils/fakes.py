@@ -0,0 +1,230 @@
+"""In-memory fake of the Strapi REST API, served through custom connectors."""
+import asyncio
+import hashlib
+import json
+import operator
+import re
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlsplit
+
+import aiohttp
+import requests
+
+from pystrapi.help import aiohttp_helpers, requests_helpers
+
+
+def _parse_query(params: Any) -> dict:
+    """Parse flat query parameters like `filters[title][$eq]` to a nested dict."""
+    if isinstance(params, str):
+        items = parse_qsl(params)
+    else:
+        items = [(k, str(v)) for k, v in (params or {}).items()]
+    nested: dict = {}
+    for key, value in items:
+        parts = re.findall(r'^[^[]+|\[([^]]*)\]', key)
+        path = [key.split('[', 1)[0]] + parts[1:]
+        node = nested
+        for part in path[:-1]:
+            node = node.setdefault(part, {})
+        node[path[-1]] = value
+    result: dict = _lists_from_indexes(nested)
+    return result
+
+
+def _lists_from_indexes(node: Any) -> Any:
+    if not isinstance(node, dict):
+        return node
+    node = {k: _lists_from_indexes(v) for k, v in node.items()}
+    if node and all(k.isdigit() for k in node):
+        return [node[k] for k in sorted(node, key=int)]
+    return node
+
+
+def _coerce(value: Any, like: Any) -> Any:
+    if isinstance(like, bool):
+        return str(value).lower() == 'true'
+    if isinstance(like, int) and isinstance(value, str):
+        return int(value)
+    return value
+
+
+_OPERATORS: Dict[str, Callable[[Any, Any], bool]] = {
+    '$eq': operator.eq,
+    '$ne': operator.ne,
+    '$gt': operator.gt,
+    '$gte': operator.ge,
+    '$lt': operator.lt,
+    '$in': lambda value, expected: value in expected,
+    '$startsWith': lambda value, expected: str(value).startswith(expected),
+}
+
+
+def _match(entry: dict, filters: dict) -> bool:
+    for key, cond in filters.items():
+        if key == '$or':
+            if not any(_match(entry, f) for f in cond):
+                return False
+        elif key == '$and':
+            if not all(_match(entry, f) for f in cond):
+                return False
+        else:
+            value = entry['id'] if key == 'id' else entry['attributes'].get(key)
+            for op, expected in cond.items():
+                if isinstance(expected, list):
+                    expected = [_coerce(e, value) for e in expected]
+                else:
+                    expected = _coerce(expected, value)
+                if not _OPERATORS[op](value, expected):
+                    return False
+    return True
+
+
+class FakeStrapi:
+    """Fake Strapi server with in-memory collections. Records every request it gets.
+
+    Like Strapi, `pageSize` and `limit` are capped at `max_limit`, if given.
+    """
+
+    def __init__(
+        self, collections: Optional[Dict[str, List[dict]]] = None, api_url: str = 'http://fake/api/',
+        etags: bool = False, max_limit: Optional[int] = None
+    ):
+        self.api_url = api_url
+        self.etags = etags
+        self.max_limit = max_limit
+        self.collections: Dict[str, List[dict]] = {}
+        for name, rows in (collections or {}).items():
+            self.collections[name] = [{'id': i, 'attributes': dict(row)} for i, row in enumerate(rows, start=1)]
+        self.requests: List[Tuple[str, str, dict]] = []
+        self.fail_next: List[Tuple[int, dict]] = []
+        self._lock = threading.Lock()
+
+    def respond(self, method: str, url: str, reqargs: Optional[dict]) -> Tuple[int, Any, Dict[str, str]]:
+        """Handle request and return status, json data and headers. Support `If-None-Match` if `etags` is set."""
+        status, data = self.handle(method, url, reqargs)
+        headers: Dict[str, str] = {}
+        if self.etags and status == 200:
+            headers['ETag'] = '"%s"' % hashlib.md5(json.dumps(data).encode()).hexdigest()  # nosec
+            if ((reqargs or {}).get('headers') or {}).get('If-None-Match') == headers['ETag']:
+                return 304, None, headers
+        return status, data, headers
+
+    def handle(self, method: str, url: str, reqargs: Optional[dict]) -> Tuple[int, Any]:
+        reqargs = reqargs or {}
+        query = _parse_query(reqargs.get('params'))
+        split = urlsplit(url)
+        if split.query:
+            query = {**query, **_parse_query(split.query)}
+        with self._lock:
+            self.requests.append((method, url, query))
+            if self.fail_next:
+                return self.fail_next.pop(0)
+            path = split.path[len(urlsplit(self.api_url).path):].strip('/').split('/')
+            body = reqargs.get('json')
+            if body is None and reqargs.get('data') is not None:
+                body = json.loads(reqargs['data'])
+            return self._route(method, path, query, body)
+
+    def _route(self, method: str, path: List[str], query: dict, body: Any) -> Tuple[int, Any]:
+        name = path[0]
+        rows = self.collections.setdefault(name, [])
+        if len(path) == 1 and method == 'GET':
+            return 200, self._list(rows, query)
+        if len(path) == 1 and method == 'POST':
+            entry = {'id': max([r['id'] for r in rows], default=0) + 1, 'attributes': dict(body['data'])}
+            rows.append(entry)
+            return 200, {'data': entry, 'meta': {}}
+        found = [r for r in rows if str(r['id']) == path[1]]
+        if not found:
+            return 404, {'data': None, 'error': {'status': 404, 'name': 'NotFoundError', 'message': 'Not Found',
+                                                 'details': {}}}
+        entry = found[0]
+        if method == 'PUT':
+            entry['attributes'].update(body['data'])
+        elif method == 'DELETE':
+            rows.remove(entry)
+        return 200, {'data': entry, 'meta': {}}
+
+    def _cap(self, limit: int) -> int:
+        return min(limit, self.max_limit) if self.max_limit else limit
+
+    def _list(self, rows: List[dict], query: dict) -> dict:
+        rows = [r for r in rows if _match(r, query.get('filters', {}))]
+        for sort in reversed(query.get('sort', 'id').split(',')):
+            field, _, order = sort.partition(':')
+            rows = sorted(rows, key=lambda r, f=field: r['id'] if f == 'id' else r['attributes'][f],  # type: ignore
+                          reverse=order == 'desc')
+        pagination = query.get('pagination', {})
+        with_count = pagination.get('withCount', 'true') == 'true'
+        if 'start' in pagination or 'limit' in pagination:
+            start, limit = int(pagination.get('start', 0)), self._cap(int(pagination.get('limit', 25)))
+            meta: dict = {'start': start, 'limit': limit}
+            if with_count:
+                meta['total'] = len(rows)
+            return {'data': rows[start:start + limit], 'meta': {'pagination': meta}}
+        page, page_size = int(pagination.get('page', 1)), self._cap(int(pagination.get('pageSize', 25)))
+        meta = {'page': page, 'pageSize': page_size}
+        if with_count:
+            meta['pageCount'] = -(-len(rows) // page_size)
+            meta['total'] = len(rows)
+        return {'data': rows[(page - 1) * page_size:page * page_size], 'meta': {'pagination': meta}}
+
+
+class FakeResponse:
+    """Minimal stand-in for `aiohttp.ClientResponse`."""
+
+    def __init__(self, status: int, data: Any, headers: Optional[Dict[str, str]] = None):
+        self.status = status
+        self.reason = 'OK' if status < 400 else 'Error'
+        self.headers: Dict[str, str] = headers or {}
+        self._body = json.dumps(data).encode() if data is not None else b''
+
+    async def json(self, **kwargs: Any) -> Any:
+        return json.loads(self._body)
+
+    async def read(self) -> bytes:
+        return self._body
+
+    async def text(self) -> str:
+        return self._body.decode()
+
+    def release(self) -> None:
+        pass
+
+
+class FakeConnector:
+    """Async connector that sends requests to a `FakeStrapi`."""
+
+    def __init__(self, strapi: FakeStrapi, delay: float = 0):
+        self.strapi = strapi
+        self.delay = delay
+
+    async def request(
+        self, method: str, url: str, *, reqargs: dict = None, session: aiohttp.ClientSession = None
+    ) -> aiohttp.ClientResponse:
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        status, data, headers = self.strapi.respond(method, url, reqargs)
+        response: Any = FakeResponse(status, data, headers)
+        await aiohttp_helpers.raise_for_response(response, f'send {method} to {url}')
+        return response  # type: ignore[no-any-return]
+
+
+class FakeConnectorSync:
+    """Sync connector that sends requests to a `FakeStrapi`."""
+
+    def __init__(self, strapi: FakeStrapi):
+        self.strapi = strapi
+
+    def request(
+        self, method: str, url: str, *, reqargs: dict = None, session: requests.Session = None
+    ) -> requests.Response:
+        status, data, headers = self.strapi.respond(method, url, reqargs)
+        response = requests.Response()
+        response.headers.update(headers)
+        response.status_code = status
+        response.reason = 'OK' if status < 400 else 'Error'
+        response._content = json.dumps(data).encode() if data is not None else b''  # pylint: disable=protected-access
+        requests_helpers.raise_for_response(response, f'send {method} to {url}')
+        return response